@@ -5,13 +5,21 @@
 struct MonitorConfig {
   // File monitoring settings
   std::string input_file;
+  bool all_channels = false;           // Monitor every channel file in input_dir
+  std::string input_dir;               // Defaults to the directory of input_file
+  std::string input_pattern = "wave_%d.dat";
+  int n_channels = 16;
   int polling_interval_ms = 1000;
   int display_update_interval_ms = 1000;
   int rate_window_seconds = 10;
+  int rate_history_seconds = 86400;          // 1 s rate bins kept in memory
+  float rate_drop_fraction = 0.5f;           // Flag seconds below this fraction of the recent rate
+  std::string rate_history_file = "monitor_rate.csv";  // Empty: no CSV
 
   // QA settings
   bool qa_enabled = true;
   int qa_sampling_interval = 10;
+  int qa_batch_events = 256;         // Events read and checked per block
   int qa_pedestal_samples = 100;
   float qa_baseline_target = 3500.0f;
   float qa_baseline_tolerance = 50.0f;
@@ -22,6 +30,14 @@ struct MonitorConfig {
   // Logging settings
   bool log_warnings = true;
   std::string log_file = "monitor.log";
+  int log_queue_size = 4096;           // Lines waiting for the writer thread; more are dropped
+  int log_suppress_seconds = 10;       // Repeats of one warning are counted, not logged, for this long
+
+  // Status endpoint (HTTP GET /status, JSON)
+  int status_port = 0;                 // 0: disabled
+  std::string status_address = "127.0.0.1";
+  int status_interval_ms = 1000;       // How often the served status is refreshed
+  std::string status_name;             // DAQ name in the status; defaults to the input directory name
 
   // Load configuration from JSON file
   static MonitorConfig LoadFromJson(const std::string& config_path);
@@ -9,6 +9,8 @@
 #include <vector>
 
 #include "config/monitor_config.h"
+#include "monitor/status_server.h"
+#include "utils/async_logger.h"
 #include "utils/file_io.h"
 
 // Event statistics
@@ -40,6 +42,8 @@ struct WaveformQA {
 
   bool HasIssues() const;
   std::string GetStatusString() const;
+  // Failed checks and severity, e.g. "baseline+noise ERROR"; identical keys are rate-limited
+  std::string GetIssueKey() const;
 };
 
 // QA summary statistics
@@ -55,17 +59,59 @@ struct QASummary {
   void Update(const WaveformQA& qa);
 };
 
-// Rate calculator with moving window average
+// One second of the event-rate time series
+struct RateBin {
+  int64_t unix_time = 0;        // Start of the second (system clock)
+  uint32_t events = 0;
+  uint32_t first_event = 0;
+  uint32_t last_event = 0;
+  uint32_t missing_events = 0;  // eventCounter values skipped in this second
+  uint8_t flags = 0;            // RateFlag bits
+
+  static std::string CsvHeader();
+  std::string ToCsv() const;
+};
+
+enum RateFlag : uint8_t {
+  RATE_GAP = 1,    // eventCounter gap
+  RATE_DROP = 2,   // Rate below rate_drop_fraction of the previous window
+  RATE_STALL = 4   // No events at all
+};
+
+// Rate calculator with moving window average and a 1 s time series of the run
 class RateCalculator {
 public:
-  explicit RateCalculator(int window_seconds = 10);
+  explicit RateCalculator(int window_seconds = 10, int history_seconds = 86400,
+                          float drop_fraction = 0.5f);
 
   void RecordEvent(uint32_t event_number, std::chrono::steady_clock::time_point time);
   double GetRate() const;
 
+  // Close every finished second, including seconds without events
+  void Tick(std::chrono::system_clock::time_point now);
+  // Bins closed since the last call, oldest first
+  std::vector<RateBin> TakeClosedBins();
+  // Time series kept in memory (last history_seconds), oldest first
+  std::vector<RateBin> GetHistory() const;
+
 private:
   std::deque<std::pair<std::chrono::steady_clock::time_point, uint32_t>> history_;
   std::chrono::seconds window_size_;
+
+  std::vector<RateBin> bins_;   // Ring buffer of closed bins
+  size_t bins_capacity_;
+  size_t bins_next_ = 0;
+  size_t bins_count_ = 0;
+  std::vector<RateBin> closed_;
+  RateBin current_;
+  bool has_current_ = false;
+  int64_t series_start_ = 0;
+  bool has_last_event_ = false;
+  uint32_t last_event_ = 0;
+  float drop_fraction_;
+
+  void CloseCurrent();
+  double RecentRate() const;
 };
 
 // File type enum
@@ -79,6 +125,11 @@ public:
   virtual bool IsOpen() const = 0;
   virtual bool CheckNewData() = 0;
   virtual bool ReadNextEvent(uint32_t& event_num, std::vector<float>& waveform) = 0;
+
+  // Read up to max_events events into one contiguous (events x nsamples) block.
+  // Returns the number of events read; the default reads event by event.
+  virtual size_t ReadEventBlock(size_t max_events, std::vector<uint32_t>& event_nums,
+                                std::vector<float>& samples, size_t& nsamples);
 };
 
 // Binary file monitor for incremental reading
@@ -90,10 +141,13 @@ public:
   bool IsOpen() const override;
   bool CheckNewData() override;
   bool ReadNextEvent(uint32_t& event_num, std::vector<float>& waveform) override;
+  size_t ReadEventBlock(size_t max_events, std::vector<uint32_t>& event_nums,
+                        std::vector<float>& samples, size_t& nsamples) override;
 
 private:
   std::string file_path_;
   std::ifstream file_;
+  std::vector<char> block_buffer_;
   std::streampos last_position_;
   bool has_new_data_;
   std::streampos last_known_size_;
@@ -120,12 +174,33 @@ private:
   bool ReloadFile();
 };
 
+// Per-channel state in multi-file mode (one reader per wave_N.dat)
+struct ChannelState {
+  int channel = 0;
+  std::string file_path;
+  std::unique_ptr<IFileMonitor> monitor;
+  bool opened = false;
+  uint32_t events_read = 0;
+  uint32_t latest_event_number = 0;
+  QASummary qa_summary;
+  WaveformQA last_qa;
+  bool has_qa = false;
+
+  // One character for the status line: '-' no data, '.' OK, 'W' warning, 'E' error
+  char StatusChar() const;
+};
+
 // QA checker
 class QAChecker {
 public:
   explicit QAChecker(const MonitorConfig& config);
 
   WaveformQA PerformChecks(const std::vector<float>& waveform);
+  WaveformQA PerformChecks(const float* waveform, size_t nsamples);
+
+  // QA of rows first, first + step, ... of a contiguous (n_events x nsamples) block
+  void PerformBatchChecks(const float* block, size_t n_events, size_t nsamples,
+                          size_t first, size_t step, std::vector<WaveformQA>& results);
 
 private:
   const MonitorConfig& config_;
@@ -141,9 +216,12 @@ public:
   DisplayManager();
 
   void PrintStatus(const EventStats& stats, const RateCalculator& rate_calc,
-                   const QASummary& qa_summary, bool qa_enabled);
+                   const QASummary& qa_summary, bool qa_enabled,
+                   const std::string& channel_map = "");
   void PrintFinalSummary(const EventStats& stats, const QASummary& qa_summary, bool qa_enabled);
-  void PrintWarning(uint32_t event_number, const WaveformQA& qa);
+  void PrintChannelSummary(const std::vector<ChannelState>& channels, bool qa_enabled);
+  void PrintWarning(uint32_t event_number, const WaveformQA& qa, int channel = -1);
+  void PrintMessage(const std::string& severity, const std::string& message);
 
   bool ShouldUpdate(const EventStats& stats, int events_since_update);
 
@@ -169,21 +247,38 @@ public:
 
 private:
   MonitorConfig config_;
-  std::unique_ptr<IFileMonitor> file_monitor_;
+  std::vector<ChannelState> channels_;
   FileType file_type_;
   EventStats stats_;
   QASummary qa_summary_;
   RateCalculator rate_calc_;
   DisplayManager display_;
   QAChecker qa_checker_;
-  std::ofstream log_file_;
+  AsyncLogger logger_;
   bool running_ = true;
   int events_since_last_update_ = 0;
 
   FileType DetectFileType(const std::string& file_path) const;
-  void ProcessNewEvents();
-  void PerformQACheck(const std::vector<float>& waveform, uint32_t event_num);
-  void LogWarning(uint32_t event_number, const WaveformQA& qa);
+  std::vector<std::string> BuildInputFiles() const;
+  bool OpenChannel(ChannelState& channel);
+  void ProcessNewEvents(ChannelState& channel, bool reference);
+  void ProcessEvent(ChannelState& channel, bool reference, uint32_t event_num);
+  void RecordQA(ChannelState& channel, const WaveformQA& qa, uint32_t event_num);
+  std::string BuildChannelMap() const;
+  void LogWarning(uint32_t event_number, const WaveformQA& qa, int channel = -1);
+  void LogMessage(const std::string& message);
+  void HandleRateBins();
+
+  std::ofstream rate_file_;
+  bool in_rate_drop_ = false;
+  int64_t stall_start_ = 0;
+  RateBin last_rate_bin_;
+
+  StatusServer status_server_;
+  std::string status_name_;
+  std::chrono::steady_clock::time_point last_status_update_;
+  void PublishStatus(bool force = false);
+  std::string BuildStatusJson() const;
 };
 
 // Utility functions
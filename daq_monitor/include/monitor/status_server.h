@@ -0,0 +1,40 @@
+#pragma once
+
+#include <atomic>
+#include <mutex>
+#include <string>
+#include <thread>
+
+// Minimal localhost HTTP server for the monitor status.
+//
+// The monitor publishes a JSON document at its own cadence; a background
+// thread answers "GET /status" (and "GET /") with the latest copy, so clients
+// never touch the reading thread. One request per connection (HTTP/1.0).
+class StatusServer {
+public:
+  StatusServer() = default;
+  ~StatusServer();
+
+  StatusServer(const StatusServer&) = delete;
+  StatusServer& operator=(const StatusServer&) = delete;
+
+  bool Start(const std::string& address, int port);
+  void Stop();
+  bool IsRunning() const { return thread_.joinable(); }
+
+  // Replace the document served to clients
+  void Publish(const std::string& json);
+
+private:
+  int listen_fd_ = -1;
+  std::thread thread_;
+  std::atomic<bool> stop_{false};
+  std::mutex mutex_;
+  std::string document_ = "{}";
+
+  void ServeLoop();
+  void HandleClient(int fd);
+};
+
+// Escape a string for use inside JSON double quotes
+std::string JsonEscape(const std::string& text);
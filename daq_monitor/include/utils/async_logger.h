@@ -0,0 +1,72 @@
+#pragma once
+
+#include <chrono>
+#include <condition_variable>
+#include <cstdint>
+#include <fstream>
+#include <mutex>
+#include <string>
+#include <thread>
+#include <unordered_map>
+#include <vector>
+
+// Log file writer that never blocks the caller.
+//
+// Lines go into a bounded queue and are written by a background thread in
+// batches, with one flush per batch. When the queue is full new lines are
+// dropped and counted. LogRepeated() rate-limits a recurring message: the first
+// one per key is logged, the rest within suppress_seconds are only counted and
+// summarized as "<key> ×N in last S s".
+class AsyncLogger {
+public:
+  explicit AsyncLogger(size_t queue_size = 4096, int suppress_seconds = 10,
+                       int flush_interval_ms = 1000);
+  ~AsyncLogger();
+
+  AsyncLogger(const AsyncLogger&) = delete;
+  AsyncLogger& operator=(const AsyncLogger&) = delete;
+
+  bool Open(const std::string& path);
+  bool IsOpen() const { return writer_.joinable(); }
+  // Write pending summaries and queued lines, then stop the writer thread
+  void Close();
+
+  // Queue one line; it is timestamped when queued
+  void Log(const std::string& message);
+
+  // Queue message unless `key` was already reported in the current window.
+  // Returns true when the message was not suppressed (also when not open),
+  // so callers can apply the same limit to console output.
+  bool LogRepeated(const std::string& key, const std::string& message);
+
+private:
+  struct Line {
+    std::chrono::system_clock::time_point time;
+    std::string text;
+  };
+
+  struct Repeat {
+    std::chrono::steady_clock::time_point window_start;
+    uint64_t suppressed = 0;
+  };
+
+  std::ofstream file_;
+  std::thread writer_;
+  std::mutex mutex_;
+  std::condition_variable wakeup_;
+  std::vector<Line> queue_;
+  std::unordered_map<std::string, Repeat> repeats_;
+  size_t queue_size_;
+  std::chrono::seconds suppress_window_;
+  std::chrono::milliseconds flush_interval_;
+  uint64_t dropped_ = 0;
+  bool stop_ = false;
+
+  // Callers hold mutex_
+  void Push(std::string text);
+  void Summarize(const std::string& key, const Repeat& repeat,
+                 std::chrono::steady_clock::time_point now);
+  void ExpireRepeats(std::chrono::steady_clock::time_point now, bool all);
+
+  void WriterLoop();
+};
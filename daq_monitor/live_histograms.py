@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Rolling live histograms in shared memory
+Written by live_monitor.py, read by any number of viewer processes
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+from multiprocessing import resource_tracker, shared_memory
+
+# Histogrammed quantities, in this order in the shared segment
+QUANTITIES = ("baseline", "noise", "ampMax")
+
+# (low, high, bins) per quantity in ADC counts; out-of-range values go to the edge bins
+DEFAULT_RANGES = {
+    "baseline": (3300.0, 3700.0, 200),
+    "noise": (0.0, 40.0, 200),
+    "ampMax": (0.0, 4000.0, 200),
+}
+
+DEFAULT_WINDOW_SECONDS = 60
+DEFAULT_SLOT_SECONDS = 1.0
+
+MAGIC = 0x44543537_48495354  # "DT57HIST"
+VERSION = 1
+
+# Header words (int64)
+H_MAGIC, H_VERSION, H_CHANNELS, H_QUANTITIES, H_BINS, H_SLOTS, H_SLOT_US, H_SEQ, H_CURRENT = range(9)
+HEADER_WORDS = 16
+
+
+def default_segment_name(daq_name):
+    return f"dt5742_hist_{daq_name}"
+
+
+class _Layout:
+    """Views of the shared segment.
+
+    header   : (HEADER_WORDS,) int64, see H_* indices; H_SEQ is a sequence
+               counter, odd while the writer is updating
+    ranges   : (n_quantities, 2) float64 low/high edges
+    slot_ids : (n_slots,) int64 time slot held by each ring entry (-1 unused)
+    counts   : (n_slots, n_channels, n_quantities, n_bins) uint32
+    """
+
+    def __init__(self, buf, n_channels, n_bins, n_slots):
+        n_quantities = len(QUANTITIES)
+        offset = 0
+
+        def view(dtype, shape):
+            nonlocal offset
+            array = np.ndarray(shape, dtype=dtype, buffer=buf, offset=offset)
+            offset += array.nbytes
+            return array
+
+        self.header = view(np.int64, (HEADER_WORDS,))
+        self.ranges = view(np.float64, (n_quantities, 2))
+        self.slot_ids = view(np.int64, (n_slots,))
+        self.counts = view(np.uint32, (n_slots, n_channels, n_quantities, n_bins))
+        self.nbytes = offset
+
+    @staticmethod
+    def size(n_channels, n_bins, n_slots):
+        n_quantities = len(QUANTITIES)
+        return (HEADER_WORDS * 8 + n_quantities * 2 * 8 + n_slots * 8
+                + n_slots * n_channels * n_quantities * n_bins * 4)
+
+
+class RollingHistograms:
+    """Writer side: per-channel baseline / noise / ampMax histograms of the last N seconds.
+
+    Time is split into slots of slot_seconds; each slot has its own counts in
+    a ring of window_seconds / slot_seconds entries, so old entries drop out
+    by clearing one slot instead of keeping every value. Readers never lock:
+    they retry when the sequence counter shows an update in progress.
+    """
+
+    def __init__(self, name, n_channels, ranges=None, window_seconds=DEFAULT_WINDOW_SECONDS,
+                 slot_seconds=DEFAULT_SLOT_SECONDS):
+        ranges = dict(DEFAULT_RANGES, **(ranges or {}))
+        bins = {int(ranges[q][2]) for q in QUANTITIES}
+        if len(bins) != 1:
+            # One bin count keeps the segment a plain 4-d array
+            raise ValueError("All histogram ranges must use the same number of bins")
+        n_bins = bins.pop()
+        n_slots = max(1, int(round(window_seconds / slot_seconds)))
+
+        self.name = name
+        self.n_channels = n_channels
+        self.n_bins = n_bins
+        self.n_slots = n_slots
+        self.slot_seconds = slot_seconds
+
+        size = _Layout.size(n_channels, n_bins, n_slots)
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Left over from a monitor that did not exit cleanly
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+
+        self.layout = _Layout(self.shm.buf, n_channels, n_bins, n_slots)
+        lay = self.layout
+        lay.counts[...] = 0
+        lay.slot_ids[...] = -1
+        lay.ranges[...] = [ranges[q][:2] for q in QUANTITIES]
+        lay.header[...] = 0
+        lay.header[H_CHANNELS] = n_channels
+        lay.header[H_QUANTITIES] = len(QUANTITIES)
+        lay.header[H_BINS] = n_bins
+        lay.header[H_SLOTS] = n_slots
+        lay.header[H_SLOT_US] = int(slot_seconds * 1e6)
+        lay.header[H_CURRENT] = -1
+        lay.header[H_VERSION] = VERSION
+        lay.header[H_MAGIC] = MAGIC
+
+        self._scale = (n_bins / (lay.ranges[:, 1] - lay.ranges[:, 0]))
+
+    def _advance(self, now):
+        """Make the slot of time `now` current, clearing slots that were skipped."""
+        lay = self.layout
+        slot_id = int(now / self.slot_seconds)
+        current = int(lay.header[H_CURRENT])
+        if slot_id == current:
+            return slot_id % self.n_slots
+        first = max(current + 1, slot_id - self.n_slots + 1)
+        for sid in range(first, slot_id + 1):
+            ring = sid % self.n_slots
+            lay.counts[ring] = 0
+            lay.slot_ids[ring] = sid
+        lay.header[H_CURRENT] = slot_id
+        return slot_id % self.n_slots
+
+    def fill(self, channel, values, now=None):
+        """Add one block of events of a channel; values maps quantity -> (n,) array."""
+        lay = self.layout
+        lay.header[H_SEQ] += 1
+        try:
+            ring = self._advance(time.time() if now is None else now)
+            for q, name in enumerate(QUANTITIES):
+                v = np.asarray(values[name], dtype=np.float64)
+                if len(v) == 0:
+                    continue
+                idx = ((v - lay.ranges[q, 0]) * self._scale[q]).astype(np.int64)
+                np.clip(idx, 0, self.n_bins - 1, out=idx)
+                lay.counts[ring, channel, q] += np.bincount(idx, minlength=self.n_bins).astype(np.uint32)
+        finally:
+            lay.header[H_SEQ] += 1
+
+    def close(self):
+        del self.layout
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class HistogramReader:
+    """Reader side: attaches to a segment published by RollingHistograms."""
+
+    def __init__(self, name):
+        self.shm = shared_memory.SharedMemory(name=name)
+        # Readers must not remove the segment when they exit
+        resource_tracker.unregister(self.shm._name, "shared_memory")
+
+        header = np.ndarray((HEADER_WORDS,), dtype=np.int64, buffer=self.shm.buf)
+        if header[H_MAGIC] != MAGIC or header[H_VERSION] != VERSION:
+            del header
+            self.shm.close()
+            raise ValueError(f"Shared memory '{name}' is not a live histogram segment")
+        self.n_channels = int(header[H_CHANNELS])
+        self.n_bins = int(header[H_BINS])
+        self.n_slots = int(header[H_SLOTS])
+        self.slot_seconds = header[H_SLOT_US] / 1e6
+        self.layout = _Layout(self.shm.buf, self.n_channels, self.n_bins, self.n_slots)
+
+    def edges(self, quantity):
+        low, high = self.layout.ranges[QUANTITIES.index(quantity)]
+        return np.linspace(low, high, self.n_bins + 1)
+
+    def snapshot(self, window_seconds=None, retries=100):
+        """Counts of the last window_seconds, (n_channels, n_quantities, n_bins) uint64."""
+        lay = self.layout
+        for _ in range(retries):
+            seq = int(lay.header[H_SEQ])
+            if seq % 2 == 1:
+                time.sleep(0.0001)
+                continue
+            slot_ids = lay.slot_ids.copy()
+            counts = lay.counts.copy()
+            if int(lay.header[H_SEQ]) == seq:
+                break
+        else:
+            raise RuntimeError("Histogram writer too busy, no consistent snapshot")
+
+        n_slots = self.n_slots
+        if window_seconds is not None:
+            n_slots = min(n_slots, max(1, int(round(window_seconds / self.slot_seconds))))
+        # Window ends now, so a stopped DAQ shows empty histograms after window_seconds
+        current = int(time.time() / self.slot_seconds)
+        live = (slot_ids > current - n_slots) & (slot_ids >= 0)
+        return counts[live].sum(axis=0, dtype=np.uint64)
+
+    def close(self):
+        del self.layout
+        self.shm.close()
+
+
+def histogram_stats(counts, edges):
+    """(entries, mean, rms) of a binned distribution."""
+    entries = int(counts.sum())
+    if entries == 0:
+        return 0, 0.0, 0.0
+    centers = 0.5 * (edges[:-1] + edges[1:])
+    mean = float(np.dot(counts, centers) / entries)
+    rms = float(np.sqrt(max(np.dot(counts, centers ** 2) / entries - mean ** 2, 0.0)))
+    return entries, mean, rms
+
+
+def print_channel_table(reader, counts):
+    print(f"{'ch':>3} {'entries':>8}" + "".join(f" {q + ' mean':>14} {'rms':>7}" for q in QUANTITIES))
+    for ch in range(reader.n_channels):
+        row = f"{ch:3d}"
+        for q, name in enumerate(QUANTITIES):
+            entries, mean, rms = histogram_stats(counts[ch, q], reader.edges(name))
+            if q == 0:
+                row += f" {entries:8d}"
+            row += f" {mean:14.1f} {rms:7.1f}"
+        print(row)
+
+
+def print_histogram(reader, counts, channel, quantity, width=50, rows=25):
+    edges = reader.edges(quantity)
+    values = counts[channel, QUANTITIES.index(quantity)]
+    # Merge bins so the text plot fits in `rows` lines
+    group = max(1, int(np.ceil(len(values) / rows)))
+    merged = np.add.reduceat(values, np.arange(0, len(values), group))
+    peak = max(int(merged.max()), 1)
+    print(f"ch{channel:02d} {quantity}")
+    for i, n in enumerate(merged):
+        low = edges[i * group]
+        print(f"{low:10.1f} | {'#' * int(width * int(n) / peak):<{width}} {int(n)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="View live histograms published by live_monitor.py")
+    parser.add_argument("--name", default=None, help="Shared memory segment name")
+    parser.add_argument("--daq", default="daq00", help="DAQ name, used when --name is not given")
+    parser.add_argument("--window", type=float, default=None, help="Seconds to sum (default: whole ring)")
+    parser.add_argument("--channel", type=int, default=None, help="Show histograms of one channel")
+    parser.add_argument("--interval", type=float, default=1.0, help="Refresh interval in seconds")
+    parser.add_argument("--once", action="store_true", help="Print once and exit")
+    args = parser.parse_args()
+
+    name = args.name or default_segment_name(args.daq)
+    try:
+        reader = HistogramReader(name)
+    except FileNotFoundError:
+        print(f"ERROR: no live histograms '{name}' (is live_monitor.py --histograms running?)")
+        sys.exit(1)
+
+    try:
+        while True:
+            counts = reader.snapshot(args.window)
+            if not args.once:
+                sys.stdout.write("\033[2J\033[H")
+            print(f"[{time.strftime('%H:%M:%S')}] {name}")
+            if args.channel is None:
+                print_channel_table(reader, counts)
+            else:
+                for quantity in QUANTITIES:
+                    print_histogram(reader, counts, args.channel, quantity)
+            if args.once:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        reader.close()
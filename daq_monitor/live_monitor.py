@@ -0,0 +1,805 @@
+#!/usr/bin/env python3
+"""
+Live DAQ monitor
+Tails all wave_N.dat files of one digitizer and reports rate and QA per channel
+"""
+
+import argparse
+import asyncio
+import ctypes
+import ctypes.util
+import json
+import os
+import signal
+import struct
+import sys
+import time
+from collections import deque
+from itertools import islice
+
+import numpy as np
+
+from live_histograms import QUANTITIES, RollingHistograms, default_segment_name
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data_converter"))
+from read_wavedump import HEADER_BYTES, HEADER_DTYPE
+
+# Largest number of events returned by one ChannelTail.read_new() call, so
+# attaching to a long running acquisition does not read the whole file at once
+MAX_READ_EVENTS = 1000
+
+# inotify(7) event masks
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+# struct inotify_event without the trailing name
+INOTIFY_EVENT = struct.Struct("iIII")
+
+# QA status codes, ordered by severity
+QA_OK, QA_WARNING, QA_ERROR = 0, 1, 2
+QA_NAMES = {QA_OK: "OK", QA_WARNING: "WARNING", QA_ERROR: "ERROR"}
+
+# Flags of a 1 s rate bin (same bits and CSV columns as RateBin in the C++ monitor)
+RATE_GAP, RATE_DROP, RATE_STALL = 1, 2, 4
+RATE_CSV_HEADER = "unix_time,local_time,events,first_event,last_event,missing_events,gap,drop,stall"
+STALL_REPORT_SECONDS = 5
+# Empty bins in a row before stalled_since is published (kStallBins in the C++ monitor)
+STALL_BINS = 3
+
+DEFAULT_DISPLAY_MS = 100
+DEFAULT_POLL_MS = 50
+
+
+def load_monitor_config(config_path):
+    """Return the 'monitor' section of monitor_config.json with defaults filled in."""
+    config = {
+        "input_file": "",
+        "input_pattern": "wave_%d.dat",
+        "n_channels": 16,
+        "rate_window_seconds": 10,
+        "rate_history_seconds": 86400,
+        "rate_drop_fraction": 0.5,
+        "rate_history_file": "monitor_rate.csv",
+        "qa_enabled": True,
+        "qa_sampling_interval": 10,
+        "qa_pedestal_samples": 100,
+        "qa_baseline_target": 3500.0,
+        "qa_baseline_tolerance": 50.0,
+        "qa_noise_threshold": 10.0,
+        "qa_signal_min": -1000.0,
+        "qa_signal_max": 5000.0,
+        "log_warnings": True,
+        "log_file": "monitor.log",
+        "status_port": 0,
+        "status_address": "127.0.0.1",
+        "status_interval_ms": 1000,
+        "status_name": "",
+        "signal_polarity": -1,
+        "histograms": {},
+    }
+    try:
+        with open(config_path, "r") as f:
+            config.update(json.load(f).get("monitor", {}))
+    except (OSError, ValueError) as e:
+        print(f"Error loading monitor config: {e}")
+        print("Using default configuration")
+    return config
+
+
+class Inotify:
+    """Minimal inotify wrapper (Linux only) on top of libc via ctypes."""
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify not available on this platform")
+        self._libc = libc
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    def add_watch(self, path, mask=IN_WATCH_MASK):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {path}")
+        return wd
+
+    def read_names(self):
+        """Drain pending events; return the set of file names that changed."""
+        names = set()
+        while True:
+            try:
+                buf = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return names
+            pos = 0
+            while pos + INOTIFY_EVENT.size <= len(buf):
+                _, _, _, length = INOTIFY_EVENT.unpack_from(buf, pos)
+                pos += INOTIFY_EVENT.size
+                name = buf[pos:pos + length].rstrip(b"\0")
+                pos += length
+                if name:
+                    names.add(os.fsdecode(name))
+
+    def close(self):
+        os.close(self.fd)
+
+
+class ChannelTail:
+    """Incremental reader of one binary wave_N.dat file.
+
+    Every read_new() call does one fstat and one pread of at most max_events
+    records appended since the previous call (like BinaryFileMonitor::last_position_,
+    but per batch instead of per event); call it again until it returns None to
+    catch up with a backlog. A trailing partial event is kept until the rest of
+    it is written.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.fd = None
+        self.offset = 0
+        self.record = None
+        self.pending = b""
+
+    def _open(self):
+        if self.fd is not None:
+            return True
+        try:
+            self.fd = os.open(self.path, os.O_RDONLY)
+        except FileNotFoundError:
+            return False
+        self.offset = 0
+        self.pending = b""
+        return True
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def _pread(self, size):
+        data = os.pread(self.fd, size, self.offset)
+        self.offset += len(data)
+        return data
+
+    def read_new(self, max_events=MAX_READ_EVENTS):
+        """Up to max_events records (HEADER_DTYPE header + float32 samples) appended
+        since the last call, or None when there is nothing new."""
+        if not self._open():
+            return None
+        size = os.fstat(self.fd).st_size
+        if size < self.offset:
+            # File was truncated or replaced: start over
+            self.offset = 0
+            self.pending = b""
+            self.record = None
+        if size == self.offset:
+            return None
+
+        if self.record is None:
+            # The first header fixes the record size
+            self.pending += self._pread(min(size - self.offset, HEADER_BYTES - len(self.pending)))
+            if len(self.pending) < HEADER_BYTES:
+                return None
+            event_size = int(np.frombuffer(self.pending, dtype=HEADER_DTYPE, count=1)["event_size"][0])
+            if event_size <= HEADER_BYTES or (event_size - HEADER_BYTES) % 4 != 0:
+                raise ValueError(f"Invalid event size {event_size} in {self.path}")
+            nsamples = (event_size - HEADER_BYTES) // 4
+            self.record = np.dtype([("header", HEADER_DTYPE), ("samples", "<f4", (nsamples,))])
+
+        limit = max(1, max_events) * self.record.itemsize - len(self.pending)
+        data = self._pread(min(size - self.offset, limit))
+        buf = self.pending + data if self.pending else data
+
+        n_events = len(buf) // self.record.itemsize
+        used = n_events * self.record.itemsize
+        self.pending = buf[used:]
+        if n_events == 0:
+            return None
+        return np.frombuffer(buf, dtype=self.record, count=n_events)
+
+
+def check_waveforms(samples, config):
+    """Vectorized QAChecker::PerformChecks for a block of waveforms.
+
+    samples : (n, nsamples) array
+    Returns a dict of (n,) arrays: baseline, noise, min, max and the
+    baseline/range/noise status codes.
+    """
+    n_ped = max(1, min(int(config["qa_pedestal_samples"]), samples.shape[1]))
+    pedestal = samples[:, :n_ped]
+    baseline = pedestal.mean(axis=1)
+    noise = pedestal.std(axis=1)
+    wf_min = samples.min(axis=1)
+    wf_max = samples.max(axis=1)
+
+    tolerance = config["qa_baseline_tolerance"]
+    deviation = np.abs(baseline - config["qa_baseline_target"])
+    baseline_status = np.where(deviation > 2.0 * tolerance, QA_ERROR,
+                               np.where(deviation > tolerance, QA_WARNING, QA_OK))
+
+    out_of_range = (wf_min < config["qa_signal_min"]) | (wf_max > config["qa_signal_max"])
+    flat = np.abs(wf_max - wf_min) < 1.0
+    range_status = np.where(out_of_range, QA_ERROR, np.where(flat, QA_WARNING, QA_OK))
+
+    threshold = config["qa_noise_threshold"]
+    noise_status = np.where(noise > 2.0 * threshold, QA_ERROR,
+                            np.where(noise > threshold, QA_WARNING, QA_OK))
+
+    return {
+        "baseline": baseline,
+        "noise": noise,
+        "min": wf_min,
+        "max": wf_max,
+        "baseline_status": baseline_status,
+        "range_status": range_status,
+        "noise_status": noise_status,
+    }
+
+
+def describe_issues(qa, i, config):
+    """Text like WaveformQA::GetStatusString() for row i of a check_waveforms() result."""
+    parts = []
+    if qa["baseline_status"][i] != QA_OK:
+        parts.append(f"Baseline deviation = {abs(qa['baseline'][i] - config['qa_baseline_target']):.1f}")
+    if qa["range_status"][i] != QA_OK:
+        parts.append(f"Signal out of range (min={qa['min'][i]:.1f}, max={qa['max'][i]:.1f})")
+    if qa["noise_status"][i] != QA_OK:
+        parts.append(f"Excessive noise (RMS={qa['noise'][i]:.1f})")
+    return ", ".join(parts)
+
+
+class ChannelStats:
+    """Running event and QA counters of one channel."""
+
+    def __init__(self):
+        self.total_events = 0
+        self.latest_event = None
+        self.event_gaps = 0
+        self.qa_counts = [0, 0, 0]
+        self.status = QA_OK
+        # Sums over all QA checks, for the running averages of QASummary
+        self.baseline_sum = 0.0
+        self.noise_sum = 0.0
+
+    @property
+    def checked(self):
+        return sum(self.qa_counts)
+
+    @property
+    def baseline(self):
+        return self.baseline_sum / self.checked if self.checked else 0.0
+
+    @property
+    def noise(self):
+        return self.noise_sum / self.checked if self.checked else 0.0
+
+    def update_events(self, counters):
+        if len(counters) == 0:
+            return
+        counters = counters.astype(np.int64)
+        if self.latest_event is None:
+            steps = np.diff(counters)
+        else:
+            steps = np.diff(np.concatenate(([self.latest_event], counters)))
+        self.event_gaps += int(np.count_nonzero(steps != 1))
+        self.latest_event = int(counters[-1])
+        self.total_events += len(counters)
+
+
+class RateSeries:
+    """1 s event-rate time series of a run, like RateCalculator in monitor_realtime.
+
+    bins holds the last history_seconds closed seconds as
+    [unix_time, events, first_event, last_event, missing_events, flags].
+    Seconds without events are closed by tick() and flagged RATE_STALL;
+    seconds below drop_fraction of the previous window are flagged RATE_DROP.
+    """
+
+    def __init__(self, window_seconds=10, history_seconds=86400, drop_fraction=0.5):
+        self.window = max(1, int(window_seconds))
+        self.drop_fraction = drop_fraction
+        self.bins = deque(maxlen=max(1, int(history_seconds)))
+        self.closed = []
+        self.current = None
+        self.series_start = None
+        self.last_event = None
+
+    def record(self, counters, now=None):
+        """Add a block of event counters read at time `now`."""
+        if len(counters) == 0:
+            return
+        now = time.time() if now is None else now
+        if self.current is None:
+            self.series_start = int(now)
+            self.current = [self.series_start, 0, 0, 0, 0, 0]
+        else:
+            self.tick(now)
+
+        counters = np.asarray(counters, dtype=np.int64)
+        previous = counters[0] - 1 if self.last_event is None else self.last_event
+        steps = np.diff(counters, prepend=previous)
+        missing = int(np.sum(steps[steps > 1] - 1))
+        cur = self.current
+        if missing:
+            cur[4] += missing
+            cur[5] |= RATE_GAP
+        if cur[1] == 0:
+            cur[2] = int(counters[0])
+        cur[3] = int(counters[-1])
+        cur[1] += len(counters)
+        self.last_event = int(counters[-1])
+
+    def tick(self, now=None):
+        """Close every finished second, including seconds without events."""
+        if self.current is None:
+            return
+        second = int(time.time() if now is None else now)
+        while self.current[0] < second:
+            following = self.current[0] + 1
+            self._close()
+            following = max(following, second - self.bins.maxlen)
+            self.current = [following, 0, 0, 0, 0, 0]
+
+    def recent_rate(self):
+        # The first second is partial and also holds any backlog read at startup
+        recent = [b[1] for b in islice(reversed(self.bins), self.window) if b[0] != self.series_start]
+        return sum(recent) / len(recent) if recent else 0.0
+
+    def _close(self):
+        cur = self.current
+        recent = self.recent_rate()
+        if cur[1] == 0:
+            cur[5] |= RATE_STALL
+        elif recent >= 1.0 and cur[1] < self.drop_fraction * recent:
+            cur[5] |= RATE_DROP
+        self.bins.append(cur)
+        self.closed.append(cur)
+
+    def take_closed(self):
+        closed, self.closed = self.closed, []
+        return closed
+
+
+def rate_bin_csv(b):
+    unix_time, events, first, last, missing, flags = b
+    local = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(unix_time))
+    return (f"{unix_time},{local},{events},{first},{last},{missing},"
+            f"{int(bool(flags & RATE_GAP))},{int(bool(flags & RATE_DROP))},{int(bool(flags & RATE_STALL))}")
+
+
+class LiveMonitor:
+    """Tails every channel file of a DAQ directory from one asyncio event loop."""
+
+    def __init__(self, directory, config, display_ms=DEFAULT_DISPLAY_MS, poll_ms=DEFAULT_POLL_MS,
+                 histograms=None):
+        self.directory = directory
+        self.config = config
+        self.histograms = histograms
+        self.display_interval = display_ms / 1000.0
+        self.poll_interval = poll_ms / 1000.0
+
+        pattern = config["input_pattern"]
+        n_channels = int(config["n_channels"])
+        self.names = {pattern % ch: ch for ch in range(n_channels)}
+        self.tails = [ChannelTail(os.path.join(directory, pattern % ch)) for ch in range(n_channels)]
+        self.stats = [ChannelStats() for _ in range(n_channels)]
+
+        self.rate_history = deque()
+        self.rate_window = float(config["rate_window_seconds"])
+        self.rate_series = RateSeries(config["rate_window_seconds"], config["rate_history_seconds"],
+                                      config["rate_drop_fraction"])
+        self.rate_file = None
+        self.in_rate_drop = False
+        self.stall_start = None
+        self.last_rate_bin = None
+        self.status_name = config["status_name"] or os.path.basename(os.path.abspath(directory))
+        self.status_body = b"{}"
+        self.last_status = 0.0
+        self.status_server = None
+        self.start_time = time.monotonic()
+        self.last_display = 0.0
+        self.last_data_time = None
+        self.running = True
+        self.log = None
+        self.inotify = None
+
+    # --- reading -----------------------------------------------------------
+
+    def process_channels(self, channels):
+        for ch in channels:
+            # Bounded batches until the channel has caught up
+            while True:
+                try:
+                    records = self.tails[ch].read_new()
+                except (OSError, ValueError) as e:
+                    self.report(f"[ERROR] ch{ch:02d}: {e}")
+                    break
+                if records is None:
+                    break
+
+                stats = self.stats[ch]
+                first = stats.total_events
+                stats.update_events(records["header"]["event_counter"])
+                self.last_data_time = time.monotonic()
+                if ch == 0:
+                    self.rate_series.record(records["header"]["event_counter"])
+
+                if self.config["qa_enabled"] or self.histograms is not None:
+                    self.check_channel(ch, records, first)
+
+        self.record_rate()
+        self.display()
+
+    def check_channel(self, ch, records, first):
+        # Sample every qa_sampling_interval-th event of the channel, like RealtimeMonitor
+        interval = max(1, int(self.config["qa_sampling_interval"]))
+        start = (interval - (first + 1) % interval) % interval
+        sampled = records[start::interval]
+        if len(sampled) == 0:
+            return
+
+        qa = check_waveforms(np.asarray(sampled["samples"]), self.config)
+
+        if self.histograms is not None:
+            if self.config["signal_polarity"] < 0:
+                amplitude = qa["baseline"] - qa["min"]
+            else:
+                amplitude = qa["max"] - qa["baseline"]
+            values = {"baseline": qa["baseline"], "noise": qa["noise"], "ampMax": amplitude}
+            self.histograms.fill(ch, {name: values[name] for name in QUANTITIES})
+        if not self.config["qa_enabled"]:
+            return
+
+        worst = np.maximum(np.maximum(qa["baseline_status"], qa["range_status"]), qa["noise_status"])
+
+        stats = self.stats[ch]
+        for status in (QA_OK, QA_WARNING, QA_ERROR):
+            stats.qa_counts[status] += int(np.count_nonzero(worst == status))
+        stats.baseline_sum += float(np.sum(qa["baseline"]))
+        stats.noise_sum += float(np.sum(qa["noise"]))
+
+        # Report status changes instead of every bad waveform
+        status = int(worst[-1])
+        if status != stats.status:
+            event = int(sampled["header"]["event_counter"][-1])
+            if status == QA_OK:
+                self.report(f"[OK] ch{ch:02d} Event {event}: back to normal")
+            else:
+                i = len(worst) - 1
+                self.report(f"[{QA_NAMES[status]}] ch{ch:02d} Event {event}: "
+                            f"{describe_issues(qa, i, self.config)}")
+            stats.status = status
+
+    # --- rate and display --------------------------------------------------
+
+    def complete_events(self):
+        """Events read on every channel that has produced data."""
+        totals = [s.total_events for s in self.stats if s.latest_event is not None]
+        return min(totals) if totals else 0
+
+    def record_rate(self):
+        now = time.monotonic()
+        self.rate_history.append((now, self.complete_events()))
+        cutoff = now - self.rate_window
+        while len(self.rate_history) > 2 and self.rate_history[0][0] < cutoff:
+            self.rate_history.popleft()
+
+    def handle_rate_bins(self):
+        """Close finished seconds, append them to the CSV and report stalls and drops."""
+        self.rate_series.tick()
+        bins = self.rate_series.take_closed()
+        if bins:
+            self.last_rate_bin = bins[-1]
+        for b in bins:
+            if self.rate_file:
+                self.rate_file.write(rate_bin_csv(b) + "\n")
+
+            unix_time, events, flags = b[0], b[1], b[5]
+            if flags & RATE_STALL:
+                if self.stall_start is None:
+                    self.stall_start = unix_time
+                if unix_time - self.stall_start + 1 == STALL_REPORT_SECONDS:
+                    self.report(f"[WARNING] No events since {format_clock(self.stall_start)}")
+                continue
+
+            if self.stall_start is not None:
+                seconds = unix_time - self.stall_start
+                if seconds >= STALL_REPORT_SECONDS:
+                    self.report(f"[INFO] Events resumed after {seconds} s stall "
+                                f"(from {format_clock(self.stall_start)})")
+                self.stall_start = None
+
+            drop = bool(flags & RATE_DROP)
+            if drop and not self.in_rate_drop:
+                self.report(f"[WARNING] Rate drop at {format_clock(unix_time)}: {events} evt/s")
+            self.in_rate_drop = drop
+
+        if self.rate_file and bins:
+            self.rate_file.flush()
+
+    def stalled_since(self):
+        """Start of the current stall once it has lasted STALL_BINS empty seconds."""
+        if (self.stall_start is not None and self.last_rate_bin is not None
+                and self.last_rate_bin[0] - self.stall_start + 1 >= STALL_BINS):
+            return self.stall_start
+        return None
+
+    def rate(self):
+        if len(self.rate_history) < 2:
+            return 0.0
+        (t0, n0), (t1, n1) = self.rate_history[0], self.rate_history[-1]
+        if t1 - t0 < 0.001:
+            return 0.0
+        return (n1 - n0) / (t1 - t0)
+
+    def display(self, force=False):
+        now = time.monotonic()
+        if not force and now - self.last_display < self.display_interval:
+            return
+        self.last_display = now
+
+        active = [s for s in self.stats if s.latest_event is not None]
+        latest = max((s.latest_event for s in active), default=0)
+        rate = self.rate()
+        rate_str = f"{rate:.1f} evt/s" if rate >= 1.0 else f"{rate * 60.0:.1f} evt/min"
+        line = (f"\r[{time.strftime('%H:%M:%S')}] Event: {latest} | Rate: {rate_str} | "
+                f"Total: {self.complete_events()} | Channels: {len(active)}/{len(self.stats)} | ")
+        if self.config["qa_enabled"]:
+            bad = [f"{ch}" for ch, s in enumerate(self.stats) if s.status != QA_OK]
+            line += f"QA bad ch: {','.join(bad) if bad else '-'} | "
+        line += f"Runtime: {format_duration(now - self.start_time)}"
+        sys.stdout.write(line)
+        sys.stdout.flush()
+
+    def report(self, message):
+        sys.stdout.write("\n" + message + "\n")
+        sys.stdout.flush()
+        if self.log:
+            self.log.write(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] {message}\n")
+            self.log.flush()
+
+    # --- status endpoint -----------------------------------------------------
+
+    def status(self):
+        """Same JSON layout as RealtimeMonitor::BuildStatusJson() in monitor_realtime."""
+        now = time.monotonic()
+        runtime = now - self.start_time
+        ref = self.stats[0]
+        qa_counts = [sum(s.qa_counts[i] for s in self.stats) for i in (QA_OK, QA_WARNING, QA_ERROR)]
+        checked = sum(qa_counts)
+        channels = []
+        for ch, s in enumerate(self.stats):
+            status = "NO_DATA" if s.latest_event is None else QA_NAMES[s.status]
+            channels.append({"channel": ch, "events": s.total_events,
+                             "latest": s.latest_event or 0, "status": status})
+        return {
+            "name": self.status_name,
+            "source": "live_monitor",
+            "time": int(time.time()),
+            "runtime_s": round(runtime, 2),
+            "input": self.directory,
+            "events": {
+                "total": self.complete_events(),
+                "latest": ref.latest_event or 0,
+                "gaps": ref.event_gaps,
+                "corrupted": 0,
+                "idle_s": round(now - (self.last_data_time or self.start_time), 2),
+            },
+            "rate": {
+                "current": round(self.rate(), 2),
+                "window_s": self.rate_window,
+                "last_second": self.last_rate_bin[1] if self.last_rate_bin else 0,
+                "drop": self.in_rate_drop,
+                "stalled_since": self.stalled_since(),
+            },
+            "qa": {
+                "enabled": bool(self.config["qa_enabled"]),
+                "checked": checked,
+                "ok": qa_counts[QA_OK],
+                "warning": qa_counts[QA_WARNING],
+                "error": qa_counts[QA_ERROR],
+                "avg_baseline": round(sum(s.baseline_sum for s in self.stats) / checked, 2) if checked else 0.0,
+                "avg_noise": round(sum(s.noise_sum for s in self.stats) / checked, 2) if checked else 0.0,
+            },
+            "channels": channels,
+        }
+
+    def publish_status(self, force=False):
+        if self.status_server is None:
+            return
+        now = time.monotonic()
+        if not force and now - self.last_status < self.config["status_interval_ms"] / 1000.0:
+            return
+        self.last_status = now
+        self.status_body = json.dumps(self.status()).encode()
+
+    async def _serve_status(self, reader, writer):
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout=1.0)
+            method, path = (request.split(b" ", 2) + [b"", b""])[:2]
+            if method != b"GET":
+                code, body = "405 Method Not Allowed", b'{"error": "only GET is supported"}'
+            elif path in (b"/", b"/status"):
+                code, body = "200 OK", self.status_body
+            else:
+                code, body = "404 Not Found", b'{"error": "unknown path, use /status"}'
+            writer.write(f"HTTP/1.0 {code}\r\nContent-Type: application/json\r\n"
+                         f"Cache-Control: no-store\r\nContent-Length: {len(body)}\r\n"
+                         "Connection: close\r\n\r\n".encode() + body)
+            await writer.drain()
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, OSError):
+            pass
+        finally:
+            writer.close()
+
+    def print_summary(self):
+        runtime = time.monotonic() - self.start_time
+        print("\n")
+        print("═" * 53)
+        print("         Monitoring Session Summary")
+        print("═" * 53)
+        print(f"  Complete Events:    {self.complete_events()}")
+        print(f"  Runtime:            {format_duration(runtime)}")
+        print("")
+        print("  ch   events   latest   gaps   QA ok/warn/err   baseline   noise")
+        for ch, s in enumerate(self.stats):
+            latest = "-" if s.latest_event is None else s.latest_event
+            ok, warn, err = s.qa_counts
+            print(f"  {ch:2d} {s.total_events:8d} {latest!s:>8} {s.event_gaps:6d}"
+                  f"   {ok:6d}/{warn}/{err:<6d}   {s.baseline:8.1f} {s.noise:7.1f}")
+        print("═" * 53 + "\n")
+
+    # --- event loop --------------------------------------------------------
+
+    def stop(self):
+        self.running = False
+
+    def _on_inotify(self):
+        names = self.inotify.read_names()
+        channels = sorted(self.names[name] for name in names if name in self.names)
+        if channels:
+            self.process_channels(channels)
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        loop.add_signal_handler(signal.SIGINT, self.stop)
+
+        while self.running and not os.path.isdir(self.directory):
+            sys.stdout.write(f"Waiting for DAQ to start ({self.directory})...\r")
+            sys.stdout.flush()
+            await asyncio.sleep(self.poll_interval)
+
+        if self.config["log_warnings"] and self.config["log_file"]:
+            self.log = open(self.config["log_file"], "a")
+            self.log.write(f"\n[{time.strftime('%Y-%m-%d %H:%M:%S')}] Live monitor started, "
+                           f"directory: {self.directory}\n")
+
+        try:
+            self.inotify = Inotify()
+            self.inotify.add_watch(self.directory)
+            loop.add_reader(self.inotify.fd, self._on_inotify)
+            mode = "inotify"
+        except (OSError, AttributeError, TypeError):
+            self.inotify = None
+            mode = f"polling every {self.poll_interval * 1000:.0f} ms"
+
+        print(f"\nMonitoring {len(self.tails)} channels in {self.directory} ({mode}). "
+              "Press Ctrl+C to stop.\n")
+
+        if self.config["rate_history_file"]:
+            path = self.config["rate_history_file"]
+            self.rate_file = open(path, "a")
+            if self.rate_file.tell() == 0:
+                self.rate_file.write(RATE_CSV_HEADER + "\n")
+
+        if self.config["status_port"]:
+            address, port = self.config["status_address"], int(self.config["status_port"])
+            try:
+                self.status_server = await asyncio.start_server(self._serve_status, address, port)
+                print(f"Status: http://{address}:{port}/status")
+            except OSError as e:
+                print(f"ERROR: cannot listen on {address}:{port}: {e}")
+
+        # Catch up with data written before the watch was set up
+        self.process_channels(range(len(self.tails)))
+        self.publish_status(force=True)
+
+        try:
+            while self.running:
+                if self.inotify is None:
+                    self.process_channels(range(len(self.tails)))
+                    self.handle_rate_bins()
+                    self.publish_status()
+                    await asyncio.sleep(self.poll_interval)
+                else:
+                    # Data arrives through the reader callback; refresh rate/runtime meanwhile
+                    await asyncio.sleep(self.display_interval)
+                    self.record_rate()
+                    self.handle_rate_bins()
+                    self.publish_status()
+                    self.display()
+        finally:
+            if self.status_server is not None:
+                self.status_server.close()
+            if self.inotify is not None:
+                loop.remove_reader(self.inotify.fd)
+                self.inotify.close()
+            for tail in self.tails:
+                tail.close()
+            if self.histograms is not None:
+                self.histograms.close()
+            self.print_summary()
+            if self.rate_file:
+                self.rate_file.close()
+            if self.log:
+                self.log.close()
+
+
+def format_clock(unix_time):
+    return time.strftime("%H:%M:%S", time.localtime(unix_time))
+
+
+def format_duration(seconds):
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Live monitor of all channel files of one DAQ (inotify + asyncio)"
+    )
+    parser.add_argument("--config", default="monitor_config.json",
+                        help="Path to configuration file (default: monitor_config.json)")
+    parser.add_argument("--dir", default=None,
+                        help="Directory with the wave_N.dat files (default: directory of input_file)")
+    parser.add_argument("--channels", type=int, default=None,
+                        help="Number of channel files (default: n_channels from config, 16)")
+    parser.add_argument("--no-qa", action="store_true", help="Disable QA checks")
+    parser.add_argument("--display-ms", type=int, default=DEFAULT_DISPLAY_MS,
+                        help=f"Status line refresh interval (default: {DEFAULT_DISPLAY_MS} ms)")
+    parser.add_argument("--histograms", nargs="?", const="", default=None, metavar="NAME",
+                        help="Publish rolling per-channel histograms in shared memory "
+                             "(default name: dt5742_hist_<dir name>)")
+    parser.add_argument("--status-port", type=int, default=None,
+                        help="Serve the status as JSON on http://127.0.0.1:PORT/status "
+                             "(default: status_port from config, 0 = off)")
+    parser.add_argument("--poll-ms", type=int, default=DEFAULT_POLL_MS,
+                        help=f"Polling interval when inotify is unavailable (default: {DEFAULT_POLL_MS} ms)")
+    args = parser.parse_args()
+
+    config = load_monitor_config(args.config)
+    if args.channels is not None:
+        config["n_channels"] = args.channels
+    if args.no_qa:
+        config["qa_enabled"] = False
+    if args.status_port is not None:
+        config["status_port"] = args.status_port
+
+    directory = args.dir or os.path.dirname(config["input_file"]) or "."
+
+    print("CAEN DT5742 Live Monitor")
+    print(f"Configuration: {args.config}")
+    print(f"Input directory: {directory}")
+    print(f"QA enabled: {'yes' if config['qa_enabled'] else 'no'}")
+
+    histograms = None
+    if args.histograms is not None:
+        hist_cfg = dict(config["histograms"])
+        name = args.histograms or default_segment_name(os.path.basename(os.path.abspath(directory)))
+        ranges = {q: hist_cfg[q] for q in QUANTITIES if q in hist_cfg}
+        histograms = RollingHistograms(name, int(config["n_channels"]), ranges,
+                                       hist_cfg.get("window_seconds", 60),
+                                       hist_cfg.get("slot_seconds", 1.0))
+        print(f"Live histograms: {name} (view with ./live_histograms.py --name {name})")
+
+    monitor = LiveMonitor(directory, config, args.display_ms, args.poll_ms, histograms)
+    asyncio.run(monitor.run())
+
+
+if __name__ == "__main__":
+    main()
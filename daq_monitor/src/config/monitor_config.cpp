@@ -29,7 +29,26 @@ MonitorConfig MonitorConfig::LoadFromJson(const std::string& config_path) {
     config.input_file = input_file;
   }
 
+  bool all_channels;
+  if (GetBool(monitor_section, "all_channels", all_channels)) {
+    config.all_channels = all_channels;
+  }
+
+  std::string input_dir;
+  if (GetString(monitor_section, "input_dir", input_dir)) {
+    config.input_dir = input_dir;
+  }
+
+  std::string input_pattern;
+  if (GetString(monitor_section, "input_pattern", input_pattern)) {
+    config.input_pattern = input_pattern;
+  }
+
   double temp_num = 0.0;
+  if (GetNumber(monitor_section, "n_channels", temp_num)) {
+    config.n_channels = static_cast<int>(temp_num);
+  }
+
   if (GetNumber(monitor_section, "polling_interval_ms", temp_num)) {
     config.polling_interval_ms = static_cast<int>(temp_num);
   }
@@ -42,6 +61,19 @@ MonitorConfig MonitorConfig::LoadFromJson(const std::string& config_path) {
     config.rate_window_seconds = static_cast<int>(temp_num);
   }
 
+  if (GetNumber(monitor_section, "rate_history_seconds", temp_num)) {
+    config.rate_history_seconds = static_cast<int>(temp_num);
+  }
+
+  if (GetNumber(monitor_section, "rate_drop_fraction", temp_num)) {
+    config.rate_drop_fraction = static_cast<float>(temp_num);
+  }
+
+  std::string rate_history_file;
+  if (GetString(monitor_section, "rate_history_file", rate_history_file)) {
+    config.rate_history_file = rate_history_file;
+  }
+
   // QA settings
   bool qa_enabled;
   if (GetBool(monitor_section, "qa_enabled", qa_enabled)) {
@@ -52,6 +84,10 @@ MonitorConfig MonitorConfig::LoadFromJson(const std::string& config_path) {
     config.qa_sampling_interval = static_cast<int>(temp_num);
   }
 
+  if (GetNumber(monitor_section, "qa_batch_events", temp_num)) {
+    config.qa_batch_events = static_cast<int>(temp_num);
+  }
+
   if (GetNumber(monitor_section, "qa_pedestal_samples", temp_num)) {
     config.qa_pedestal_samples = static_cast<int>(temp_num);
   }
@@ -87,5 +123,32 @@ MonitorConfig MonitorConfig::LoadFromJson(const std::string& config_path) {
     config.log_file = log_file;
   }
 
+  if (GetNumber(monitor_section, "log_queue_size", temp_num)) {
+    config.log_queue_size = static_cast<int>(temp_num);
+  }
+
+  if (GetNumber(monitor_section, "log_suppress_seconds", temp_num)) {
+    config.log_suppress_seconds = static_cast<int>(temp_num);
+  }
+
+  // Status endpoint
+  if (GetNumber(monitor_section, "status_port", temp_num)) {
+    config.status_port = static_cast<int>(temp_num);
+  }
+
+  std::string status_address;
+  if (GetString(monitor_section, "status_address", status_address)) {
+    config.status_address = status_address;
+  }
+
+  if (GetNumber(monitor_section, "status_interval_ms", temp_num)) {
+    config.status_interval_ms = static_cast<int>(temp_num);
+  }
+
+  std::string status_name;
+  if (GetString(monitor_section, "status_name", status_name)) {
+    config.status_name = status_name;
+  }
+
   return config;
 }
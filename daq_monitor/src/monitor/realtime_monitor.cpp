@@ -4,12 +4,29 @@
 #include <algorithm>
 #include <cctype>
 #include <cmath>
+#include <cstdio>
+#include <cstring>
+#include <ctime>
 #include <iomanip>
 #include <iostream>
 #include <sstream>
 #include <sys/stat.h>
 #include <thread>
 
+// Rate bins are filled by the time an event is read, not by its trigger time.
+// Poll well below the 1 s bin width so a bin only sees a few percent of
+// read jitter, and only report a stall after several empty bins in a row.
+static const int kMaxRatePollMs = 100;
+static const int64_t kStallBins = 3;
+
+// Format a unix time as local time
+static std::string FormatLocalTime(int64_t unix_time, const char* format) {
+  std::time_t time = static_cast<std::time_t>(unix_time);
+  std::stringstream ss;
+  ss << std::put_time(std::localtime(&time), format);
+  return ss.str();
+}
+
 // Utility function to check if file exists
 bool FileExists(const std::string& path) {
   struct stat buffer;
@@ -48,6 +65,22 @@ std::string WaveformQA::GetStatusString() const {
   return ss.str();
 }
 
+std::string WaveformQA::GetIssueKey() const {
+  std::string key;
+  if (baseline_status != QAStatus::OK) {
+    key += "baseline";
+  }
+  if (range_status != QAStatus::OK) {
+    key += key.empty() ? "range" : "+range";
+  }
+  if (noise_status != QAStatus::OK) {
+    key += key.empty() ? "noise" : "+noise";
+  }
+  bool error = baseline_status == QAStatus::ERROR || range_status == QAStatus::ERROR ||
+               noise_status == QAStatus::ERROR;
+  return key + (error ? " ERROR" : " WARNING");
+}
+
 // QASummary implementation
 void QASummary::Update(const WaveformQA& qa) {
   total_checked++;
@@ -67,9 +100,25 @@ void QASummary::Update(const WaveformQA& qa) {
   avg_noise = avg_noise * (1.0f - alpha) + qa.noise_estimate * alpha;
 }
 
+// RateBin implementation
+std::string RateBin::CsvHeader() {
+  return "unix_time,local_time,events,first_event,last_event,missing_events,gap,drop,stall";
+}
+
+std::string RateBin::ToCsv() const {
+  std::stringstream ss;
+  ss << unix_time << "," << FormatLocalTime(unix_time, "%Y-%m-%d %H:%M:%S") << ","
+     << events << "," << first_event << "," << last_event << "," << missing_events << ","
+     << ((flags & RATE_GAP) ? 1 : 0) << "," << ((flags & RATE_DROP) ? 1 : 0) << ","
+     << ((flags & RATE_STALL) ? 1 : 0);
+  return ss.str();
+}
+
 // RateCalculator implementation
-RateCalculator::RateCalculator(int window_seconds)
-    : window_size_(window_seconds) {}
+RateCalculator::RateCalculator(int window_seconds, int history_seconds, float drop_fraction)
+    : window_size_(window_seconds),
+      bins_capacity_(static_cast<size_t>(std::max(history_seconds, 1))),
+      drop_fraction_(drop_fraction) {}
 
 void RateCalculator::RecordEvent(uint32_t event_number,
                                  std::chrono::steady_clock::time_point time) {
@@ -80,6 +129,92 @@ void RateCalculator::RecordEvent(uint32_t event_number,
   while (!history_.empty() && history_.front().first < cutoff) {
     history_.pop_front();
   }
+
+  // 1 s time series (wall clock, to correlate with beam conditions)
+  auto now = std::chrono::system_clock::now();
+  if (!has_current_) {
+    current_ = RateBin();
+    current_.unix_time = std::chrono::system_clock::to_time_t(now);
+    series_start_ = current_.unix_time;
+    has_current_ = true;
+  } else {
+    Tick(now);
+  }
+
+  if (has_last_event_ && event_number > last_event_ && event_number - last_event_ > 1) {
+    current_.missing_events += event_number - last_event_ - 1;
+    current_.flags |= RATE_GAP;
+  }
+  if (current_.events == 0) {
+    current_.first_event = event_number;
+  }
+  current_.last_event = event_number;
+  current_.events++;
+  last_event_ = event_number;
+  has_last_event_ = true;
+}
+
+void RateCalculator::Tick(std::chrono::system_clock::time_point now) {
+  if (!has_current_) {
+    return;  // Nothing recorded yet
+  }
+  int64_t second = std::chrono::system_clock::to_time_t(now);
+  while (current_.unix_time < second) {
+    int64_t next = current_.unix_time + 1;
+    CloseCurrent();
+    // A pause longer than the ring would only produce bins that are dropped again
+    next = std::max<int64_t>(next, second - static_cast<int64_t>(bins_capacity_));
+    current_ = RateBin();
+    current_.unix_time = next;
+  }
+}
+
+void RateCalculator::CloseCurrent() {
+  double recent = RecentRate();
+  if (current_.events == 0) {
+    current_.flags |= RATE_STALL;
+  } else if (recent >= 1.0 && current_.events < drop_fraction_ * recent) {
+    current_.flags |= RATE_DROP;
+  }
+
+  if (bins_.size() < bins_capacity_) {
+    bins_.push_back(current_);
+  } else {
+    bins_[bins_next_] = current_;
+  }
+  bins_next_ = (bins_next_ + 1) % bins_capacity_;
+  bins_count_ = std::min(bins_count_ + 1, bins_capacity_);
+  closed_.push_back(current_);
+}
+
+double RateCalculator::RecentRate() const {
+  // The first second is partial and also holds any backlog read at startup
+  size_t n = std::min(bins_count_, static_cast<size_t>(window_size_.count()));
+  size_t used = 0;
+  uint64_t events = 0;
+  for (size_t k = 0; k < n; ++k) {
+    const RateBin& bin = bins_[(bins_next_ + bins_capacity_ - 1 - k) % bins_capacity_];
+    if (bin.unix_time != series_start_) {
+      events += bin.events;
+      used++;
+    }
+  }
+  return used > 0 ? static_cast<double>(events) / used : 0.0;
+}
+
+std::vector<RateBin> RateCalculator::TakeClosedBins() {
+  std::vector<RateBin> closed;
+  closed.swap(closed_);
+  return closed;
+}
+
+std::vector<RateBin> RateCalculator::GetHistory() const {
+  std::vector<RateBin> history;
+  history.reserve(bins_count_);
+  for (size_t k = bins_count_; k > 0; --k) {
+    history.push_back(bins_[(bins_next_ + bins_capacity_ - k) % bins_capacity_]);
+  }
+  return history;
 }
 
 double RateCalculator::GetRate() const {
@@ -96,6 +231,27 @@ double RateCalculator::GetRate() const {
   return event_span / time_span;
 }
 
+// IFileMonitor default block reader
+size_t IFileMonitor::ReadEventBlock(size_t max_events, std::vector<uint32_t>& event_nums,
+                                    std::vector<float>& samples, size_t& nsamples) {
+  event_nums.clear();
+  samples.clear();
+  nsamples = 0;
+
+  uint32_t event_num;
+  std::vector<float> waveform;
+  while (event_nums.size() < max_events && ReadNextEvent(event_num, waveform)) {
+    if (event_nums.empty()) {
+      nsamples = waveform.size();
+    }
+    // Keep the block rectangular if a record length changes mid-file
+    waveform.resize(nsamples, waveform.empty() ? 0.0f : waveform.back());
+    event_nums.push_back(event_num);
+    samples.insert(samples.end(), waveform.begin(), waveform.end());
+  }
+  return event_nums.size();
+}
+
 // BinaryFileMonitor implementation
 BinaryFileMonitor::BinaryFileMonitor(const std::string& file_path)
     : file_path_(file_path), last_position_(0), has_new_data_(false),
@@ -232,6 +388,81 @@ bool BinaryFileMonitor::ReadNextEvent(uint32_t& event_num, std::vector<float>& w
   return true;
 }
 
+size_t BinaryFileMonitor::ReadEventBlock(size_t max_events, std::vector<uint32_t>& event_nums,
+                                         std::vector<float>& samples, size_t& nsamples) {
+  event_nums.clear();
+  samples.clear();
+  nsamples = 0;
+  if (!has_new_data_ || !file_.is_open() || max_events == 0) {
+    return 0;
+  }
+
+  // One stat() and one read() per block instead of per event
+  struct stat file_stat;
+  if (stat(file_path_.c_str(), &file_stat) != 0) {
+    has_new_data_ = false;
+    return 0;
+  }
+
+  std::streampos start = file_.tellg();
+  ChannelHeader header;
+  if (static_cast<std::streamoff>(file_stat.st_size) - start < static_cast<std::streamoff>(HEADER_BYTES) ||
+      !ReadHeader(file_, header)) {
+    file_.clear();
+    file_.seekg(start);
+    has_new_data_ = false;
+    return 0;
+  }
+  file_.seekg(start);
+
+  if (header.eventSize <= HEADER_BYTES || (header.eventSize - HEADER_BYTES) % sizeof(float) != 0) {
+    std::cerr << "\nError: Invalid event size" << std::endl;
+    has_new_data_ = false;
+    return 0;
+  }
+
+  // Only complete events; a partial one is picked up after the next CheckNewData()
+  uint64_t available = static_cast<uint64_t>(static_cast<std::streamoff>(file_stat.st_size) - start);
+  size_t n_events = static_cast<size_t>(std::min<uint64_t>(max_events, available / header.eventSize));
+  if (n_events == 0) {
+    has_new_data_ = false;
+    return 0;
+  }
+
+  block_buffer_.resize(n_events * header.eventSize);
+  file_.read(block_buffer_.data(), block_buffer_.size());
+  if (file_.gcount() != static_cast<std::streamsize>(block_buffer_.size())) {
+    file_.clear();
+    file_.seekg(start);
+    has_new_data_ = false;
+    return 0;
+  }
+
+  nsamples = (header.eventSize - HEADER_BYTES) / sizeof(float);
+  event_nums.reserve(n_events);
+  samples.resize(n_events * nsamples);
+
+  size_t n_read = 0;
+  for (; n_read < n_events; ++n_read) {
+    const char* record = block_buffer_.data() + n_read * header.eventSize;
+    uint32_t words[HEADER_WORDS];
+    std::memcpy(words, record, HEADER_BYTES);
+    if (words[0] != header.eventSize) {
+      break;  // Event size changed: the rest starts the next block
+    }
+    event_nums.push_back(words[4]);
+    std::memcpy(&samples[n_read * nsamples], record + HEADER_BYTES, header.eventSize - HEADER_BYTES);
+  }
+  samples.resize(n_read * nsamples);
+
+  last_position_ = start + static_cast<std::streamoff>(n_read * header.eventSize);
+  file_.clear();
+  file_.seekg(last_position_);
+  has_new_data_ = (static_cast<std::streampos>(file_stat.st_size) > last_position_);
+
+  return n_read;
+}
+
 // AsciiFileMonitor implementation
 AsciiFileMonitor::AsciiFileMonitor(const std::string& file_path)
     : file_path_(file_path), last_file_size_(0), next_event_index_(0) {}
@@ -299,37 +530,61 @@ bool AsciiFileMonitor::ReloadFile() {
   return false;
 }
 
+// ChannelState implementation
+char ChannelState::StatusChar() const {
+  if (events_read == 0) {
+    return '-';
+  }
+  if (!has_qa || !last_qa.HasIssues()) {
+    return '.';
+  }
+  if (last_qa.baseline_status == QAStatus::ERROR || last_qa.range_status == QAStatus::ERROR ||
+      last_qa.noise_status == QAStatus::ERROR) {
+    return 'E';
+  }
+  return 'W';
+}
+
 // QAChecker implementation
 QAChecker::QAChecker(const MonitorConfig& config) : config_(config) {}
 
 WaveformQA QAChecker::PerformChecks(const std::vector<float>& waveform) {
+  return PerformChecks(waveform.data(), waveform.size());
+}
+
+WaveformQA QAChecker::PerformChecks(const float* waveform, size_t nsamples) {
   WaveformQA qa;
 
-  if (waveform.empty()) {
+  if (nsamples == 0) {
     return qa;
   }
 
-  // Calculate baseline (mean of first N samples)
-  int n_pedestal = std::min(config_.qa_pedestal_samples, static_cast<int>(waveform.size()));
-  float sum = 0.0f;
-  for (int i = 0; i < n_pedestal; i++) {
-    sum += waveform[i];
-  }
-  qa.baseline_mean = sum / n_pedestal;
-
-  // Calculate baseline RMS (noise estimate)
-  float variance = 0.0f;
-  for (int i = 0; i < n_pedestal; i++) {
-    float diff = waveform[i] - qa.baseline_mean;
-    variance += diff * diff;
+  // Baseline mean and RMS of the first N samples in one pass. Sums are taken
+  // relative to the first sample so that sum - sum_sq stays accurate at a
+  // baseline of a few thousand counts.
+  size_t n_pedestal = std::min(static_cast<size_t>(std::max(config_.qa_pedestal_samples, 1)), nsamples);
+  const float shift = waveform[0];
+  double sum = 0.0;
+  double sum_sq = 0.0;
+  for (size_t i = 0; i < n_pedestal; i++) {
+    double diff = waveform[i] - shift;
+    sum += diff;
+    sum_sq += diff * diff;
   }
-  qa.baseline_rms = std::sqrt(variance / n_pedestal);
+  double mean = sum / n_pedestal;
+  qa.baseline_mean = static_cast<float>(shift + mean);
+  qa.baseline_rms = static_cast<float>(std::sqrt(std::max(sum_sq / n_pedestal - mean * mean, 0.0)));
   qa.noise_estimate = qa.baseline_rms;
 
   // Find min/max of waveform
-  auto [min_it, max_it] = std::minmax_element(waveform.begin(), waveform.end());
-  qa.waveform_min = *min_it;
-  qa.waveform_max = *max_it;
+  float wf_min = waveform[0];
+  float wf_max = waveform[0];
+  for (size_t i = 1; i < nsamples; i++) {
+    wf_min = std::min(wf_min, waveform[i]);
+    wf_max = std::max(wf_max, waveform[i]);
+  }
+  qa.waveform_min = wf_min;
+  qa.waveform_max = wf_max;
 
   // Perform QA checks
   qa.baseline_status = CheckBaseline(qa.baseline_mean);
@@ -339,6 +594,17 @@ WaveformQA QAChecker::PerformChecks(const std::vector<float>& waveform) {
   return qa;
 }
 
+void QAChecker::PerformBatchChecks(const float* block, size_t n_events, size_t nsamples,
+                                   size_t first, size_t step, std::vector<WaveformQA>& results) {
+  results.clear();
+  if (step == 0) {
+    step = 1;
+  }
+  for (size_t i = first; i < n_events; i += step) {
+    results.push_back(PerformChecks(block + i * nsamples, nsamples));
+  }
+}
+
 QAStatus QAChecker::CheckBaseline(float baseline_mean) {
   float deviation = std::abs(baseline_mean - config_.qa_baseline_target);
 
@@ -417,7 +683,8 @@ bool DisplayManager::ShouldUpdate(const EventStats& stats, int events_since_upda
 }
 
 void DisplayManager::PrintStatus(const EventStats& stats, const RateCalculator& rate_calc,
-                                  const QASummary& qa_summary, bool qa_enabled) {
+                                  const QASummary& qa_summary, bool qa_enabled,
+                                  const std::string& channel_map) {
   auto now = std::chrono::steady_clock::now();
   auto runtime = std::chrono::duration_cast<std::chrono::seconds>(now - stats.start_time);
 
@@ -435,21 +702,28 @@ void DisplayManager::PrintStatus(const EventStats& stats, const RateCalculator&
               << " ERR=" << qa_summary.error_count << " | ";
   }
 
+  if (!channel_map.empty()) {
+    std::cout << "CH: " << channel_map << " | ";
+  }
+
   std::cout << "Runtime: " << FormatDuration(runtime)
             << std::flush;
 
   last_display_update_ = now;
 }
 
-void DisplayManager::PrintWarning(uint32_t event_number, const WaveformQA& qa) {
+void DisplayManager::PrintWarning(uint32_t event_number, const WaveformQA& qa, int channel) {
   std::string severity = "WARNING";
   if (qa.baseline_status == QAStatus::ERROR || qa.range_status == QAStatus::ERROR ||
       qa.noise_status == QAStatus::ERROR) {
     severity = "ERROR";
   }
 
-  std::cout << "\n[" << severity << "] Event " << event_number << ": "
-            << qa.GetStatusString() << std::endl;
+  std::cout << "\n[" << severity << "] ";
+  if (channel >= 0) {
+    std::cout << "CH" << std::setfill('0') << std::setw(2) << channel << std::setfill(' ') << " ";
+  }
+  std::cout << "Event " << event_number << ": " << qa.GetStatusString() << std::endl;
 }
 
 void DisplayManager::PrintFinalSummary(const EventStats& stats, const QASummary& qa_summary, bool qa_enabled) {
@@ -484,21 +758,107 @@ void DisplayManager::PrintFinalSummary(const EventStats& stats, const QASummary&
   std::cout << "═════════════════════════════════════════════════════\n\n";
 }
 
+void DisplayManager::PrintMessage(const std::string& severity, const std::string& message) {
+  std::cout << "\n[" << severity << "] " << message << std::endl;
+}
+
+void DisplayManager::PrintChannelSummary(const std::vector<ChannelState>& channels, bool qa_enabled) {
+  std::cout << "  Channel   Events   Latest";
+  if (qa_enabled) {
+    std::cout << "   QA OK  WARN   ERR   Baseline   Noise";
+  }
+  std::cout << "\n";
+
+  for (const auto& ch : channels) {
+    std::cout << "  CH" << std::setfill('0') << std::setw(2) << ch.channel << std::setfill(' ')
+              << "   " << std::setw(8) << ch.events_read
+              << " " << std::setw(8) << ch.latest_event_number;
+    if (qa_enabled) {
+      const QASummary& qa = ch.qa_summary;
+      std::cout << "   " << std::setw(5) << qa.ok_count
+                << " " << std::setw(5) << qa.warning_count
+                << " " << std::setw(5) << qa.error_count
+                << " " << std::fixed << std::setprecision(1) << std::setw(10) << qa.avg_baseline
+                << " " << std::setw(7) << qa.avg_noise;
+    }
+    std::cout << (ch.events_read == 0 ? "   NO DATA" : "") << "\n";
+  }
+  std::cout << "═════════════════════════════════════════════════════\n\n";
+}
+
 // RealtimeMonitor implementation
 RealtimeMonitor::RealtimeMonitor(const MonitorConfig& config)
     : config_(config),
       file_type_(FileType::BINARY),
-      rate_calc_(config.rate_window_seconds),
-      qa_checker_(config) {
+      rate_calc_(config.rate_window_seconds, config.rate_history_seconds, config.rate_drop_fraction),
+      qa_checker_(config),
+      logger_(static_cast<size_t>(std::max(config.log_queue_size, 1)), config.log_suppress_seconds) {
   display_.SetUpdateInterval(config.display_update_interval_ms);
 
-  // Detect file type and create appropriate monitor
-  file_type_ = DetectFileType(config.input_file);
-  if (file_type_ == FileType::ASCII) {
-    file_monitor_ = std::make_unique<AsciiFileMonitor>(config.input_file);
-  } else {
-    file_monitor_ = std::make_unique<BinaryFileMonitor>(config.input_file);
+  // One reader per input file (a single file unless all_channels is set)
+  std::vector<std::string> files = BuildInputFiles();
+  file_type_ = DetectFileType(files.front());
+  channels_.resize(files.size());
+  for (size_t i = 0; i < files.size(); ++i) {
+    ChannelState& channel = channels_[i];
+    channel.channel = config_.all_channels ? static_cast<int>(i) : -1;
+    channel.file_path = files[i];
+    if (file_type_ == FileType::ASCII) {
+      channel.monitor = std::make_unique<AsciiFileMonitor>(files[i]);
+    } else {
+      channel.monitor = std::make_unique<BinaryFileMonitor>(files[i]);
+    }
   }
+
+  // Name in the status JSON: the DAQ directory (e.g. daq00) unless configured
+  status_name_ = config_.status_name;
+  if (status_name_.empty()) {
+    std::string dir = files.front().substr(0, files.front().find_last_of('/') + 1);
+    while (dir.size() > 1 && dir.back() == '/') {
+      dir.pop_back();
+    }
+    size_t slash = dir.find_last_of('/');
+    status_name_ = (slash == std::string::npos) ? dir : dir.substr(slash + 1);
+    if (status_name_.empty() || status_name_ == ".") {
+      status_name_ = "monitor";
+    }
+  }
+}
+
+std::vector<std::string> RealtimeMonitor::BuildInputFiles() const {
+  if (!config_.all_channels) {
+    return {config_.input_file};
+  }
+
+  std::string dir = config_.input_dir;
+  if (dir.empty()) {
+    size_t slash = config_.input_file.find_last_of('/');
+    dir = (slash == std::string::npos) ? "." : config_.input_file.substr(0, slash);
+  }
+
+  std::vector<std::string> files;
+  for (int ch = 0; ch < std::max(1, config_.n_channels); ++ch) {
+    char name[256];
+    std::snprintf(name, sizeof(name), config_.input_pattern.c_str(), ch);
+    files.push_back(dir + "/" + name);
+  }
+  return files;
+}
+
+bool RealtimeMonitor::OpenChannel(ChannelState& channel) {
+  if (channel.opened) {
+    return true;
+  }
+  // Channels may appear a little after channel 0; retried on every poll
+  if (!FileExists(channel.file_path)) {
+    return false;
+  }
+  if (!channel.monitor->Open()) {
+    std::cerr << "\nError: Cannot open file " << channel.file_path << std::endl;
+    return false;
+  }
+  channel.opened = true;
+  return true;
 }
 
 FileType RealtimeMonitor::DetectFileType(const std::string& file_path) const {
@@ -519,9 +879,10 @@ FileType RealtimeMonitor::DetectFileType(const std::string& file_path) const {
 }
 
 bool RealtimeMonitor::Initialize() {
-  // Wait for file to exist
-  while (!FileExists(config_.input_file) && running_) {
-    std::cout << "Waiting for DAQ to start (" << config_.input_file << ")...\r" << std::flush;
+  // Wait for the first (reference) file to exist
+  const std::string& reference_file = channels_.front().file_path;
+  while (!FileExists(reference_file) && running_) {
+    std::cout << "Waiting for DAQ to start (" << reference_file << ")...\r" << std::flush;
     std::this_thread::sleep_for(std::chrono::milliseconds(config_.polling_interval_ms));
   }
 
@@ -529,97 +890,303 @@ bool RealtimeMonitor::Initialize() {
     return false;
   }
 
-  // Open file
-  if (!file_monitor_->Open()) {
-    std::cerr << "\nError: Cannot open file " << config_.input_file << std::endl;
+  // Open files
+  if (!OpenChannel(channels_.front())) {
     return false;
   }
+  for (auto& channel : channels_) {
+    OpenChannel(channel);
+  }
 
-  // Open log file if enabled
+  // Open log file if enabled; lines are written by the logger thread
   if (config_.log_warnings) {
-    log_file_.open(config_.log_file, std::ios::app);
-    if (log_file_.is_open()) {
-      auto now = std::chrono::system_clock::now();
-      auto time = std::chrono::system_clock::to_time_t(now);
-      log_file_ << "\n[" << std::put_time(std::localtime(&time), "%Y-%m-%d %H:%M:%S")
-                << "] Monitor started, file: " << config_.input_file
-                << " (type: " << (file_type_ == FileType::ASCII ? "ASCII" : "BINARY") << ")"
-                << std::endl;
+    if (logger_.Open(config_.log_file)) {
+      logger_.Log(std::string("Monitor started, file: ") + reference_file +
+                  (channels_.size() > 1 ? " (+" + std::to_string(channels_.size() - 1) + " channels)" : "") +
+                  " (type: " + (file_type_ == FileType::ASCII ? "ASCII" : "BINARY") + ")");
+    } else {
+      std::cerr << "Warning: cannot open log file " << config_.log_file << std::endl;
+    }
+  }
+
+  // Rate time series, one line per second, appended for the whole run
+  if (!config_.rate_history_file.empty()) {
+    rate_file_.open(config_.rate_history_file, std::ios::app);
+    if (rate_file_.is_open() && rate_file_.tellp() == 0) {
+      rate_file_ << RateBin::CsvHeader() << '\n';
+    } else if (!rate_file_.is_open()) {
+      std::cerr << "Warning: cannot open rate history file " << config_.rate_history_file << std::endl;
     }
   }
 
   stats_.start_time = std::chrono::steady_clock::now();
   stats_.last_update_time = stats_.start_time;
 
+  // JSON status for status_aggregator.py instead of reading this terminal
+  if (config_.status_port > 0) {
+    PublishStatus(true);
+    if (status_server_.Start(config_.status_address, config_.status_port)) {
+      std::cout << "Status: http://" << config_.status_address << ":" << config_.status_port
+                << "/status\n";
+    }
+  }
+
   std::cout << "\nMonitoring started (" << (file_type_ == FileType::ASCII ? "ASCII" : "BINARY")
-            << " mode). Press Ctrl+C to stop.\n\n";
+            << " mode";
+  if (channels_.size() > 1) {
+    std::cout << ", " << channels_.size() << " channels";
+  }
+  std::cout << "). Press Ctrl+C to stop.\n\n";
   return true;
 }
 
 void RealtimeMonitor::Run() {
   while (running_) {
-    // Check for new data
-    if (file_monitor_->CheckNewData()) {
-      ProcessNewEvents();
+    // Check every channel for new data; channel 0 drives event statistics and rate
+    for (size_t i = 0; i < channels_.size() && running_; ++i) {
+      ChannelState& channel = channels_[i];
+      if (OpenChannel(channel) && channel.monitor->CheckNewData()) {
+        ProcessNewEvents(channel, i == 0);
+      }
     }
 
+    // Close finished seconds even when no events arrive (stalls)
+    rate_calc_.Tick(std::chrono::system_clock::now());
+    HandleRateBins();
+    PublishStatus();
+
     // Sleep until next poll
-    std::this_thread::sleep_for(std::chrono::milliseconds(config_.polling_interval_ms));
+    std::this_thread::sleep_for(
+        std::chrono::milliseconds(std::min(config_.polling_interval_ms, kMaxRatePollMs)));
   }
+
+  display_.PrintFinalSummary(stats_, qa_summary_, config_.qa_enabled);
+  if (channels_.size() > 1) {
+    display_.PrintChannelSummary(channels_, config_.qa_enabled);
+  }
+
+  // Write pending repeat counts and queued lines
+  logger_.Close();
+  status_server_.Stop();
 }
 
 void RealtimeMonitor::Stop() {
   running_ = false;
 }
 
-void RealtimeMonitor::ProcessNewEvents() {
-  uint32_t event_num;
-  std::vector<float> waveform;
+void RealtimeMonitor::ProcessNewEvents(ChannelState& channel, bool reference) {
+  const size_t batch = static_cast<size_t>(std::max(config_.qa_batch_events, 1));
+  const size_t interval = static_cast<size_t>(std::max(config_.qa_sampling_interval, 1));
+  std::vector<uint32_t> event_nums;
+  std::vector<float> block;
+  std::vector<WaveformQA> results;
+  size_t nsamples = 0;
 
-  while (running_ && file_monitor_->ReadNextEvent(event_num, waveform)) {
-    // Update statistics
-    stats_.UpdateEventNumber(event_num);
-    rate_calc_.RecordEvent(event_num, std::chrono::steady_clock::now());
-    events_since_last_update_++;
+  while (running_) {
+    size_t n_events = channel.monitor->ReadEventBlock(batch, event_nums, block, nsamples);
+    if (n_events == 0) {
+      break;
+    }
 
-    // Perform QA check (sampled)
-    if (config_.qa_enabled && stats_.total_events_read % config_.qa_sampling_interval == 0) {
-      PerformQACheck(waveform, event_num);
+    // QA every qa_sampling_interval-th event of the channel (all of them when 1)
+    size_t first = (interval - (channel.events_read + 1) % interval) % interval;
+    if (config_.qa_enabled) {
+      qa_checker_.PerformBatchChecks(block.data(), n_events, nsamples, first, interval, results);
     }
 
-    // Update display
-    if (display_.ShouldUpdate(stats_, events_since_last_update_)) {
-      display_.PrintStatus(stats_, rate_calc_, qa_summary_, config_.qa_enabled);
-      events_since_last_update_ = 0;
+    for (size_t i = 0; i < n_events; ++i) {
+      ProcessEvent(channel, reference, event_nums[i]);
+      if (config_.qa_enabled && i >= first && (i - first) % interval == 0) {
+        RecordQA(channel, results[(i - first) / interval], event_nums[i]);
+      }
     }
   }
 }
 
-void RealtimeMonitor::PerformQACheck(const std::vector<float>& waveform, uint32_t event_num) {
-  WaveformQA qa = qa_checker_.PerformChecks(waveform);
+void RealtimeMonitor::ProcessEvent(ChannelState& channel, bool reference, uint32_t event_num) {
+  channel.events_read++;
+  channel.latest_event_number = event_num;
+
+  if (!reference) {
+    return;
+  }
+
+  // Update statistics
+  stats_.UpdateEventNumber(event_num);
+  rate_calc_.RecordEvent(event_num, std::chrono::steady_clock::now());
+  events_since_last_update_++;
+
+  // Update display
+  if (display_.ShouldUpdate(stats_, events_since_last_update_)) {
+    display_.PrintStatus(stats_, rate_calc_, qa_summary_, config_.qa_enabled, BuildChannelMap());
+    events_since_last_update_ = 0;
+  }
+}
+
+void RealtimeMonitor::RecordQA(ChannelState& channel, const WaveformQA& qa, uint32_t event_num) {
   qa_summary_.Update(qa);
+  channel.qa_summary.Update(qa);
+  channel.last_qa = qa;
+  channel.has_qa = true;
 
   if (qa.HasIssues()) {
-    display_.PrintWarning(event_num, qa);
-    LogWarning(event_num, qa);
+    LogWarning(event_num, qa, channel.channel);
   }
 }
 
-void RealtimeMonitor::LogWarning(uint32_t event_number, const WaveformQA& qa) {
-  if (!log_file_.is_open()) {
+void RealtimeMonitor::HandleRateBins() {
+  // Seconds without events before a stall is reported live
+  const int64_t kStallReportSeconds = 5;
+
+  std::vector<RateBin> bins = rate_calc_.TakeClosedBins();
+  if (!bins.empty()) {
+    last_rate_bin_ = bins.back();
+  }
+  for (const RateBin& bin : bins) {
+    if (rate_file_.is_open()) {
+      rate_file_ << bin.ToCsv() << '\n';
+    }
+
+    if (bin.flags & RATE_STALL) {
+      if (stall_start_ == 0) {
+        stall_start_ = bin.unix_time;
+      }
+      if (bin.unix_time - stall_start_ + 1 == kStallReportSeconds) {
+        std::string message = "No events since " + FormatLocalTime(stall_start_, "%H:%M:%S");
+        display_.PrintMessage("WARNING", message);
+        LogMessage("WARNING - " + message);
+      }
+      continue;
+    }
+
+    if (stall_start_ != 0) {
+      int64_t seconds = bin.unix_time - stall_start_;
+      if (seconds >= kStallReportSeconds) {
+        std::string message = "Events resumed after " + std::to_string(seconds) + " s stall (from " +
+                              FormatLocalTime(stall_start_, "%H:%M:%S") + ")";
+        display_.PrintMessage("INFO", message);
+        LogMessage("INFO - " + message);
+      }
+      stall_start_ = 0;
+    }
+
+    bool drop = (bin.flags & RATE_DROP) != 0;
+    if (drop && !in_rate_drop_) {
+      std::string message = "Rate drop at " + FormatLocalTime(bin.unix_time, "%H:%M:%S") + ": " +
+                            std::to_string(bin.events) + " evt/s";
+      display_.PrintMessage("WARNING", message);
+      LogMessage("WARNING - " + message);
+    }
+    in_rate_drop_ = drop;
+  }
+
+  if (rate_file_.is_open() && !bins.empty()) {
+    rate_file_.flush();
+  }
+}
+
+void RealtimeMonitor::PublishStatus(bool force) {
+  if (config_.status_port <= 0) {
     return;
   }
+  auto now = std::chrono::steady_clock::now();
+  if (!force && now - last_status_update_ < std::chrono::milliseconds(config_.status_interval_ms)) {
+    return;
+  }
+  last_status_update_ = now;
+  status_server_.Publish(BuildStatusJson());
+}
+
+std::string RealtimeMonitor::BuildStatusJson() const {
+  auto now = std::chrono::steady_clock::now();
+  auto runtime = std::chrono::duration<double>(now - stats_.start_time).count();
+  auto idle = std::chrono::duration<double>(now - stats_.last_update_time).count();
+
+  std::stringstream ss;
+  ss << std::fixed << std::setprecision(2);
+  ss << "{\"name\": \"" << JsonEscape(status_name_) << "\", \"source\": \"monitor_realtime\""
+     << ", \"time\": " << std::chrono::system_clock::to_time_t(std::chrono::system_clock::now())
+     << ", \"runtime_s\": " << runtime
+     << ", \"input\": \"" << JsonEscape(channels_.front().file_path) << "\"";
+
+  ss << ", \"events\": {\"total\": " << stats_.total_events_read
+     << ", \"latest\": " << stats_.latest_event_number
+     << ", \"gaps\": " << stats_.event_gaps_detected
+     << ", \"corrupted\": " << stats_.corrupted_events
+     << ", \"idle_s\": " << (stats_.total_events_read > 0 ? idle : runtime) << "}";
+
+  ss << ", \"rate\": {\"current\": " << rate_calc_.GetRate()
+     << ", \"window_s\": " << config_.rate_window_seconds
+     << ", \"last_second\": " << last_rate_bin_.events
+     << ", \"drop\": " << (in_rate_drop_ ? "true" : "false")
+     << ", \"stalled_since\": ";
+  if (stall_start_ != 0 && last_rate_bin_.unix_time - stall_start_ + 1 >= kStallBins) {
+    ss << stall_start_;
+  } else {
+    ss << "null";
+  }
+  ss << "}";
+
+  ss << ", \"qa\": {\"enabled\": " << (config_.qa_enabled ? "true" : "false")
+     << ", \"checked\": " << qa_summary_.total_checked
+     << ", \"ok\": " << qa_summary_.ok_count
+     << ", \"warning\": " << qa_summary_.warning_count
+     << ", \"error\": " << qa_summary_.error_count
+     << ", \"avg_baseline\": " << qa_summary_.avg_baseline
+     << ", \"avg_noise\": " << qa_summary_.avg_noise << "}";
+
+  ss << ", \"channels\": [";
+  for (size_t i = 0; i < channels_.size(); ++i) {
+    const ChannelState& channel = channels_[i];
+    const char* status = "OK";
+    switch (channel.StatusChar()) {
+      case '-': status = "NO_DATA"; break;
+      case 'W': status = "WARNING"; break;
+      case 'E': status = "ERROR"; break;
+      default: break;
+    }
+    ss << (i > 0 ? ", " : "") << "{\"channel\": " << channel.channel
+       << ", \"events\": " << channel.events_read
+       << ", \"latest\": " << channel.latest_event_number
+       << ", \"status\": \"" << status << "\"}";
+  }
+  ss << "]}";
+  return ss.str();
+}
+
+std::string RealtimeMonitor::BuildChannelMap() const {
+  if (channels_.size() <= 1) {
+    return "";
+  }
+  std::string map;
+  for (const auto& channel : channels_) {
+    map += channel.StatusChar();
+  }
+  return map;
+}
+
+void RealtimeMonitor::LogMessage(const std::string& message) {
+  logger_.Log(message);
+}
+
+void RealtimeMonitor::LogWarning(uint32_t event_number, const WaveformQA& qa, int channel) {
+  // With a bad DC offset every event is flagged: only the first of each channel and
+  // failure type is printed and logged per log_suppress_seconds, the rest are counted
+  std::stringstream prefix;
+  if (channel >= 0) {
+    prefix << "CH" << std::setfill('0') << std::setw(2) << channel << " ";
+  }
+  std::string key = prefix.str() + qa.GetIssueKey();
 
   std::string severity = "WARNING";
   if (qa.baseline_status == QAStatus::ERROR || qa.range_status == QAStatus::ERROR ||
       qa.noise_status == QAStatus::ERROR) {
     severity = "ERROR";
   }
+  std::string message = prefix.str() + "Event " + std::to_string(event_number) + ": " + severity +
+                        " - " + qa.GetStatusString();
 
-  auto now = std::chrono::system_clock::now();
-  auto time = std::chrono::system_clock::to_time_t(now);
-
-  log_file_ << "[" << std::put_time(std::localtime(&time), "%Y-%m-%d %H:%M:%S")
-            << "] Event " << event_number << ": " << severity << " - "
-            << qa.GetStatusString() << std::endl;
+  if (logger_.LogRepeated(key, message)) {
+    display_.PrintWarning(event_number, qa, channel);
+  }
 }
@@ -0,0 +1,156 @@
+#include "monitor/status_server.h"
+
+#include <arpa/inet.h>
+#include <cerrno>
+#include <cstdio>
+#include <cstring>
+#include <iostream>
+#include <netinet/in.h>
+#include <poll.h>
+#include <sys/socket.h>
+#include <sys/time.h>
+#include <unistd.h>
+
+StatusServer::~StatusServer() {
+  Stop();
+}
+
+bool StatusServer::Start(const std::string& address, int port) {
+  if (IsRunning()) {
+    return true;
+  }
+
+  sockaddr_in addr{};
+  addr.sin_family = AF_INET;
+  addr.sin_port = htons(static_cast<uint16_t>(port));
+  if (inet_pton(AF_INET, address.c_str(), &addr.sin_addr) != 1) {
+    std::cerr << "Error: invalid status address " << address << std::endl;
+    return false;
+  }
+
+  listen_fd_ = socket(AF_INET, SOCK_STREAM | SOCK_CLOEXEC, 0);
+  if (listen_fd_ < 0) {
+    std::cerr << "Error: cannot create status socket: " << std::strerror(errno) << std::endl;
+    return false;
+  }
+  int reuse = 1;
+  setsockopt(listen_fd_, SOL_SOCKET, SO_REUSEADDR, &reuse, sizeof(reuse));
+
+  if (bind(listen_fd_, reinterpret_cast<sockaddr*>(&addr), sizeof(addr)) < 0 ||
+      listen(listen_fd_, 8) < 0) {
+    std::cerr << "Error: cannot listen on " << address << ":" << port << ": "
+              << std::strerror(errno) << std::endl;
+    close(listen_fd_);
+    listen_fd_ = -1;
+    return false;
+  }
+
+  stop_ = false;
+  thread_ = std::thread(&StatusServer::ServeLoop, this);
+  return true;
+}
+
+void StatusServer::Stop() {
+  if (!IsRunning()) {
+    return;
+  }
+  stop_ = true;
+  thread_.join();
+  close(listen_fd_);
+  listen_fd_ = -1;
+}
+
+void StatusServer::Publish(const std::string& json) {
+  std::lock_guard<std::mutex> lock(mutex_);
+  document_ = json;
+}
+
+void StatusServer::ServeLoop() {
+  pollfd pfd{listen_fd_, POLLIN, 0};
+  while (!stop_) {
+    // Short timeout so Stop() does not wait for a client
+    if (poll(&pfd, 1, 250) <= 0) {
+      continue;
+    }
+    int fd = accept4(listen_fd_, nullptr, nullptr, SOCK_CLOEXEC);
+    if (fd < 0) {
+      continue;
+    }
+    HandleClient(fd);
+    close(fd);
+  }
+}
+
+void StatusServer::HandleClient(int fd) {
+  // A slow or silent client must not hold up the others for long
+  timeval timeout{1, 0};
+  setsockopt(fd, SOL_SOCKET, SO_RCVTIMEO, &timeout, sizeof(timeout));
+  setsockopt(fd, SOL_SOCKET, SO_SNDTIMEO, &timeout, sizeof(timeout));
+
+  std::string request;
+  char buffer[1024];
+  while (request.find("\r\n\r\n") == std::string::npos && request.size() < 8192) {
+    ssize_t n = recv(fd, buffer, sizeof(buffer), 0);
+    if (n <= 0) {
+      break;
+    }
+    request.append(buffer, static_cast<size_t>(n));
+  }
+
+  std::string method, path;
+  size_t first_space = request.find(' ');
+  if (first_space != std::string::npos) {
+    method = request.substr(0, first_space);
+    size_t second_space = request.find(' ', first_space + 1);
+    path = request.substr(first_space + 1, second_space - first_space - 1);
+  }
+
+  std::string status = "200 OK";
+  std::string body;
+  if (method != "GET") {
+    status = "405 Method Not Allowed";
+    body = "{\"error\": \"only GET is supported\"}";
+  } else if (path == "/" || path == "/status") {
+    std::lock_guard<std::mutex> lock(mutex_);
+    body = document_;
+  } else {
+    status = "404 Not Found";
+    body = "{\"error\": \"unknown path, use /status\"}";
+  }
+
+  std::string response = "HTTP/1.0 " + status +
+                         "\r\nContent-Type: application/json\r\nCache-Control: no-store"
+                         "\r\nContent-Length: " + std::to_string(body.size()) +
+                         "\r\nConnection: close\r\n\r\n" + body;
+  size_t sent = 0;
+  while (sent < response.size()) {
+    ssize_t n = send(fd, response.data() + sent, response.size() - sent, MSG_NOSIGNAL);
+    if (n <= 0) {
+      break;
+    }
+    sent += static_cast<size_t>(n);
+  }
+}
+
+std::string JsonEscape(const std::string& text) {
+  std::string out;
+  out.reserve(text.size());
+  for (char c : text) {
+    switch (c) {
+      case '"': out += "\\\""; break;
+      case '\\': out += "\\\\"; break;
+      case '\n': out += "\\n"; break;
+      case '\r': out += "\\r"; break;
+      case '\t': out += "\\t"; break;
+      default:
+        if (static_cast<unsigned char>(c) < 0x20) {
+          char escaped[8];
+          std::snprintf(escaped, sizeof(escaped), "\\u%04x", c);
+          out += escaped;
+        } else {
+          out += c;
+        }
+    }
+  }
+  return out;
+}
@@ -25,6 +25,8 @@ void PrintUsage(const char* program_name) {
   std::cout << "Options:\n";
   std::cout << "  --config FILE       Path to configuration file (default: monitor_config.json)\n";
   std::cout << "  --file FILE         Path to input binary file (overrides config)\n";
+  std::cout << "  --all-channels      Monitor every channel file (wave_0.dat ... wave_15.dat)\n";
+  std::cout << "  --dir DIR           Directory of the channel files (implies --all-channels)\n";
   std::cout << "  --no-qa             Disable QA checks (header-only monitoring)\n";
   std::cout << "  --help              Display this help message\n\n";
   std::cout << "Examples:\n";
@@ -32,6 +34,8 @@ void PrintUsage(const char* program_name) {
   std::cout << "  " << program_name << "\n\n";
   std::cout << "  # Monitor specific file\n";
   std::cout << "  " << program_name << " --file ../Data/AC_LGAD_TEST/wave_0.dat\n\n";
+  std::cout << "  # Monitor all 16 channels of one digitizer\n";
+  std::cout << "  " << program_name << " --dir /data/000001/daq00\n\n";
   std::cout << "  # Monitor without QA checks (faster)\n";
   std::cout << "  " << program_name << " --no-qa\n\n";
   std::cout << "Signals:\n";
@@ -42,6 +46,8 @@ int main(int argc, char* argv[]) {
   // Default configuration file
   std::string config_file = "monitor_config.json";
   std::string override_file;
+  std::string override_dir;
+  bool all_channels = false;
   bool disable_qa = false;
 
   // Parse command-line arguments
@@ -55,6 +61,11 @@ int main(int argc, char* argv[]) {
       config_file = argv[++i];
     } else if (arg == "--file" && i + 1 < argc) {
       override_file = argv[++i];
+    } else if (arg == "--all-channels") {
+      all_channels = true;
+    } else if (arg == "--dir" && i + 1 < argc) {
+      override_dir = argv[++i];
+      all_channels = true;
     } else if (arg == "--no-qa") {
       disable_qa = true;
     } else {
@@ -72,12 +83,20 @@ int main(int argc, char* argv[]) {
     config.input_file = override_file;
   }
 
+  if (!override_dir.empty()) {
+    config.input_dir = override_dir;
+  }
+
+  if (all_channels) {
+    config.all_channels = true;
+  }
+
   if (disable_qa) {
     config.qa_enabled = false;
   }
 
   // Validate configuration
-  if (config.input_file.empty()) {
+  if (config.input_file.empty() && !(config.all_channels && !config.input_dir.empty())) {
     std::cerr << "Error: No input file specified in configuration or command line" << std::endl;
     std::cerr << "Use --file to specify an input file" << std::endl;
     return 1;
@@ -85,7 +104,12 @@ int main(int argc, char* argv[]) {
 
   std::cout << "CAEN DT5742 Real-Time Monitor\n";
   std::cout << "Configuration: " << config_file << "\n";
-  std::cout << "Input file: " << config.input_file << "\n";
+  if (config.all_channels) {
+    std::cout << "Input: " << config.n_channels << " channels ("
+              << (config.input_dir.empty() ? config.input_file : config.input_dir) << ")\n";
+  } else {
+    std::cout << "Input file: " << config.input_file << "\n";
+  }
   std::cout << "QA enabled: " << (config.qa_enabled ? "yes" : "no") << "\n";
 
   // Create monitor
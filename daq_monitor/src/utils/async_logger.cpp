@@ -0,0 +1,152 @@
+#include "utils/async_logger.h"
+
+#include <algorithm>
+#include <ctime>
+#include <iomanip>
+#include <sstream>
+
+AsyncLogger::AsyncLogger(size_t queue_size, int suppress_seconds, int flush_interval_ms)
+    : queue_size_(std::max<size_t>(queue_size, 1)),
+      suppress_window_(std::max(suppress_seconds, 0)),
+      flush_interval_(std::max(flush_interval_ms, 1)) {
+  queue_.reserve(queue_size_);
+}
+
+AsyncLogger::~AsyncLogger() {
+  Close();
+}
+
+bool AsyncLogger::Open(const std::string& path) {
+  if (IsOpen()) {
+    return true;
+  }
+  file_.open(path, std::ios::app);
+  if (!file_.is_open()) {
+    return false;
+  }
+  stop_ = false;
+  writer_ = std::thread(&AsyncLogger::WriterLoop, this);
+  return true;
+}
+
+void AsyncLogger::Close() {
+  if (!IsOpen()) {
+    return;
+  }
+  {
+    std::lock_guard<std::mutex> lock(mutex_);
+    stop_ = true;
+  }
+  wakeup_.notify_one();
+  writer_.join();
+  file_.close();
+}
+
+void AsyncLogger::Log(const std::string& message) {
+  if (!IsOpen()) {
+    return;
+  }
+  std::lock_guard<std::mutex> lock(mutex_);
+  Push(message);
+}
+
+bool AsyncLogger::LogRepeated(const std::string& key, const std::string& message) {
+  auto now = std::chrono::steady_clock::now();
+  std::lock_guard<std::mutex> lock(mutex_);
+
+  auto it = repeats_.find(key);
+  if (it != repeats_.end()) {
+    if (now - it->second.window_start < suppress_window_) {
+      it->second.suppressed++;
+      return false;
+    }
+    // Window over before the writer got to it
+    Summarize(key, it->second, now);
+    repeats_.erase(it);
+  }
+
+  if (suppress_window_.count() > 0) {
+    repeats_[key].window_start = now;
+  }
+  if (IsOpen()) {
+    Push(message);
+  }
+  return true;
+}
+
+void AsyncLogger::Push(std::string text) {
+  if (queue_.size() >= queue_size_) {
+    dropped_++;
+    return;
+  }
+  queue_.push_back({std::chrono::system_clock::now(), std::move(text)});
+  if (queue_.size() >= queue_size_ / 2) {
+    wakeup_.notify_one();
+  }
+}
+
+void AsyncLogger::Summarize(const std::string& key, const Repeat& repeat,
+                            std::chrono::steady_clock::time_point now) {
+  if (repeat.suppressed == 0 || !IsOpen()) {
+    return;
+  }
+  auto seconds = std::chrono::duration_cast<std::chrono::seconds>(now - repeat.window_start).count();
+  Push(key + " ×" + std::to_string(repeat.suppressed) + " in last " +
+       std::to_string(std::max<int64_t>(seconds, 1)) + " s");
+}
+
+void AsyncLogger::ExpireRepeats(std::chrono::steady_clock::time_point now, bool all) {
+  for (auto it = repeats_.begin(); it != repeats_.end();) {
+    if (all || now - it->second.window_start >= suppress_window_) {
+      Summarize(it->first, it->second, now);
+      it = repeats_.erase(it);
+    } else {
+      ++it;
+    }
+  }
+}
+
+void AsyncLogger::WriterLoop() {
+  std::vector<Line> batch;
+  batch.reserve(queue_size_);
+  std::time_t last_second = 0;
+  std::string timestamp;
+
+  while (true) {
+    bool stopping;
+    uint64_t dropped;
+    {
+      std::unique_lock<std::mutex> lock(mutex_);
+      wakeup_.wait_for(lock, flush_interval_,
+                       [this] { return stop_ || queue_.size() >= queue_size_ / 2; });
+      stopping = stop_;
+      ExpireRepeats(std::chrono::steady_clock::now(), stopping);
+      batch.swap(queue_);
+      dropped = dropped_;
+      dropped_ = 0;
+    }
+
+    for (const Line& line : batch) {
+      // Lines come in bursts within the same second; format the time once per second
+      std::time_t time = std::chrono::system_clock::to_time_t(line.time);
+      if (time != last_second || timestamp.empty()) {
+        std::stringstream ss;
+        ss << "[" << std::put_time(std::localtime(&time), "%Y-%m-%d %H:%M:%S") << "] ";
+        timestamp = ss.str();
+        last_second = time;
+      }
+      file_ << timestamp << line.text << '\n';
+    }
+    if (dropped > 0) {
+      file_ << timestamp << "WARNING - log queue full, " << dropped << " lines dropped\n";
+    }
+    if (!batch.empty() || dropped > 0) {
+      file_.flush();
+    }
+    batch.clear();
+
+    if (stopping) {
+      break;
+    }
+  }
+}
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+DAQ status aggregator
+Polls the JSON status endpoint of every monitor and prints one compact table
+"""
+
+import argparse
+import json
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+# status_port of daq00 / daq01 as set by start_daq.py
+DEFAULT_ENDPOINTS = ("127.0.0.1:8700", "127.0.0.1:8701")
+
+# Seconds without events before a DAQ is shown as IDLE
+IDLE_SECONDS = 5.0
+
+
+def status_url(endpoint):
+    if endpoint.startswith("http://") or endpoint.startswith("https://"):
+        return endpoint
+    return f"http://{endpoint}/status"
+
+
+def fetch_status(endpoint, timeout=2.0):
+    """Status dict of one monitor, or {"error": ...} when it cannot be reached."""
+    try:
+        with urllib.request.urlopen(status_url(endpoint), timeout=timeout) as response:
+            return json.loads(response.read())
+    except (OSError, ValueError) as e:
+        reason = getattr(e, "reason", None) or e
+        return {"error": str(reason)}
+
+
+def fetch_all(endpoints, timeout=2.0):
+    # One slow monitor must not delay the others
+    with ThreadPoolExecutor(max_workers=max(1, len(endpoints))) as pool:
+        return list(pool.map(lambda endpoint: fetch_status(endpoint, timeout), endpoints))
+
+
+def daq_state(status):
+    """One word for the shift crew: DOWN, STALL, IDLE, DROP, QA or OK."""
+    if "error" in status:
+        return "DOWN"
+    rate = status.get("rate", {})
+    if rate.get("stalled_since"):
+        return "STALL"
+    if status.get("events", {}).get("idle_s", 0.0) > IDLE_SECONDS:
+        return "IDLE"
+    if rate.get("drop"):
+        return "DROP"
+    if any(ch.get("status") in ("WARNING", "ERROR") for ch in status.get("channels", [])):
+        return "QA"
+    return "OK"
+
+
+def format_rate(rate):
+    return f"{rate:.1f}/s" if rate >= 1.0 else f"{rate * 60.0:.1f}/min"
+
+
+def print_table(endpoints, statuses):
+    print(f"[{time.strftime('%H:%M:%S')}] {'daq':<8} {'state':<6} {'events':>9} {'latest':>9} "
+          f"{'rate':>10} {'gaps':>5} {'QA ok/warn/err':>18}  channels")
+    for endpoint, status in zip(endpoints, statuses):
+        state = daq_state(status)
+        if state == "DOWN":
+            print(f"{'':10} {endpoint:<8} {state:<6} {status['error']}")
+            continue
+        events = status["events"]
+        qa = status["qa"]
+        qa_str = f"{qa['ok']}/{qa['warning']}/{qa['error']}" if qa["enabled"] else "off"
+        # Same map as the monitor status line: '-' no data, '.' OK, 'W' warning, 'E' error
+        marks = {"NO_DATA": "-", "OK": ".", "WARNING": "W", "ERROR": "E"}
+        channel_map = "".join(marks.get(ch["status"], "?") for ch in status["channels"])
+        print(f"{'':10} {status['name']:<8} {state:<6} {events['total']:9d} {events['latest']:9d} "
+              f"{format_rate(status['rate']['current']):>10} {events['gaps']:5d} {qa_str:>18}  "
+              f"{channel_map}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show the status of all DAQ monitors in one place")
+    parser.add_argument("endpoints", nargs="*", default=list(DEFAULT_ENDPOINTS),
+                        help="host:port or URL of each monitor status (default: %(default)s)")
+    parser.add_argument("--interval", type=float, default=2.0, help="Poll interval in seconds")
+    parser.add_argument("--timeout", type=float, default=2.0, help="Per-request timeout in seconds")
+    parser.add_argument("--once", action="store_true", help="Poll once and exit (status 1 unless all OK)")
+    parser.add_argument("--json", action="store_true", help="Print the combined statuses as JSON")
+    args = parser.parse_args()
+
+    try:
+        while True:
+            statuses = fetch_all(args.endpoints, args.timeout)
+            if args.json:
+                print(json.dumps(dict(zip(args.endpoints, statuses))))
+            else:
+                print_table(args.endpoints, statuses)
+            sys.stdout.flush()
+            if args.once:
+                sys.exit(0 if all(daq_state(s) == "OK" for s in statuses) else 1)
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+Live dual-DAQ synchronization check
+Tails daq00/wave_0.dat and daq01/wave_0.dat of a run and follows the eventCounter
+offset and trigger time tag drift between the two digitizers
+"""
+
+import argparse
+import os
+import signal
+import sys
+import time
+
+import numpy as np
+
+from live_monitor import ChannelTail, format_duration
+
+# DT5742 trigger time tag: 30-bit counter, 8.5 ns per tick (wraps every ~9.1 s)
+DEFAULT_TTT_BITS = 30
+DEFAULT_TICK_NS = 8.5
+
+# Inter-trigger intervals of a matched pair must agree within
+# DEFAULT_TOLERANCE_NS + DEFAULT_TOLERANCE_PPM * interval
+DEFAULT_TOLERANCE_NS = 1000.0
+DEFAULT_TOLERANCE_PPM = 200.0
+
+DEFAULT_MAX_OFFSET = 2000       # Largest eventCounter offset searched (events)
+SEARCH_EVENTS = 64              # daq00 events compared per candidate offset
+MATCH_FRACTION = 0.9            # Matching intervals needed to accept an offset
+DESYNC_MISMATCHES = 3           # Consecutive mismatching intervals reported as desync
+HISTORY_EVENTS = 50000          # Events kept per board
+
+DEFAULT_POLL_MS = 100
+DEFAULT_DISPLAY_MS = 1000
+
+
+class BoardTimeline:
+    """eventCounter and unwrapped trigger time (ticks) of the recent events of one board."""
+
+    def __init__(self, name, ttt_bits=DEFAULT_TTT_BITS, history=HISTORY_EVENTS):
+        self.name = name
+        self.modulus = 1 << ttt_bits
+        self.history = history
+        self.counters = np.empty(0, dtype=np.int64)
+        self.times = np.empty(0, dtype=np.int64)
+        self.total = 0
+        self.last_ttt = None
+        self.last_time = 0
+
+    def append(self, counters, ttt):
+        if len(counters) == 0:
+            return
+        ttt = ttt.astype(np.int64) & (self.modulus - 1)
+        previous = ttt[0] if self.last_ttt is None else self.last_ttt
+        # Consecutive triggers are less than one wrap apart
+        steps = np.diff(ttt, prepend=previous) % self.modulus
+        times = self.last_time + np.cumsum(steps)
+        self.last_ttt = int(ttt[-1])
+        self.last_time = int(times[-1])
+        self.total += len(counters)
+
+        self.counters = np.concatenate((self.counters, counters.astype(np.int64)))[-self.history:]
+        self.times = np.concatenate((self.times, times))[-self.history:]
+
+    @property
+    def latest(self):
+        return int(self.counters[-1]) if len(self.counters) else None
+
+    def lookup(self, counters):
+        """(found, times) of the given eventCounter values; counters are ascending per board."""
+        counters = np.asarray(counters, dtype=np.int64)
+        if len(self.counters) == 0:
+            return np.zeros(counters.shape, dtype=bool), np.zeros(counters.shape, dtype=np.int64)
+        idx = np.searchsorted(self.counters, counters)
+        np.clip(idx, 0, len(self.counters) - 1, out=idx)
+        return self.counters[idx] == counters, self.times[idx]
+
+
+class SyncChecker:
+    """Matches the triggers of two boards by their inter-trigger intervals.
+
+    offset is eventCounter(daq00) - eventCounter(daq01) of the same trigger; it
+    is found by comparing the trigger time tag intervals of SEARCH_EVENTS daq00
+    events with those of daq01 shifted by every candidate offset. Once locked,
+    each new daq00 event is paired with daq01 event (counter - offset); a run of
+    DESYNC_MISMATCHES intervals that disagree means a board lost or gained a
+    trigger and the offset is searched again. drift_ns is the trigger time of
+    daq01 minus daq00 since the lock.
+    """
+
+    def __init__(self, board0, board1, tick_ns=DEFAULT_TICK_NS, tolerance_ns=DEFAULT_TOLERANCE_NS,
+                 tolerance_ppm=DEFAULT_TOLERANCE_PPM, max_offset=DEFAULT_MAX_OFFSET):
+        self.boards = (board0, board1)
+        self.tick_ns = tick_ns
+        self.tolerance_ticks = tolerance_ns / tick_ns
+        self.tolerance_fraction = tolerance_ppm * 1e-6
+        self.max_offset = max_offset
+
+        self.state = "WAIT"
+        self.offset = None
+        self.next_counter = None    # First daq00 counter not yet paired
+        self.search_from = None     # First daq00 counter of the next offset search
+        self.previous_pair = None   # (t0, t1) of the last paired event
+        self.reference = None       # (t0, t1) of the first pair after the lock
+        self.consecutive = 0
+        self.ambiguous_reported = False
+
+        self.pairs = 0
+        self.mismatches = 0
+        self.desyncs = 0
+        self.missing = [0, 0]       # Triggers seen by the other board only
+        self.drift_ns = 0.0
+        self.drift_ppm = 0.0
+        self.max_drift_ns = 0.0
+        self.messages = []
+
+    def _matches(self, d0, d1):
+        return np.abs(d1 - d0) <= self.tolerance_ticks + self.tolerance_fraction * np.abs(d0)
+
+    def _score(self, counters, times):
+        """Per candidate offset: fraction of matching intervals, number compared and the
+        (n_candidates, n - 1) matrix of matching intervals."""
+        candidates = np.arange(-self.max_offset, self.max_offset + 1)
+        partners = counters[None, :] - candidates[:, None]
+        found, t1 = self.boards[1].lookup(partners.ravel())
+        found = found.reshape(partners.shape)
+        t1 = t1.reshape(partners.shape)
+
+        both = found[:, 1:] & found[:, :-1]
+        match = both & self._matches(np.diff(times)[None, :], np.diff(t1, axis=1))
+        compared = both.sum(axis=1)
+        score = match.sum(axis=1) / np.maximum(compared, 1)
+        return candidates, score, compared, match
+
+    def search(self):
+        """Scan daq00 windows from search_from on until an offset matches."""
+        board0 = self.boards[0]
+        if len(self.boards[1].counters) < SEARCH_EVENTS:
+            return
+        self.state = "SEARCH"
+
+        start = 0
+        if self.search_from is not None:
+            start = int(np.searchsorted(board0.counters, self.search_from))
+        found = None
+        while start + SEARCH_EVENTS <= len(board0.counters):
+            counters = board0.counters[start:start + SEARCH_EVENTS]
+            candidates, score, compared, match = self._score(counters,
+                                                             board0.times[start:start + SEARCH_EVENTS])
+            if compared.max() < SEARCH_EVENTS // 2:
+                # daq01 has not written these triggers yet
+                break
+            score[compared < SEARCH_EVENTS // 2] = 0.0
+            good = np.flatnonzero(score >= MATCH_FRACTION)
+            if len(good) > 0:
+                found = candidates[good]
+                best = good[np.argmin(np.abs(found))]
+                # Start pairing at the first interval that matches, not at an event the
+                # other board missed
+                start += int(np.argmax(match[best]))
+                break
+            # Window straddles a desync or a stretch of missing events
+            start += SEARCH_EVENTS // 2
+        if start < len(board0.counters):
+            self.search_from = int(board0.counters[start])
+        if found is None:
+            return
+
+        if len(found) > 1 and not self.ambiguous_reported:
+            # Periodic triggers (pulser) have identical intervals for every offset
+            self.messages.append(f"[WARNING] {len(found)} eventCounter offsets match "
+                                 "(periodic trigger?); using the smallest")
+            self.ambiguous_reported = True
+        offset = int(found[np.argmin(np.abs(found))])
+
+        message = f"[INFO] Locked at daq00 event {self.search_from}: eventCounter daq00 - daq01 = {offset:+d}"
+        if offset != 0:
+            message += " (offline join by event number will pair the wrong triggers)"
+        self.messages.append(message)
+        # daq00 events before the lock point have no partner (daq01 started later or lost them)
+        first = 0 if self.next_counter is None else int(np.searchsorted(board0.counters, self.next_counter))
+        self.missing[1] += max(start - first, 0)
+        self.offset = offset
+        self.state = "SYNC"
+        self.next_counter = self.search_from
+        self.previous_pair = None
+        self.reference = None
+        self.consecutive = 0
+
+    def pair_new(self):
+        board0, board1 = self.boards
+        start = np.searchsorted(board0.counters, self.next_counter)
+        counters = board0.counters[start:]
+        if len(counters) == 0:
+            return
+        found, t1 = board1.lookup(counters - self.offset)
+        # Partners daq01 has not written yet are paired on a later update
+        pending = (counters - self.offset) > board1.latest
+        if pending.any():
+            stop = int(np.argmax(pending))
+            counters, found, t1 = counters[:stop], found[:stop], t1[:stop]
+        if len(counters) == 0:
+            return
+
+        # Triggers missed by daq00: partners daq01 has between skipped daq00 counters
+        steps = np.diff(counters, prepend=self.next_counter - 1)
+        self.missing[0] += int(np.sum(steps[steps > 1] - 1))
+        self.missing[1] += int(np.count_nonzero(~found))
+        self.next_counter = int(counters[-1]) + 1
+
+        t0 = board0.times[start:start + len(counters)][found]
+        t1 = t1[found]
+        paired = counters[found]
+        if len(paired) == 0:
+            return
+
+        if self.previous_pair is not None:
+            t0_all = np.concatenate(([self.previous_pair[0]], t0))
+            t1_all = np.concatenate(([self.previous_pair[1]], t1))
+        else:
+            t0_all, t1_all = t0, t1
+        mismatch = ~self._matches(np.diff(t0_all), np.diff(t1_all))
+        # mismatch[k] is the interval ending at paired[k + lead]
+        lead = len(paired) - len(mismatch)
+
+        # Desync: DESYNC_MISMATCHES mismatching intervals in a row
+        desync = None
+        run = self.consecutive
+        for k, bad in enumerate(mismatch):
+            run = run + 1 if bad else 0
+            if run >= DESYNC_MISMATCHES:
+                desync = max(k - DESYNC_MISMATCHES + 1 + lead, 0)
+                break
+        self.consecutive = run
+
+        if desync is not None:
+            # Pairs from the desync on were matched with the wrong offset
+            event = int(paired[desync])
+            self.mismatches += int(np.count_nonzero(mismatch[:max(desync - lead, 0)]))
+            paired, t0, t1 = paired[:desync], t0[:desync], t1[:desync]
+            self.messages.append(f"[ERROR] Desync at daq00 event {event}: trigger intervals "
+                                 f"no longer match with offset {self.offset:+d}")
+            self.desyncs += 1
+            self.state = "DESYNC"
+            self.offset = None
+            self.search_from = event
+            self.next_counter = event
+        else:
+            self.mismatches += int(np.count_nonzero(mismatch))
+        if len(paired) == 0:
+            return
+
+        if self.reference is None:
+            self.reference = (int(t0[0]), int(t1[0]))
+        self.previous_pair = (int(t0[-1]), int(t1[-1]))
+        self.pairs += len(paired)
+
+        elapsed = self.previous_pair[0] - self.reference[0]
+        drift = (self.previous_pair[1] - self.reference[1]) - elapsed
+        self.drift_ns = drift * self.tick_ns
+        self.drift_ppm = drift / elapsed * 1e6 if elapsed > 0 else 0.0
+        self.max_drift_ns = max(self.max_drift_ns, abs(self.drift_ns))
+
+    def update(self):
+        if self.offset is None:
+            self.search()
+        if self.offset is not None:
+            self.pair_new()
+
+    def take_messages(self):
+        messages, self.messages = self.messages, []
+        return messages
+
+
+class SyncMonitor:
+    def __init__(self, paths, checker, log_path=None, poll_ms=DEFAULT_POLL_MS,
+                 display_ms=DEFAULT_DISPLAY_MS):
+        self.paths = paths
+        self.tails = [ChannelTail(path) for path in paths]
+        self.checker = checker
+        self.poll_interval = poll_ms / 1000.0
+        self.display_interval = display_ms / 1000.0
+        self.log = open(log_path, "a") if log_path else None
+        self.start_time = time.monotonic()
+        self.last_display = 0.0
+        self.running = True
+
+    def stop(self, *_):
+        self.running = False
+
+    def report(self, message):
+        sys.stdout.write("\n" + message + "\n")
+        sys.stdout.flush()
+        if self.log:
+            self.log.write(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] {message}\n")
+            self.log.flush()
+
+    def read(self):
+        for tail, board in zip(self.tails, self.checker.boards):
+            while True:
+                try:
+                    records = tail.read_new()
+                except (OSError, ValueError) as e:
+                    self.report(f"[ERROR] {board.name}: {e}")
+                    break
+                if records is None:
+                    break
+                header = records["header"]
+                board.append(header["event_counter"], header["trigger_time_tag"])
+
+    def display(self):
+        now = time.monotonic()
+        if now - self.last_display < self.display_interval:
+            return
+        self.last_display = now
+
+        c = self.checker
+        board0, board1 = c.boards
+        offset = "-" if c.offset is None else f"{c.offset:+d}"
+        line = (f"\r[{time.strftime('%H:%M:%S')}] daq00 evt {board0.latest if board0.total else '-'} | "
+                f"daq01 evt {board1.latest if board1.total else '-'} | offset {offset} | "
+                f"paired {c.pairs} | drift {c.drift_ns / 1000.0:+.2f} us ({c.drift_ppm:+.1f} ppm) | "
+                f"missing {c.missing[0]}/{c.missing[1]} | {c.state} | "
+                f"Runtime: {format_duration(now - self.start_time)}")
+        sys.stdout.write(line)
+        sys.stdout.flush()
+
+    def print_summary(self):
+        c = self.checker
+        print("\n")
+        print("═" * 53)
+        print("         Synchronization Summary")
+        print("═" * 53)
+        for board in c.boards:
+            print(f"  {board.name} events:       {board.total}")
+        print(f"  eventCounter offset: {'-' if c.offset is None else f'{c.offset:+d}'}")
+        print(f"  Paired events:       {c.pairs}")
+        print(f"  Interval mismatches: {c.mismatches}")
+        print(f"  Desyncs:             {c.desyncs}")
+        print(f"  Missing daq00/daq01: {c.missing[0]}/{c.missing[1]}")
+        print(f"  Drift:               {c.drift_ns / 1000.0:+.2f} us ({c.drift_ppm:+.1f} ppm), "
+              f"max {c.max_drift_ns / 1000.0:.2f} us")
+        print("═" * 53 + "\n")
+
+    def run(self):
+        signal.signal(signal.SIGINT, self.stop)
+        if self.log:
+            self.log.write(f"\n[{time.strftime('%Y-%m-%d %H:%M:%S')}] Sync monitor started: "
+                           f"{self.paths[0]} {self.paths[1]}\n")
+        print(f"Comparing {self.paths[0]} and {self.paths[1]}. Press Ctrl+C to stop.\n")
+        try:
+            while self.running:
+                self.read()
+                self.checker.update()
+                for message in self.checker.take_messages():
+                    self.report(message)
+                self.display()
+                time.sleep(self.poll_interval)
+        finally:
+            for tail in self.tails:
+                tail.close()
+            self.print_summary()
+            if self.log:
+                self.log.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Live eventCounter / trigger time check between daq00 and daq01"
+    )
+    parser.add_argument("run_dir", nargs="?", default=None,
+                        help="Run directory containing daq00/ and daq01/ (e.g. /data/000001)")
+    parser.add_argument("--daq0", default=None, help="daq00 file (default: RUN_DIR/daq00/wave_N.dat)")
+    parser.add_argument("--daq1", default=None, help="daq01 file (default: RUN_DIR/daq01/wave_N.dat)")
+    parser.add_argument("--channel", type=int, default=0, help="Channel file to compare (default: 0)")
+    parser.add_argument("--ttt-bits", type=int, default=DEFAULT_TTT_BITS,
+                        help=f"Trigger time tag width (default: {DEFAULT_TTT_BITS})")
+    parser.add_argument("--tick-ns", type=float, default=DEFAULT_TICK_NS,
+                        help=f"Trigger time tag tick (default: {DEFAULT_TICK_NS} ns)")
+    parser.add_argument("--tolerance-ns", type=float, default=DEFAULT_TOLERANCE_NS,
+                        help=f"Interval tolerance (default: {DEFAULT_TOLERANCE_NS:.0f} ns)")
+    parser.add_argument("--tolerance-ppm", type=float, default=DEFAULT_TOLERANCE_PPM,
+                        help=f"Relative interval tolerance (default: {DEFAULT_TOLERANCE_PPM:.0f} ppm)")
+    parser.add_argument("--max-offset", type=int, default=DEFAULT_MAX_OFFSET,
+                        help=f"Largest eventCounter offset searched (default: {DEFAULT_MAX_OFFSET})")
+    parser.add_argument("--log", default=None, help="Append messages to this file")
+    parser.add_argument("--poll-ms", type=int, default=DEFAULT_POLL_MS,
+                        help=f"Polling interval (default: {DEFAULT_POLL_MS} ms)")
+    args = parser.parse_args()
+
+    name = f"wave_{args.channel}.dat"
+    if args.run_dir is None and (args.daq0 is None or args.daq1 is None):
+        parser.error("give RUN_DIR or both --daq0 and --daq1")
+    paths = [args.daq0 or os.path.join(args.run_dir, "daq00", name),
+             args.daq1 or os.path.join(args.run_dir, "daq01", name)]
+
+    checker = SyncChecker(BoardTimeline("daq00", args.ttt_bits), BoardTimeline("daq01", args.ttt_bits),
+                          args.tick_ns, args.tolerance_ns, args.tolerance_ppm, args.max_offset)
+    SyncMonitor(paths, checker, args.log, args.poll_ms).run()
+
+
+if __name__ == "__main__":
+    main()
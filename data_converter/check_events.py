@@ -4,18 +4,23 @@ import h5py
 import numpy as np
 import sys
 
+from event_index import EventIndex
+
 
 def check_events(filename):
     with h5py.File(filename, "r") as f:
         hits = f["Hits"]
 
-        if "event" not in hits.dtype.names:
+        if "event" not in hits.dtype.names and "trigger_number" not in hits.dtype.names:
             print("ERROR: 'event' field not found")
             return
 
-        events = hits["event"]
+        index = EventIndex(f, "Hits")
+        unique, counts = index.events, index.counts
 
-        unique, counts = np.unique(events, return_counts=True)
+        if len(unique) == 0:
+            print("ERROR: no events in 'Hits'")
+            return
 
         print("=== Event statistics ===")
         print("Number of events:", len(unique))
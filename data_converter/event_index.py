@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+
+import h5py
+import numpy as np
+import sys
+
+# Index dataset written by export_to_hdf5 next to each row dataset
+INDEX_DATASETS = {
+    "Hits": "EventIndex",
+    "AnalysisFeatures": "AnalysisFeatures_EventIndex",
+}
+
+
+def event_field(dtype):
+    """Name of the event number field: trigger_number (Corryvreckan) or event."""
+    for name in ("trigger_number", "event"):
+        if name in dtype.names:
+            return name
+    return None
+
+
+class EventIndex:
+    """Per-event row lookup for a Hits / AnalysisFeatures dataset.
+
+    events : (n_events,) event numbers in file order
+    counts : (n_events,) rows per event
+
+    Uses the EventIndex dataset written by export_to_hdf5. For older files
+    without it, or when it does not cover every row (e.g. an append that could
+    not extend it), the index is built once from the event column (one read).
+    """
+
+    def __init__(self, h5file, dataset="Hits"):
+        self.dataset = h5file[dataset]
+        self.field = event_field(self.dataset.dtype)
+        self._order = None
+
+        index_name = INDEX_DATASETS.get(dataset, dataset + "_EventIndex")
+        if index_name not in h5file or not self._load(h5file[index_name][:]):
+            if self.field is None:
+                raise KeyError(f"No event field in dataset '{dataset}'")
+            self._build(self.dataset[self.field])
+
+        self._lookup = {int(ev): i for i, ev in enumerate(self.events)}
+
+    def _load(self, index):
+        """Use a stored index; False when it does not end at the last row."""
+        first_rows = index["first_row"].astype(np.int64)
+        counts = index["count"].astype(np.int64)
+        covered = int((first_rows + counts).max()) if len(index) else 0
+        if covered != len(self.dataset):
+            print(f"WARNING: stored event index covers {covered} of {len(self.dataset)} rows, "
+                  f"rebuilding it from the event column", file=sys.stderr)
+            return False
+        self.events = index["event"]
+        self.first_rows = first_rows
+        self.counts = counts
+        return True
+
+    def _build(self, events):
+        if len(events) == 0:
+            self.events = np.zeros(0, dtype=np.uint32)
+            self.first_rows = np.zeros(0, dtype=np.int64)
+            self.counts = np.zeros(0, dtype=np.int64)
+            return
+
+        if np.any(events[1:] < events[:-1]):
+            # Not grouped by event: remember a sorting permutation
+            self._order = np.argsort(events, kind="stable")
+            events = events[self._order]
+
+        starts = np.concatenate(([0], np.flatnonzero(events[1:] != events[:-1]) + 1))
+        self.events = events[starts]
+        self.first_rows = starts.astype(np.int64)
+        self.counts = np.diff(np.append(starts, len(events))).astype(np.int64)
+
+    def __len__(self):
+        return len(self.events)
+
+    def __contains__(self, event):
+        return int(event) in self._lookup
+
+    def rows(self, event):
+        """Row selection (slice, or index array for unsorted files) of one event."""
+        i = self._lookup.get(int(event))
+        if i is None:
+            return slice(0, 0)
+        start = int(self.first_rows[i])
+        stop = start + int(self.counts[i])
+        if self._order is not None:
+            return np.sort(self._order[start:stop])
+        return slice(start, stop)
+
+    def read(self, event):
+        """Structured rows of one event."""
+        sel = self.rows(event)
+        if isinstance(sel, slice):
+            return self.dataset[sel]
+        if len(sel) == 0:
+            return self.dataset[0:0]
+        return self.dataset[sel]
+
+    def iter_events(self, limit=None):
+        """Yield (event, rows) for the first `limit` events in file order."""
+        for ev in self.events[:limit]:
+            yield ev, self.read(ev)
+
+
+def slice_rows(data, index, event):
+    """Rows of one event from an already loaded array, using an EventIndex."""
+    sel = index.rows(event)
+    return data[sel]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python event_index.py file.h5 [event]")
+        sys.exit(1)
+
+    with h5py.File(sys.argv[1], "r") as f:
+        index = EventIndex(f, "Hits")
+        print("Events:", len(index))
+        if len(sys.argv) == 3:
+            for row in index.read(int(sys.argv[2])):
+                print(row)
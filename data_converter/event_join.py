@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+
+import json
+import numpy as np
+import os
+import sys
+
+
+def _source_signature(paths):
+    """(path, size, mtime_ns) of every source file, used to validate a cached join."""
+    signature = []
+    for path in paths:
+        st = os.stat(path)
+        signature.append([os.path.abspath(path), st.st_size, st.st_mtime_ns])
+    return signature
+
+
+class EventJoin:
+    """Rows of the same event number in two DAQ outputs.
+
+    events : (n_matched,) event numbers present in both inputs, ascending
+    rows0  : (n_matched,) row of each matched event in input 0
+    rows1  : (n_matched,) row of each matched event in input 1
+    only0  : event numbers found only in input 0 (dropped by DAQ 1)
+    only1  : event numbers found only in input 1 (dropped by DAQ 0)
+
+    Built with a sort-based merge join, O(N log N). For duplicated event
+    numbers the first row is used.
+    """
+
+    def __init__(self, events, rows0, rows1, only0, only1):
+        self.events = events
+        self.rows0 = rows0
+        self.rows1 = rows1
+        self.only0 = only0
+        self.only1 = only1
+
+    @classmethod
+    def build(cls, events0, events1):
+        events0 = np.asarray(events0)
+        events1 = np.asarray(events1)
+        events, rows0, rows1 = np.intersect1d(events0, events1, return_indices=True)
+        only0 = np.setdiff1d(events0, events)
+        only1 = np.setdiff1d(events1, events)
+        return cls(events, rows0.astype(np.int64), rows1.astype(np.int64), only0, only1)
+
+    def __len__(self):
+        return len(self.events)
+
+    @property
+    def in_sync(self):
+        return len(self.only0) == 0 and len(self.only1) == 0
+
+    def save(self, path, sources=()):
+        with open(path, "wb") as f:
+            np.savez(f, events=self.events, rows0=self.rows0, rows1=self.rows1,
+                     only0=self.only0, only1=self.only1,
+                     sources=json.dumps(_source_signature(sources)))
+
+    @classmethod
+    def load(cls, path, sources=None):
+        """Load a cached join; returns None if it is missing or the sources changed."""
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as cache:
+                if sources is not None and json.loads(str(cache["sources"])) != _source_signature(sources):
+                    return None
+                return cls(cache["events"], cache["rows0"], cache["rows1"],
+                           cache["only0"], cache["only1"])
+        except (OSError, KeyError, ValueError):
+            return None
+
+
+def load_or_build_join(path0, path1, read_events, cache_path=None):
+    """Join the events of two files, reusing cache_path while both files are unchanged.
+
+    read_events(path) must return the event number of every row of a file.
+    """
+    if cache_path:
+        join = EventJoin.load(cache_path, sources=(path0, path1))
+        if join is not None:
+            print(f"Using cached event join: {cache_path}")
+            return join
+
+    join = EventJoin.build(read_events(path0), read_events(path1))
+
+    if cache_path:
+        try:
+            join.save(cache_path, sources=(path0, path1))
+            print(f"Saved event join: {cache_path}")
+        except OSError as e:
+            print(f"WARNING: cannot write event join cache {cache_path}: {e}")
+    return join
+
+
+def print_summary(join, max_report=10):
+    print("Matched events:", len(join))
+    print("Only in input 0:", len(join.only0))
+    print("Only in input 1:", len(join.only1))
+    if len(join.only0) > 0:
+        print("  first:", join.only0[:max_report].tolist())
+    if len(join.only1) > 0:
+        print("  first:", join.only1[:max_report].tolist())
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (3, 4):
+        print("Usage: python event_join.py daq00_analyzed.root daq01_analyzed.root [cache.npz]")
+        sys.exit(1)
+
+    from read_analysis_tree import load_analysis_columns
+
+    def read_events(path):
+        return load_analysis_columns(path, branches=[])["event"]
+
+    cache = sys.argv[3] if len(sys.argv) == 4 else None
+    print_summary(load_or_build_join(sys.argv[1], sys.argv[2], read_events, cache))
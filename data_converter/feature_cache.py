@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+
+from read_raw_run import build_file_names
+
+# Settings outside waveform_converter / waveform_analyzer that change the features
+COMMON_KEYS = ("n_channels", "max_events", "nsamples_policy")
+
+# Sections that only affect later stages
+IGNORED_ANALYZER_KEYS = ("corry_export",)
+
+CACHE_INFO = "feature_cache.json"
+
+
+def _hash(obj):
+    return hashlib.sha1(json.dumps(obj, sort_keys=True).encode()).hexdigest()
+
+
+def _file_stat(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def compute_keys(config):
+    """Return (run_key, channel_keys) for a loaded pipeline config.
+
+    The run key hashes the size/mtime of every raw channel file and the feature
+    settings. channel_keys[ch] only covers channel ch: its raw file, its entries
+    of per-channel arrays and all scalar settings.
+    """
+    common = config.get("common", {})
+    converter = config.get("waveform_converter", {})
+    analyzer = {k: v for k, v in config.get("waveform_analyzer", {}).items()
+                if k not in IGNORED_ANALYZER_KEYS}
+    n_channels = common.get("n_channels", 16)
+
+    cfg = dict(common)
+    cfg.update(converter)
+    files = build_file_names(cfg)
+    stats = [_file_stat(name) for name in files]
+
+    # Split analyzer settings into per-channel arrays and the rest
+    per_channel = {}
+    scalars = {}
+    for key, value in analyzer.items():
+        if isinstance(value, dict):
+            for sub, sub_value in value.items():
+                if isinstance(sub_value, list) and len(sub_value) == n_channels:
+                    per_channel[f"{key}.{sub}"] = sub_value
+                else:
+                    scalars[f"{key}.{sub}"] = sub_value
+        elif isinstance(value, list) and len(value) == n_channels:
+            per_channel[key] = value
+        else:
+            scalars[key] = value
+
+    shared = {
+        "common": {k: common.get(k) for k in COMMON_KEYS},
+        "waveform_converter": converter,
+        "scalars": scalars,
+    }
+    shared_key = _hash(shared)
+
+    channel_keys = []
+    for ch in range(n_channels):
+        settings = {key: values[ch] for key, values in per_channel.items()}
+        channel_keys.append(_hash([shared_key, files[ch], stats[ch], settings]))
+
+    run_key = _hash([shared_key, files, stats, per_channel])
+    return run_key, channel_keys
+
+
+class FeatureCache:
+    """Stage 2 outputs stored under <output>/cache/<key>/, newest `max_entries` kept."""
+
+    def __init__(self, cache_dir, max_entries=4):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+
+    def _info_path(self):
+        return os.path.join(self.cache_dir, CACHE_INFO)
+
+    def _load_info(self):
+        try:
+            with open(self._info_path(), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"entries": []}
+
+    def _save_info(self, info):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp = self._info_path() + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(info, f, indent=2)
+        os.replace(tmp, self._info_path())
+
+    def _entry_file(self, key, output):
+        return os.path.join(self.cache_dir, key, os.path.basename(output))
+
+    def lookup(self, key, output):
+        """Cached copy of `output` for this key, or None."""
+        path = self._entry_file(key, output)
+        return path if os.path.isfile(path) else None
+
+    def changed_channels(self, channel_keys):
+        """Channels whose key differs from the most recent cache entry."""
+        entries = self._load_info()["entries"]
+        if not entries:
+            return list(range(len(channel_keys)))
+        previous = entries[-1].get("channel_keys", [])
+        return [ch for ch, key in enumerate(channel_keys)
+                if ch >= len(previous) or previous[ch] != key]
+
+    def restore(self, key, output):
+        """Put the cached output back in place; True on a cache hit."""
+        cached = self.lookup(key, output)
+        if cached is None:
+            return False
+        if _file_stat(output) != _file_stat(cached):
+            _copy_replace(cached, output)
+        self._touch(key)
+        return True
+
+    def store(self, key, channel_keys, output):
+        path = self._entry_file(key, output)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _copy_replace(output, path)
+
+        info = self._load_info()
+        info["entries"] = [e for e in info["entries"] if e["key"] != key]
+        info["entries"].append({"key": key, "channel_keys": channel_keys,
+                                "output": os.path.basename(output)})
+        while len(info["entries"]) > self.max_entries:
+            old = info["entries"].pop(0)
+            shutil.rmtree(os.path.join(self.cache_dir, old["key"]), ignore_errors=True)
+        self._save_info(info)
+
+    def _touch(self, key):
+        info = self._load_info()
+        entries = [e for e in info["entries"] if e["key"] == key]
+        if entries:
+            info["entries"] = [e for e in info["entries"] if e["key"] != key] + entries
+            self._save_info(info)
+
+
+def _copy_replace(src, dst):
+    # Copy, not hard link: ROOT RECREATE may rewrite the output file in place
+    tmp = dst + ".tmp"
+    shutil.copy2(src, tmp)
+    os.replace(tmp, dst)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stage 2 feature cache keyed by raw files and analysis settings.")
+    parser.add_argument("action", choices=["key", "restore", "store"])
+    parser.add_argument("--config", required=True, help="Pipeline configuration JSON")
+    parser.add_argument("--cache-dir", help="Cache directory (required for restore/store)")
+    parser.add_argument("--output", help="Stage 2 output file (required for restore/store)")
+    args = parser.parse_args()
+
+    with open(args.config, "r") as f:
+        config = json.load(f)
+    run_key, channel_keys = compute_keys(config)
+
+    if args.action == "key":
+        print(run_key)
+        sys.exit(0)
+
+    if not args.cache_dir or not args.output:
+        parser.error("restore/store need --cache-dir and --output")
+
+    cache = FeatureCache(args.cache_dir)
+    if args.action == "restore":
+        if cache.restore(run_key, args.output):
+            print(f"Feature cache hit ({run_key[:12]}): {args.output}")
+            sys.exit(0)
+        changed = cache.changed_channels(channel_keys)
+        print(f"Feature cache miss ({run_key[:12]}), changed channels: {changed}")
+        sys.exit(1)
+
+    cache.store(run_key, channel_keys, args.output)
+    print(f"Stored features in cache ({run_key[:12]})")
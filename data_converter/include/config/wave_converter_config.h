@@ -40,6 +40,8 @@ struct WaveConverterConfig {
   int pedestal_window = 100;
   double ped_target = 3500.0;
   std::string event_policy = "error";
+  // false: write only chNN_raw and pedestals; readers rebuild chNN_ped
+  bool store_ped = true;
 };
 
 inline bool LoadConfigFromJson(const std::string &path,
@@ -106,6 +108,9 @@ inline bool LoadConfigFromJson(const std::string &path,
     if (GetBool(waveformConverter, "input_is_ascii", boolValue)) {
       cfg.input_is_ascii = boolValue;
     }
+    if (GetBool(waveformConverter, "store_ped", boolValue)) {
+      cfg.store_ped = boolValue;
+    }
     if (GetString(waveformConverter, "special_channel_file", strValue)) {
       cfg.special_channel_file = strValue;
     }
@@ -37,6 +37,12 @@ inline bool CreateDirectoryIfNeeded(const std::string &path) {
   return true;
 }
 
+// True if path exists and is a regular file.
+inline bool FileExists(const std::string &path) {
+  struct stat info;
+  return stat(path.c_str(), &info) == 0 && S_ISREG(info.st_mode);
+}
+
 // Build path: output_dir/subdir/filename (handles absolute filename and ".").
 inline std::string BuildOutputPath(const std::string &output_dir,
                                    const std::string &subdir,
@@ -0,0 +1,76 @@
+#pragma once
+
+#include <cstdint>
+#include <fstream>
+#include <string>
+#include <vector>
+
+#include "config/wave_converter_config.h"
+
+enum class NsamplesPolicy { kStrict, kPad };
+enum class EventPolicy { kError, kWarn, kSkip };
+
+NsamplesPolicy ResolveNsamplesPolicy(const std::string &policyText);
+EventPolicy ResolveEventPolicy(const std::string &policyText);
+
+// Zero-padded run number used in the run directory names
+std::string to6digits(int n);
+
+// Input file of channel ch (wave_N.dat, or the special channel override)
+std::string BuildFileName(const WaveConverterConfig &cfg, int ch);
+bool IsSpecialOverrideChannel(const WaveConverterConfig &cfg, int ch);
+
+// One event of all channels, pedestal-subtracted like the Waveforms tree.
+// Next() refills the vectors in place, so their addresses can be handed to
+// TTree branches once raw and ped hold n_channels entries.
+struct RawEvent {
+  int index = 0;       // event number, as in the "event" branch
+  bool skip = false;   // rejected by event_policy "skip"
+  int nsamples = 0;
+  std::vector<int> nsamplesPerChannel;
+  std::vector<float> pedestals;
+  std::vector<uint32_t> boardIds;
+  std::vector<uint32_t> channelIds;
+  std::vector<uint32_t> eventCounters;
+  std::vector<float> timeAxis;
+  std::vector<std::vector<float>> raw;
+  std::vector<std::vector<float>> ped;
+};
+
+// Sequential reader of the binary wave_N.dat files of one DAQ.
+//
+// Applies the header checks, event_policy, nsamples_policy, max_events and
+// pedestal subtraction.  convert_to_root fills waveforms.root from it, and
+// analyze_waveforms --from-raw analyzes its events directly.
+class RawEventReader {
+public:
+  // offsets resumes every channel file at the given byte offset (see
+  // Offsets()), with the first event numbered firstEvent
+  bool Open(const WaveConverterConfig &cfg,
+            const std::vector<std::streamoff> &offsets = std::vector<std::streamoff>(),
+            int firstEvent = 0);
+
+  // Next event; false at the end of the data or after an error (see Failed())
+  bool Next(RawEvent &event);
+
+  bool Failed() const { return failed_; }
+  // Events in the files, from the size of the first channel file and its first event
+  long long EstimatedEvents() const { return estimatedEvents_; }
+  // Index of the next event, i.e. the number of events read including firstEvent
+  int NextEvent() const { return eventCount_; }
+  // Byte offset of the first unread event in every channel file
+  const std::vector<std::streamoff> &Offsets() const { return offsets_; }
+
+private:
+  WaveConverterConfig cfg_;
+  NsamplesPolicy nsamplesPolicy_ = NsamplesPolicy::kStrict;
+  EventPolicy eventPolicy_ = EventPolicy::kError;
+  std::vector<std::ifstream> fins_;
+  std::vector<std::streamoff> offsets_;
+  int eventCount_ = 0;
+  int consistencyWarnings_ = 0;
+  long long estimatedEvents_ = 0;
+  bool failed_ = false;
+  bool loggedPadding_ = false;
+  bool loggedSpecialChannelId_ = false;
+};
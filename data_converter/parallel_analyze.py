@@ -0,0 +1,633 @@
+#!/usr/bin/env python3
+"""
+Parallel waveform analysis
+Runs analyze_waveforms on event chunks taken from a shared work queue and merges
+the chunk outputs in event order while later chunks are still running
+"""
+
+import argparse
+import json
+import math
+import os
+import shutil
+import struct
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+ANALYZE_BIN = os.path.join(SCRIPT_DIR, "analyze_waveforms")
+
+DEFAULT_CHUNK_SIZE = 500
+DEFAULT_MAX_CORES = 8
+DEFAULT_RETRIES = 1
+DEFAULT_MIN_CHUNK = 100
+
+# Adaptive chunks are never so small that the fixed per-chunk cost (process
+# start, ROOT file open) is more than this fraction of their run time
+OVERHEAD_FRACTION = 0.1
+
+# Per-chunk timing written next to the chunk logs
+TIMING_FILE = "chunks.json"
+
+
+def load_settings(config_path):
+    """Paths and parallel settings of one DAQ from the pipeline config."""
+    with open(config_path, "r") as f:
+        config = json.load(f)
+    common = config.get("common", {})
+    base_dir = os.path.join(common.get("output_dir", "output"),
+                            f"{int(common.get('runnumber', 0)):06d}",
+                            common.get("daq_name", "daq00"))
+    output_dir = os.path.join(base_dir, "output")
+    temp_dir = common.get("temp_dir", "./temp")
+    if not os.path.isabs(temp_dir):
+        temp_dir = os.path.normpath(os.path.join(output_dir, temp_dir))
+    return {
+        "output_dir": output_dir,
+        "input_root": common.get("waveforms_root", "waveforms.root"),
+        "input_tree": common.get("waveforms_tree", "Waveforms"),
+        "output_root": common.get("analysis_root", "waveforms_analyzed.root"),
+        "max_cores": int(common.get("max_cores", DEFAULT_MAX_CORES)),
+        "chunk_size": int(common.get("chunk_size", DEFAULT_CHUNK_SIZE)),
+        "adaptive_chunks": bool(common.get("adaptive_chunks", False)),
+        "min_chunk_size": int(common.get("min_chunk_size", DEFAULT_MIN_CHUNK)),
+        "stream_merge": bool(common.get("stream_merge", False)),
+        "temp_dir": temp_dir,
+    }
+
+
+def count_entries(path, tree_name):
+    """Number of entries in `tree_name`, or 0 when the file or tree cannot be read."""
+    try:
+        import ROOT
+    except ImportError:
+        ROOT = None
+
+    if ROOT is not None:
+        f = ROOT.TFile.Open(path, "READ")
+        if not f or f.IsZombie():
+            return 0
+        tree = f.Get(tree_name)
+        entries = int(tree.GetEntries()) if tree else 0
+        f.Close()
+        return entries
+
+    # No PyROOT in this Python: ask a ROOT session instead
+    macro = (f'TFile *f = TFile::Open("{path}"); TTree *t = nullptr;'
+             f' if (f && !f->IsZombie()) f->GetObject("{tree_name}", t);'
+             ' if (t) std::cout << "NUM_ENTRIES=" << t->GetEntries() << std::endl;'
+             ' gSystem->Exit(0);')
+    result = subprocess.run(["root", "-l", "-b", "-q", "-e", macro],
+                            capture_output=True, text=True)
+    for line in result.stdout.splitlines():
+        if line.startswith("NUM_ENTRIES="):
+            return int(line.split("=", 1)[1])
+    return 0
+
+
+class Chunk:
+    """Event range [start, end) and its bookkeeping."""
+
+    def __init__(self, chunk_id, start, end):
+        self.id = chunk_id
+        self.start = start
+        self.end = end
+        self.attempts = 0
+        self.seconds = 0.0
+        self.status = "pending"
+
+    @property
+    def events(self):
+        return self.end - self.start
+
+    def to_dict(self):
+        return {"chunk": self.id, "start": self.start, "end": self.end,
+                "attempts": self.attempts, "seconds": round(self.seconds, 3),
+                "status": self.status}
+
+
+class ChunkQueue:
+    """Chunks handed to whichever worker is free next.
+
+    Workers pull from one shared queue instead of owning a fixed share of the
+    chunks, so a slow chunk never holds up the chunks behind it. A chunk that
+    failed goes back to the front so its retry does not end up in the tail.
+    """
+
+    def __init__(self, n_events, chunk_size):
+        self.chunks = [Chunk(i, start, min(start + chunk_size, n_events))
+                       for i, start in enumerate(range(0, n_events, chunk_size))]
+        self._pending = deque(self.chunks)
+        self._lock = threading.Lock()
+
+    def take(self):
+        with self._lock:
+            return self._pending.popleft() if self._pending else None
+
+    def retry(self, chunk):
+        with self._lock:
+            self._pending.appendleft(chunk)
+
+    def record(self, chunk):
+        """Timing of a finished chunk; fixed-size chunks do not use it."""
+
+
+class AdaptiveChunkQueue(ChunkQueue):
+    """Chunks sized from the measured throughput so all workers finish together.
+
+    The first chunks are probes of `probe_size` events. Once one has finished,
+    every new chunk gets 1/(2 * workers) of the events not yet handed out
+    (guided scheduling): chunks start large and shrink towards the end of the
+    run, so the last ones are short and no worker is left running a full-size
+    chunk while the others idle.
+
+    The fixed cost per chunk is estimated from a linear fit of chunk time
+    against chunk size. No chunk is made smaller than `min_chunk` events or
+    than the size at which that cost exceeds OVERHEAD_FRACTION of its time,
+    unless fewer events than one share per worker are left.
+    """
+
+    def __init__(self, n_events, workers, probe_size, min_chunk):
+        self.chunks = []
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self.n_events = n_events
+        self.workers = max(1, workers)
+        self.min_chunk = max(1, min_chunk)
+        self.probe_size = max(self.min_chunk, probe_size)
+        self._next_start = 0
+        self._timings = []
+
+    def take(self):
+        with self._lock:
+            if self._pending:
+                return self._pending.popleft()
+            if self._next_start >= self.n_events:
+                return None
+            start = self._next_start
+            end = min(start + self._next_size(), self.n_events)
+            # Do not leave a remainder too small to be worth its own chunk
+            if self.n_events - end < self.min_chunk:
+                end = self.n_events
+            chunk = Chunk(len(self.chunks), start, end)
+            self.chunks.append(chunk)
+            self._next_start = end
+            return chunk
+
+    def record(self, chunk):
+        with self._lock:
+            self._timings.append((chunk.events, chunk.seconds))
+
+    def _next_size(self):
+        if not self._timings:
+            return self.probe_size
+        remaining = self.n_events - self._next_start
+        guided = math.ceil(remaining / (2 * self.workers))
+        # The cost floor never makes a chunk larger than an even share of what is left
+        return max(guided, self.min_chunk, min(self.min_events(), math.ceil(remaining / self.workers)))
+
+    def cost_fit(self):
+        """(seconds per chunk, seconds per event) from finished chunks, or None."""
+        if len(self._timings) < 3 or len({n for n, _ in self._timings}) < 2:
+            return None
+        n = len(self._timings)
+        mean_x = sum(x for x, _ in self._timings) / n
+        mean_y = sum(y for _, y in self._timings) / n
+        sxx = sum((x - mean_x) ** 2 for x, _ in self._timings)
+        sxy = sum((x - mean_x) * (y - mean_y) for x, y in self._timings)
+        per_event = sxy / sxx
+        if per_event <= 0:
+            return None
+        return max(mean_y - per_event * mean_x, 0.0), per_event
+
+    def min_events(self):
+        fit = self.cost_fit()
+        if fit is None:
+            return self.min_chunk
+        overhead, per_event = fit
+        amortized = overhead * (1.0 - OVERHEAD_FRACTION) / (OVERHEAD_FRACTION * per_event)
+        return max(self.min_chunk, math.ceil(amortized))
+
+
+class OrderedMerger:
+    """Appends finished chunk files to the output in chunk order.
+
+    Chunks finish out of order; each one waits until all earlier chunks are in
+    the output and is then added with `hadd -a`. All merges run on a single
+    thread, so workers never wait for hadd. The output is built as
+    `<output>.part` and only renamed once every chunk is in.
+    """
+
+    def __init__(self, output_path, log_path):
+        self.output_path = output_path
+        self.part_path = output_path + ".part"
+        self.log_path = log_path
+        self.next_id = 0
+        self.merged_events = 0
+        self.error = None
+        self._ready = {}
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        if os.path.exists(self.part_path):
+            os.remove(self.part_path)
+
+    def submit(self, chunk, payload):
+        self._executor.submit(self._add, chunk, payload)
+
+    def _add(self, chunk, payload):
+        self._ready[chunk.id] = (chunk, payload)
+        while self.error is None and self.next_id in self._ready:
+            chunk, payload = self._ready.pop(self.next_id)
+            try:
+                self.error = self._append(chunk, payload)
+            except OSError as e:
+                self.error = f"cannot merge chunk {chunk.id}: {e}"
+            if self.error is not None:
+                return
+            self.merged_events += chunk.events
+            self.next_id += 1
+
+    def _append(self, chunk, path):
+        """Add the next chunk to the output; returns an error message or None."""
+        if self.next_id == 0:
+            shutil.move(path, self.part_path)
+            return None
+        with open(self.log_path, "a") as log:
+            result = subprocess.run(["hadd", "-a", self.part_path, path],
+                                    stdout=log, stderr=subprocess.STDOUT)
+        if result.returncode != 0:
+            return f"hadd failed on chunk {chunk.id} (see {self.log_path})"
+        os.remove(path)
+        return None
+
+    def _close(self):
+        return None
+
+    def finish(self, n_chunks, n_events):
+        """Wait for pending merges; True once all chunks and events are in the output."""
+        self._executor.shutdown(wait=True)
+        error = self._close()
+        if self.error is None:
+            self.error = error
+        if self.error is None and self.next_id == n_chunks and self.merged_events == n_events:
+            os.replace(self.part_path, self.output_path)
+            return True
+        return False
+
+
+class StreamMerger(OrderedMerger):
+    """Feeds finished chunks to one `analyze_waveforms --merge-stream` writer.
+
+    Workers run with --output-fd and send their analysis and quality check
+    files over a pipe instead of writing them to disk. The file images are
+    passed to the writer in chunk order as they arrive, and the writer merges
+    them into `<output>.part` and quality_check.root. No chunk file is written
+    and nothing is read back for a separate hadd pass.
+    """
+
+    def __init__(self, output_path, log_path, config):
+        super().__init__(output_path, log_path)
+        self._log = open(log_path, "w")
+        self._writer = subprocess.Popen(
+            [ANALYZE_BIN, "--config", config, "--output", os.path.abspath(self.part_path),
+             "--merge-stream"],
+            stdin=subprocess.PIPE, stdout=self._log, stderr=subprocess.STDOUT)
+
+    def _append(self, chunk, data):
+        try:
+            self._writer.stdin.write(data)
+            self._writer.stdin.flush()
+        except BrokenPipeError:
+            return f"merge writer exited at chunk {chunk.id} (see {self.log_path})"
+        return None
+
+    def _close(self):
+        try:
+            self._writer.stdin.close()
+        except BrokenPipeError:
+            pass
+        returncode = self._writer.wait()
+        self._log.close()
+        if returncode != 0:
+            return f"merge writer failed (see {self.log_path})"
+        return None
+
+
+def stream_complete(data):
+    """True if `data` is a whole number of --output-fd records with an analysis record."""
+    offset = 0
+    kinds = set()
+    while offset + 12 <= len(data):
+        kind, size = struct.unpack_from("<IQ", data, offset)
+        kinds.add(kind)
+        offset += 12 + size
+    return offset == len(data) and 0 in kinds
+
+
+class ParallelAnalysis:
+    def __init__(self, args, settings, n_events):
+        self.args = args
+        self.settings = settings
+        self.n_events = n_events
+        self.temp_dir = settings["temp_dir"]
+        if args.adaptive:
+            workers = max(1, args.max_cores)
+            probe_size = min(args.chunk_size, math.ceil(n_events / (4 * workers)))
+            self.queue = AdaptiveChunkQueue(n_events, workers, probe_size, args.min_chunk)
+        else:
+            self.queue = ChunkQueue(n_events, args.chunk_size)
+        output_path = os.path.join(settings["output_dir"], "root", settings["output_root"])
+        if args.stream:
+            self.merger = StreamMerger(output_path, os.path.join(self.temp_dir, "merge.log"),
+                                       args.config)
+        else:
+            self.merger = OrderedMerger(output_path, os.path.join(self.temp_dir, "merge.log"))
+        self.failed = threading.Event()
+        self._print_lock = threading.Lock()
+        self._done_events = 0
+
+    def log(self, message):
+        with self._print_lock:
+            print(message)
+            sys.stdout.flush()
+
+    def chunk_path(self, chunk):
+        return os.path.join(self.temp_dir, f"chunk_{chunk.id}.root")
+
+    def plots_path(self, chunk):
+        # Streamed runs write plot chunks straight to their final place unless they get merged
+        plots_dir = self.temp_dir
+        if self.args.stream and not self.args.merge_plots:
+            plots_dir = os.path.join(self.settings["output_dir"], "waveform_plots")
+        return os.path.abspath(os.path.join(plots_dir, f"waveform_plots_chunk_{chunk.id}"))
+
+    def run_chunk(self, chunk):
+        """Analyze one chunk; returns its output (file path or streamed bytes) or None."""
+        chunk.attempts += 1
+        chunk.status = "running"
+        command = [ANALYZE_BIN,
+                   "--config", self.args.config,
+                   "--input", self.settings["input_root"],
+                   "--output", os.path.abspath(self.chunk_path(chunk)),
+                   "--event-range", f"{chunk.start}:{chunk.end}",
+                   "--waveform-plots-file", self.plots_path(chunk)]
+        log_path = os.path.join(self.temp_dir, f"chunk_{chunk.id}.log")
+        started = time.monotonic()
+        with open(log_path, "w") as log:
+            if self.args.stream:
+                read_fd, write_fd = os.pipe()
+                try:
+                    process = subprocess.Popen(command + ["--output-fd", str(write_fd)],
+                                               stdout=log, stderr=subprocess.STDOUT,
+                                               pass_fds=(write_fd,))
+                finally:
+                    os.close(write_fd)
+                with os.fdopen(read_fd, "rb") as pipe:
+                    data = pipe.read()
+                returncode = process.wait()
+            else:
+                returncode = subprocess.run(command, stdout=log, stderr=subprocess.STDOUT).returncode
+        chunk.seconds = time.monotonic() - started
+
+        if returncode != 0:
+            return None
+        if self.args.stream:
+            return data if stream_complete(data) else None
+        return self.chunk_path(chunk) if os.path.isfile(self.chunk_path(chunk)) else None
+
+    def worker(self):
+        while not self.failed.is_set():
+            chunk = self.queue.take()
+            if chunk is None:
+                return
+            output = self.run_chunk(chunk)
+            if output is not None:
+                chunk.status = "done"
+                self.queue.record(chunk)
+                rate = chunk.events / chunk.seconds if chunk.seconds > 0 else 0.0
+                with self._print_lock:
+                    self._done_events += chunk.events
+                    print(f"  Chunk {chunk.id}: events [{chunk.start}, {chunk.end}) done in "
+                          f"{chunk.seconds:.1f} s ({rate:.0f} ev/s) "
+                          f"[{100 * self._done_events // self.n_events}%]")
+                    sys.stdout.flush()
+                self.merger.submit(chunk, output)
+            elif chunk.attempts <= self.args.retries:
+                self.log(f"  Chunk {chunk.id}: FAILED, retrying "
+                         f"(attempt {chunk.attempts + 1} of {self.args.retries + 1})")
+                self.queue.retry(chunk)
+            else:
+                chunk.status = "failed"
+                self.log(f"  Chunk {chunk.id}: FAILED "
+                         f"(see {os.path.join(self.temp_dir, f'chunk_{chunk.id}.log')})")
+                # Let running chunks finish but start no new ones
+                self.failed.set()
+
+    def run(self):
+        if self.args.adaptive:
+            n_workers = min(self.args.max_cores, math.ceil(self.n_events / self.args.min_chunk))
+        else:
+            n_workers = min(self.args.max_cores, len(self.queue.chunks))
+        n_workers = max(1, n_workers)
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=n_workers) as pool:
+            for _ in range(n_workers):
+                pool.submit(self.worker)
+        wall = time.monotonic() - started
+
+        merged = self.merger.finish(len(self.queue.chunks), self.n_events)
+        self.write_timing(wall, n_workers)
+        self.print_timing(wall, n_workers)
+        if self.merger.error:
+            print(f"ERROR: {self.merger.error}")
+        return merged
+
+    def write_timing(self, wall, n_workers):
+        with open(os.path.join(self.temp_dir, TIMING_FILE), "w") as f:
+            json.dump({"events": self.n_events, "workers": n_workers,
+                       "adaptive": self.args.adaptive,
+                       "wall_seconds": round(wall, 3),
+                       "chunks": [c.to_dict() for c in self.queue.chunks]}, f, indent=2)
+
+    def print_timing(self, wall, n_workers):
+        done = [c for c in self.queue.chunks if c.status == "done"]
+        if not done or wall <= 0:
+            return
+        busy = sum(c.seconds for c in done)
+        slowest = max(done, key=lambda c: c.seconds)
+        print("")
+        print(f"Wall time:   {wall:.1f} s for {self.n_events} events "
+              f"({self.n_events / wall:.0f} ev/s)")
+        print(f"Chunk time:  {busy:.1f} s total, slowest chunk {slowest.id} "
+              f"{slowest.seconds:.1f} s")
+        print(f"Core usage:  {100.0 * busy / (wall * n_workers):.0f}% of {n_workers} workers")
+        sizes = [c.events for c in done]
+        print(f"Chunks:      {len(done)}, {min(sizes)}-{max(sizes)} events")
+        fit = self.queue.cost_fit() if self.args.adaptive else None
+        if fit is not None:
+            print(f"Chunk cost:  {fit[0]:.2f} s fixed + {1000.0 * fit[1]:.2f} ms/event")
+
+
+def hadd_files(output, inputs, log_path):
+    with open(log_path, "w") as log:
+        return subprocess.run(["hadd", "-f", output] + inputs,
+                              stdout=log, stderr=subprocess.STDOUT).returncode == 0
+
+
+def chunk_files(temp_dir, prefix):
+    """<prefix>_chunk_N*.root files in chunk order."""
+    def chunk_key(name):
+        number = name[len(prefix) + len("_chunk_"):].split("_")[0].split(".")[0]
+        return (int(number) if number.isdigit() else -1, name)
+
+    names = [n for n in os.listdir(temp_dir)
+             if n.startswith(prefix + "_chunk_") and n.endswith(".root")]
+    return [os.path.join(temp_dir, n) for n in sorted(names, key=chunk_key)]
+
+
+def collect_plots(temp_dir, output_dir, merge_plots):
+    plots = chunk_files(temp_dir, "waveform_plots")
+    if plots:
+        plots_dir = os.path.join(output_dir, "waveform_plots")
+        os.makedirs(plots_dir, exist_ok=True)
+        if merge_plots:
+            print("Merging waveform plots files (this may take time)...")
+            target = os.path.join(plots_dir, "waveform_plots.root")
+            if hadd_files(target, plots, os.path.join(temp_dir, "merge_plots.log")):
+                print(f"Merged waveform plots into {target}")
+            else:
+                print(f"WARNING: Failed to merge waveform plots (see {temp_dir}/merge_plots.log)")
+        else:
+            print("Copying waveform plots chunks (skipping merge)...")
+            for path in plots:
+                shutil.copy2(path, plots_dir)
+            print(f"Copied plot chunks to {plots_dir}/")
+
+    # Quality check files are small, so always merge them
+    qc_files = chunk_files(temp_dir, "quality_check")
+    if qc_files:
+        print("Merging quality check files...")
+        qc_dir = os.path.join(output_dir, "quality_check")
+        os.makedirs(qc_dir, exist_ok=True)
+        target = os.path.join(qc_dir, "quality_check.root")
+        if hadd_files(target, qc_files, os.path.join(temp_dir, "merge_qc.log")):
+            print(f"Merged quality check files into {target}")
+        else:
+            print(f"WARNING: Failed to merge quality check files (see {temp_dir}/merge_qc.log)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel waveform analysis (Stage 2)")
+    parser.add_argument("--config", default="converter_config.json",
+                        help="Pipeline configuration file (default: %(default)s)")
+    parser.add_argument("--input", help="Input ROOT file name (relative to output_dir/root/)")
+    parser.add_argument("--output", help="Output ROOT file name (relative to output_dir/root/)")
+    parser.add_argument("--chunk-size", type=int,
+                        help="Events per chunk (default: common.chunk_size)")
+    parser.add_argument("--max-cores", type=int,
+                        help="Maximum parallel processes (default: common.max_cores)")
+    parser.add_argument("--temp-dir", help="Directory for chunk files and logs "
+                        "(default: common.temp_dir under output/)")
+    parser.add_argument("--adaptive", action="store_true", default=None,
+                        help="Size chunks from the measured throughput so all workers finish "
+                        "together; --chunk-size is the probe size (default: common.adaptive_chunks)")
+    parser.add_argument("--fixed", dest="adaptive", action="store_false",
+                        help="Use fixed --chunk-size chunks")
+    parser.add_argument("--min-chunk", type=int,
+                        help="Smallest adaptive chunk in events (default: common.min_chunk_size)")
+    parser.add_argument("--stream", action="store_true", default=None,
+                        help="Stream chunk outputs to a single merge writer instead of writing "
+                        "chunk files (default: common.stream_merge)")
+    parser.add_argument("--no-stream", dest="stream", action="store_false",
+                        help="Write chunk files and append them with hadd -a")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES,
+                        help="Retries of a failed chunk (default: %(default)s)")
+    parser.add_argument("--merge-plots", action="store_true",
+                        help="Merge waveform plot chunks instead of copying them")
+    args = parser.parse_args()
+
+    if not os.path.isfile(args.config):
+        print(f"ERROR: Config file not found: {args.config}")
+        sys.exit(1)
+    if not os.access(ANALYZE_BIN, os.X_OK):
+        print(f"ERROR: analyze_waveforms executable not found at {ANALYZE_BIN}")
+        print("Please run 'make' to build the executables")
+        sys.exit(1)
+    settings = load_settings(args.config)
+    if args.input:
+        settings["input_root"] = args.input
+    if args.output:
+        settings["output_root"] = args.output
+    if args.temp_dir:
+        settings["temp_dir"] = args.temp_dir
+    args.chunk_size = max(1, args.chunk_size or settings["chunk_size"])
+    args.max_cores = max(1, args.max_cores or settings["max_cores"])
+    if args.adaptive is None:
+        args.adaptive = settings["adaptive_chunks"]
+    args.min_chunk = max(1, args.min_chunk or settings["min_chunk_size"])
+    if args.stream is None:
+        args.stream = settings["stream_merge"]
+    if (not args.stream or args.merge_plots) and shutil.which("hadd") is None:
+        print("ERROR: hadd not found. Please source the ROOT environment")
+        sys.exit(1)
+
+    input_path = os.path.join(settings["output_dir"], "root", settings["input_root"])
+    if not os.path.isfile(input_path):
+        print(f"ERROR: Input file not found: {input_path}")
+        sys.exit(1)
+
+    print("==========================================")
+    print("Parallel Waveform Analysis")
+    print("==========================================")
+    print(f"Config:      {args.config}")
+    print(f"Input:       {input_path}")
+    print(f"Output:      {os.path.join(settings['output_dir'], 'root', settings['output_root'])}")
+    if args.adaptive:
+        print(f"Chunk size:  adaptive (probe <= {args.chunk_size}, min {args.min_chunk} events)")
+    else:
+        print(f"Chunk size:  {args.chunk_size} events")
+    print(f"Max cores:   {args.max_cores}")
+    print(f"Retries:     {args.retries}")
+    print(f"Merge:       {'streamed to one writer' if args.stream else 'hadd -a per chunk'}")
+    print(f"Temp dir:    {settings['temp_dir']}")
+    print("")
+
+    print("Counting events in input file...")
+    n_events = count_entries(input_path, settings["input_tree"])
+    if n_events <= 0:
+        print("ERROR: Could not determine number of events in input file")
+        print(f"       Tried to read: {input_path}")
+        sys.exit(1)
+    print(f"Total events: {n_events}")
+
+    shutil.rmtree(settings["temp_dir"], ignore_errors=True)
+    os.makedirs(settings["temp_dir"])
+
+    analysis = ParallelAnalysis(args, settings, n_events)
+    if args.adaptive:
+        print("Processing in adaptive chunks...")
+    else:
+        print(f"Processing in {len(analysis.queue.chunks)} chunks...")
+    print("")
+    if not analysis.run():
+        failed = [c.id for c in analysis.queue.chunks if c.status != "done"]
+        print(f"ERROR: {len(failed)} chunk(s) not merged: {failed}")
+        sys.exit(1)
+    print(f"Merged {len(analysis.queue.chunks)} analysis chunks into {analysis.merger.output_path}")
+    print("")
+
+    collect_plots(settings["temp_dir"], settings["output_dir"], args.merge_plots)
+    print(f"Chunk logs and timing kept in: {settings['temp_dir']}")
+    print("")
+
+    print("==========================================")
+    print("Parallel analysis complete!")
+    print("==========================================")
+    print(f"Output: {analysis.merger.output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+
+import numpy as np
+import sys
+
+import ROOT
+
+# Per-channel vector branches of the Analysis tree used by the QA tools
+QA_BRANCHES = ["sensorID", "sensorCol", "sensorRow", "ampMax", "isHorizontal"]
+
+BRANCH_DTYPES = {
+    "sensorID": np.int32,
+    "sensorCol": np.int32,
+    "sensorRow": np.int32,
+    "isHorizontal": np.bool_,
+    "hasSignal": np.bool_,
+}
+
+
+def _stack_vectors(column, dtype):
+    """Object array of RVec (one per entry) -> (n_entries, n_channels) array."""
+    if len(column) == 0:
+        return np.zeros((0, 0), dtype=dtype)
+    return np.stack([np.asarray(v, dtype=dtype) for v in column])
+
+
+def load_analysis_columns(filename, branches=QA_BRANCHES, start=0, stop=None, tree_name="Analysis"):
+    """Read `event` and per-channel vector branches for entries [start, stop).
+
+    All branches are read in one RDataFrame pass (AsNumpy) instead of per-entry
+    GetEntry / PyROOT element access. Returns a dict of NumPy arrays:
+    event -> (n,), every vector branch -> (n, n_channels).
+    """
+    f = ROOT.TFile.Open(filename, "READ")
+    if not f or f.IsZombie():
+        raise IOError(f"Cannot open {filename}")
+    tree = f.Get(tree_name)
+    if not tree:
+        f.Close()
+        raise KeyError(f"'{tree_name}' tree not found in {filename}")
+
+    n_entries = tree.GetEntries()
+    stop = n_entries if stop is None else min(stop, n_entries)
+    start = min(max(start, 0), stop)
+
+    columns = ["event"] + list(branches)
+    if stop > start:
+        df = ROOT.RDataFrame(tree)
+        if start > 0 or stop < n_entries:
+            df = df.Range(start, stop)
+        raw = df.AsNumpy(columns)
+    else:
+        raw = {name: [] for name in columns}
+
+    data = {"event": np.asarray(raw["event"], dtype=np.int64)}
+    for name in branches:
+        data[name] = _stack_vectors(raw[name], BRANCH_DTYPES.get(name, np.float32))
+
+    f.Close()
+    return data
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python read_analysis_tree.py waveforms_analyzed.root [n_entries]")
+        sys.exit(1)
+
+    stop = int(sys.argv[2]) if len(sys.argv) == 3 else None
+    data = load_analysis_columns(sys.argv[1], stop=stop)
+    print("Entries read:", len(data["event"]))
+    if len(data["event"]) > 0:
+        print("Event range:", data["event"][0], "-", data["event"][-1])
+    for name in QA_BRANCHES:
+        print(f"{name}: shape={data[name].shape} dtype={data[name].dtype}")
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import numpy as np
+import os
+import sys
+
+from read_wavedump import WaveFile
+
+# Bits of RawRun.flags (per aligned event and channel)
+FLAG_MISSING = 1         # eventCounter not present in this channel
+FLAG_BOARD_ID = 2        # boardId differs from the reference channel
+FLAG_CHANNEL_ID = 4      # channelId != channel index (special channel exempt)
+FLAG_EVENT_SIZE = 8      # eventSize differs from the first event of the file
+
+FLAG_NAMES = {
+    FLAG_MISSING: "missing",
+    FLAG_BOARD_ID: "boardId",
+    FLAG_CHANNEL_ID: "channelId",
+    FLAG_EVENT_SIZE: "eventSize",
+}
+
+
+def load_converter_config(config_path):
+    """Return the merged common + waveform_converter sections of a converter config."""
+    with open(config_path, "r") as f:
+        config = json.load(f)
+    cfg = dict(config.get("common", {}))
+    cfg.update(config.get("waveform_converter", {}))
+    return cfg
+
+
+def special_channel_index(cfg):
+    """Channel replaced by special_channel_file, or None (IsSpecialOverrideChannel)."""
+    n_channels = cfg.get("n_channels", 16)
+    index = cfg.get("special_channel_index", -1)
+    if (cfg.get("enable_special_override", False) and cfg.get("special_channel_file")
+            and 0 <= index < n_channels):
+        return index
+    return None
+
+
+def build_file_names(cfg):
+    """Input file of every channel, resolved like BuildFileName() in convert_to_root.cpp."""
+    input_dir = cfg.get("input_dir", "")
+    run_dir = ""
+    if input_dir:
+        run_dir = os.path.join(input_dir, f"{cfg.get('runnumber', 0):06d}", cfg.get("daq_name", ""))
+
+    special = special_channel_index(cfg)
+    pattern = cfg.get("input_pattern", "wave_%d.dat")
+
+    names = []
+    for ch in range(cfg.get("n_channels", 16)):
+        fname = cfg["special_channel_file"] if ch == special else pattern % ch
+        if run_dir and not fname.startswith("/"):
+            fname = os.path.join(run_dir, fname)
+        names.append(fname)
+    return names
+
+
+class RawRun:
+    """All channel files of one DAQ, aligned by eventCounter.
+
+    event_counters : (n_events,) sorted union of eventCounter over all channels
+    rows           : (n_events, n_channels) row of each event in each file, -1 if missing
+    flags          : (n_events, n_channels) bitmask of FLAG_* consistency problems
+    bad_events     : indices into event_counters with any flag set
+
+    Waveforms are only read from the memory-mapped files when requested.
+    """
+
+    def __init__(self, filenames, special_index=None, reference_channel=0):
+        self.filenames = list(filenames)
+        self.files = [WaveFile(name) for name in self.filenames]
+        self.n_channels = len(self.files)
+        self.special_index = special_index
+
+        if self.n_channels == 0:
+            raise ValueError("No channel files given")
+
+        nsamples = {wf.nsamples for wf in self.files}
+        if len(nsamples) != 1:
+            raise ValueError(f"Channels have different nsamples: {sorted(nsamples)}")
+        self.nsamples = nsamples.pop()
+
+        counters = [wf.header["event_counter"] for wf in self.files]
+        self.event_counters = np.unique(np.concatenate(counters))
+        n_events = len(self.event_counters)
+
+        self.rows = np.full((n_events, self.n_channels), -1, dtype=np.int64)
+        for ch, c in enumerate(counters):
+            pos = np.searchsorted(self.event_counters, c)
+            self.rows[pos, ch] = np.arange(len(c))
+
+        present = self.rows >= 0
+        safe_rows = np.where(present, self.rows, 0)
+
+        board_ids = np.zeros((n_events, self.n_channels), dtype=np.uint32)
+        channel_ids = np.zeros((n_events, self.n_channels), dtype=np.uint32)
+        event_sizes = np.zeros((n_events, self.n_channels), dtype=np.uint32)
+        for ch, wf in enumerate(self.files):
+            if wf.n_events == 0:
+                continue
+            header = wf.header[safe_rows[:, ch]]
+            board_ids[:, ch] = header["board_id"]
+            channel_ids[:, ch] = header["channel_id"]
+            event_sizes[:, ch] = header["event_size"]
+
+        ref_board = board_ids[:, reference_channel:reference_channel + 1]
+        ref_present = present[:, reference_channel:reference_channel + 1]
+        expected_channel = np.arange(self.n_channels, dtype=np.uint32)
+        expected_size = np.array([wf.event_size for wf in self.files], dtype=np.uint32)
+
+        board_bad = (board_ids != ref_board) & ref_present
+        channel_bad = channel_ids != expected_channel
+        if special_index is not None:
+            channel_bad[:, special_index] = False
+
+        self.flags = np.zeros((n_events, self.n_channels), dtype=np.uint8)
+        self.flags[~present] |= FLAG_MISSING
+        self.flags[board_bad & present] |= FLAG_BOARD_ID
+        self.flags[channel_bad & present] |= FLAG_CHANNEL_ID
+        self.flags[(event_sizes != expected_size) & present] |= FLAG_EVENT_SIZE
+
+        self.board_ids = board_ids
+        self.channel_ids = channel_ids
+        self.bad_events = np.flatnonzero(self.flags.any(axis=1))
+
+    @classmethod
+    def from_config(cls, cfg):
+        return cls(build_file_names(cfg), special_index=special_channel_index(cfg))
+
+    @property
+    def n_events(self):
+        return len(self.event_counters)
+
+    def __len__(self):
+        return self.n_events
+
+    def waveforms(self, events=None, fill=np.nan):
+        """Return an (event, channel, sample) float32 array.
+
+        events selects aligned events (slice, index array or boolean mask);
+        missing channels are filled with `fill`.
+        """
+        rows = self.rows if events is None else self.rows[events]
+        if rows.ndim == 1:
+            rows = rows[np.newaxis, :]
+
+        out = np.empty((rows.shape[0], self.n_channels, self.nsamples), dtype=np.float32)
+        for ch, wf in enumerate(self.files):
+            present = rows[:, ch] >= 0
+            out[~present, ch, :] = fill
+            if present.any():
+                out[present, ch, :] = wf.samples[rows[present, ch]]
+        return out
+
+    def find_event(self, event_counter):
+        """Aligned index of an eventCounter value, or -1."""
+        pos = np.searchsorted(self.event_counters, event_counter)
+        if pos < self.n_events and self.event_counters[pos] == event_counter:
+            return int(pos)
+        return -1
+
+    def describe_flags(self, index):
+        """Human readable list of problems for one aligned event."""
+        problems = []
+        for ch in np.flatnonzero(self.flags[index]):
+            names = [name for bit, name in FLAG_NAMES.items() if self.flags[index, ch] & bit]
+            problems.append(f"ch{ch}: {','.join(names)}")
+        return problems
+
+
+def print_summary(run, max_report=10):
+    print("=" * 60)
+    for ch, name in enumerate(run.filenames):
+        print(f"ch{ch:02d}: {name} ({run.files[ch].n_events} events)")
+    print("=" * 60)
+    print("Aligned events:", run.n_events)
+    print("Samples/event:", run.nsamples)
+    if run.n_events > 0:
+        print("Event counter range:", run.event_counters[0], "-", run.event_counters[-1])
+
+    print("\n=== Consistency ===")
+    for bit, name in FLAG_NAMES.items():
+        n_bad = np.count_nonzero((run.flags & bit).any(axis=1))
+        print(f"{name} mismatches: {n_bad} events")
+    print("Events with any problem:", len(run.bad_events))
+
+    for index in run.bad_events[:max_report]:
+        print(f"  event {run.event_counters[index]}: {'; '.join(run.describe_flags(index))}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Open all channel files of one DAQ and check consistency.")
+    parser.add_argument("--config", help="Converter configuration JSON")
+    parser.add_argument("--dir", help="Directory holding the channel files (overrides input_dir/run/daq)")
+    parser.add_argument("--max-report", type=int, default=10, help="Number of bad events to list")
+    args = parser.parse_args()
+
+    if not args.config and not args.dir:
+        parser.print_usage()
+        sys.exit(1)
+
+    cfg = load_converter_config(args.config) if args.config else {}
+    if args.dir:
+        cfg["input_dir"] = ""
+        cfg.setdefault("input_pattern", "wave_%d.dat")
+        names = [os.path.join(args.dir, name) for name in build_file_names(cfg)]
+        run = RawRun(names, special_index=special_channel_index(cfg))
+    else:
+        run = RawRun.from_config(cfg)
+
+    print_summary(run, args.max_report)
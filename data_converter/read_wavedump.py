@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+
+import numpy as np
+import os
+import sys
+
+# Same layout as ReadHeader() in src/utils/file_io.cpp: 8 uint32 words (32 bytes)
+HEADER_WORDS = 8
+HEADER_BYTES = HEADER_WORDS * 4
+
+HEADER_DTYPE = np.dtype([
+    ("event_size", "<u4"),
+    ("board_id", "<u4"),
+    ("pattern", "<u4"),
+    ("channel_id", "<u4"),
+    ("event_counter", "<u4"),
+    ("trigger_time_tag", "<u4"),
+    ("dc_offset", "<u4"),
+    ("start_cell", "<u4"),
+])
+
+
+class WaveFile:
+    """Memory-mapped view of one WaveDump binary file (wave_N.dat / TR_0_N.dat).
+
+    header  : (n_events,) structured array with HEADER_DTYPE fields
+    samples : (n_events, nsamples) float32 array
+
+    Both are views on the file, nothing is read until it is accessed.
+    A trailing partial event (file still being written) is ignored.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+
+        first = np.fromfile(filename, dtype=HEADER_DTYPE, count=1)
+        if len(first) == 0:
+            raise ValueError(f"Empty or truncated file: {filename}")
+
+        event_size = int(first["event_size"][0])
+        if event_size <= HEADER_BYTES or (event_size - HEADER_BYTES) % 4 != 0:
+            raise ValueError(f"Invalid event size {event_size} in {filename}")
+
+        self.event_size = event_size
+        self.nsamples = (event_size - HEADER_BYTES) // 4
+
+        record = np.dtype([
+            ("header", HEADER_DTYPE),
+            ("samples", "<f4", (self.nsamples,)),
+        ])
+        assert record.itemsize == event_size
+
+        file_size = os.path.getsize(filename)
+        self.n_events = file_size // event_size
+
+        if self.n_events > 0:
+            self.records = np.memmap(filename, dtype=record, mode="r",
+                                     shape=(self.n_events,))
+        else:
+            self.records = np.zeros(0, dtype=record)
+        self.header = self.records["header"]
+        self.samples = self.records["samples"]
+
+    def __len__(self):
+        return self.n_events
+
+    def __getitem__(self, index):
+        return self.header[index], self.samples[index]
+
+    def check_event_size(self):
+        """Return indices of events whose header eventSize differs from the first."""
+        return np.flatnonzero(self.header["event_size"] != self.event_size)
+
+
+def open_wave_file(filename):
+    return WaveFile(filename)
+
+
+def print_summary(filename):
+    wf = WaveFile(filename)
+
+    print("=" * 60)
+    print(f"File: {filename}")
+    print("=" * 60)
+    print("Events:", wf.n_events)
+    print("Samples/event:", wf.nsamples)
+    print("Event size (bytes):", wf.event_size)
+
+    if wf.n_events == 0:
+        return
+
+    counters = wf.header["event_counter"]
+    print("Board IDs:", np.unique(wf.header["board_id"]))
+    print("Channel IDs:", np.unique(wf.header["channel_id"]))
+    print("Event counter range:", counters[0], "-", counters[-1])
+
+    bad = wf.check_event_size()
+    if len(bad) > 0:
+        print(f"WARNING: {len(bad)} events with inconsistent event size (first at {bad[0]})")
+
+    print("\n=== First event ===")
+    print("header:", wf.header[0])
+    print("samples[:8]:", wf.samples[0, :8])
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python read_wavedump.py wave_N.dat")
+        sys.exit(1)
+
+    print_summary(sys.argv[1])
@@ -29,6 +29,9 @@ RUN_STAGE2=true
 RUN_STAGE3=true
 VERBOSE=false
 USE_PARALLEL=false
+USE_FEATURE_CACHE=true
+INCREMENTAL=false
+FUSED=false
 
 print_usage() {
     cat << EOF
@@ -48,6 +51,9 @@ Options:
     --skip-stage2            Skip stage 2 (waveform_analyzer)
     --skip-stage3            Skip stage 3 (hdf5_exporter)
     --parallel               Force parallel processing (overrides config auto-detection)
+    --no-feature-cache       Always re-run stage 2, ignoring the feature cache
+    --incremental            Only convert, analyze and export events appended since the last run
+    --fused                  Analyze the wave_N.dat files directly, without writing $RAW_ROOT
     --verbose                Verbose output
     -h, --help               Show this help message
 
@@ -62,6 +68,30 @@ Stages:
     Stage 2: waveform_analyzer (analyze_waveforms)  - Extract timing and amplitude features
     Stage 3: hdf5_exporter (export_to_hdf5)         - Export analyzed ROOT data to HDF5 format
 
+Feature Cache:
+    Stage 2 outputs are cached under <output_dir>/<run>/<daq>/output/cache/, keyed by
+    the size/mtime of the raw channel files and the analysis settings. When the key
+    matches, stage 2 (and the stage 2.5 QA plots) is skipped and the cached
+    $ANALYSIS_ROOT is restored; on a miss the changed channels are reported.
+
+Incremental Mode:
+    With --incremental, convert_to_root resumes each wave_N.dat from the byte offset
+    stored in root/$RAW_ROOT.state and appends the new events to $RAW_ROOT. Stage 2
+    analyzes only the new entries and stage 3 appends their hits to the existing HDF5
+    files (--stream --append; the first increment recreates them). Only after a
+    successful export are they merged into $ANALYSIS_ROOT with hadd -a and counted in
+    root/$ANALYSIS_ROOT.progress, so a failed run is redone next time; events a
+    failed export already wrote are not appended twice. Rerun it periodically during
+    data taking.
+    Incremental mode is sequential and skips the feature cache and stage 2.5.
+
+Fused Mode:
+    With --fused, stage 1 is skipped and analyze_waveforms --from-raw reads the binary
+    wave_N.dat files once, subtracts the pedestals in memory and writes $ANALYSIS_ROOT
+    directly; stage 3 then exports it as usual. No $RAW_ROOT is written, so use the
+    normal mode when the raw waveforms are needed (waveform HDF5 export, re-analysis).
+    Fused mode is sequential and needs binary input.
+
 Output Organization:
     All outputs are organized in subdirectories (default: output/):
       output/root/            - ROOT files (waveforms.root, waveforms_analyzed.root)
@@ -83,6 +113,9 @@ Examples:
     # Run only conversion step
     $0 --stage1-only
 
+    # Analyze the raw files directly and export, without waveforms.root
+    $0 --fused
+
     # Skip analysis, only convert (no analysis HDF5 will be produced)
     $0 --skip-stage2
 
@@ -146,6 +179,19 @@ while [[ $# -gt 0 ]]; do
             USE_PARALLEL=false
             shift
             ;;
+        --no-feature-cache)
+            USE_FEATURE_CACHE=false
+            shift
+            ;;
+        --incremental)
+            INCREMENTAL=true
+            shift
+            ;;
+        --fused)
+            FUSED=true
+            RUN_STAGE1=false
+            shift
+            ;;
         --verbose)
             VERBOSE=true
             shift
@@ -248,6 +294,23 @@ except:
     fi
 fi
 
+if [ "$INCREMENTAL" = true ]; then
+    # Offsets and entry counts only make sense for one sequential writer
+    USE_PARALLEL=false
+    USE_FEATURE_CACHE=false
+    echo "INFO: Incremental mode (only events appended since the last run are processed)"
+fi
+
+if [ "$FUSED" = true ]; then
+    if [ "$INCREMENTAL" = true ]; then
+        echo "ERROR: --fused cannot be combined with --incremental"
+        exit 1
+    fi
+    # The raw files are read in one sequential pass
+    USE_PARALLEL=false
+    echo "INFO: Fused mode (stage 2 reads the raw wave_N.dat files, no $RAW_ROOT)"
+fi
+
 echo "=========================================="
 echo "Waveform Processing Pipeline"
 echo "=========================================="
@@ -273,7 +336,9 @@ if [ "$RUN_STAGE1" = true ]; then
     fi
 
     # Note: convert_to_root reads output_dir from config and automatically creates output_dir/root/
-    if [ "$USE_PARALLEL" = true ]; then
+    if [ "$INCREMENTAL" = true ]; then
+        "${SCRIPT_DIR}/convert_to_root" --config "$PIPELINE_CONFIG" --root "$RAW_ROOT" --incremental
+    elif [ "$USE_PARALLEL" = true ]; then
         "${SCRIPT_DIR}/convert_to_root" --config "$PIPELINE_CONFIG" --root "$RAW_ROOT" --parallel
     else
         "${SCRIPT_DIR}/convert_to_root" --config "$PIPELINE_CONFIG" --root "$RAW_ROOT"
@@ -286,15 +351,70 @@ if [ "$RUN_STAGE1" = true ]; then
     echo ""
 fi
 
+# Stage 2 (incremental): analyze only the entries appended to the raw ROOT file
+INCREMENT_ROOT="${ANALYSIS_ROOT%.root}_increment.root"
+INCREMENT_EVENTS=0
+if [ "$INCREMENTAL" = true ] && [ "$RUN_STAGE2" = true ]; then
+    STATE_FILE="$OUTPUT_DIR/root/$RAW_ROOT.state"
+    PROGRESS_FILE="$OUTPUT_DIR/root/$ANALYSIS_ROOT.progress"
+
+    if [ ! -f "$STATE_FILE" ]; then
+        echo "ERROR: $STATE_FILE not found"
+        echo "Please run stage 1 with --incremental first"
+        exit 1
+    fi
+    TOTAL_ENTRIES=$(sed -nE 's/^entries[[:space:]]+([0-9]+)$/\1/p' "$STATE_FILE")
+    DONE_ENTRIES=0
+    if [ -f "$PROGRESS_FILE" ] && [ -f "$OUTPUT_DIR/root/$ANALYSIS_ROOT" ]; then
+        DONE_ENTRIES=$(cat "$PROGRESS_FILE")
+    fi
+
+    echo "Stage 2: Analyzing new waveforms (incremental)..."
+    echo "  Input:  $OUTPUT_DIR/root/$RAW_ROOT"
+    echo "  Output: $OUTPUT_DIR/root/$ANALYSIS_ROOT"
+    echo "  Range:  [$DONE_ENTRIES, $TOTAL_ENTRIES)"
+    echo ""
+
+    if [ "$TOTAL_ENTRIES" -gt "$DONE_ENTRIES" ]; then
+        "${SCRIPT_DIR}/analyze_waveforms" --config "$PIPELINE_CONFIG" --input "$RAW_ROOT" \
+            --output "$INCREMENT_ROOT" --event-range "$DONE_ENTRIES:$TOTAL_ENTRIES"
+
+        # Appended to $ANALYSIS_ROOT (and counted in the progress file) after stage 3
+        INCREMENT_EVENTS=$((TOTAL_ENTRIES - DONE_ENTRIES))
+        echo "  Analyzed $INCREMENT_EVENTS new events"
+    else
+        echo "  No new events"
+    fi
+    echo ""
+    # Stage 2 is done; skip the full-run blocks below
+    RUN_STAGE2=skip
+fi
+
+# Stage 2: reuse cached features when raw files and analysis settings are unchanged
+FEATURE_CACHE_DIR="$OUTPUT_DIR/cache"
+STAGE2_CACHED=false
+if [ "$RUN_STAGE2" = true ] && [ "$USE_FEATURE_CACHE" = true ]; then
+    if python3 "${SCRIPT_DIR}/feature_cache.py" restore --config "$PIPELINE_CONFIG" \
+        --cache-dir "$FEATURE_CACHE_DIR" --output "$OUTPUT_DIR/root/$ANALYSIS_ROOT"; then
+        STAGE2_CACHED=true
+        echo "Stage 2: skipped (cached features match raw files and settings)"
+        echo ""
+    fi
+fi
+
 # Stage 2: Analyze waveforms
-if [ "$RUN_STAGE2" = true ]; then
+if [ "$RUN_STAGE2" = true ] && [ "$STAGE2_CACHED" = false ]; then
     echo "Stage 2: Analyzing waveforms..."
     echo "  Config: $PIPELINE_CONFIG"
-    echo "  Input:  $OUTPUT_DIR/root/$RAW_ROOT"
+    if [ "$FUSED" = true ]; then
+        echo "  Input:  raw wave_N.dat files"
+    else
+        echo "  Input:  $OUTPUT_DIR/root/$RAW_ROOT"
+    fi
     echo "  Output: $OUTPUT_DIR/root/$ANALYSIS_ROOT"
     
     # Check for input file (it should be in output_dir/root/)
-    if [ ! -f "$OUTPUT_DIR/root/$RAW_ROOT" ]; then
+    if [ "$FUSED" = false ] && [ ! -f "$OUTPUT_DIR/root/$RAW_ROOT" ]; then
         echo "ERROR: Input file $OUTPUT_DIR/root/$RAW_ROOT not found"
         echo "Please run stage 1 first or specify correct input file"
         exit 1
@@ -317,7 +437,11 @@ if [ "$RUN_STAGE2" = true ]; then
             exit 1
         fi
     else
-        echo "  Mode:   SEQUENTIAL"
+        if [ "$FUSED" = true ]; then
+            echo "  Mode:   FUSED"
+        else
+            echo "  Mode:   SEQUENTIAL"
+        fi
         echo ""
 
         if [ ! -f "${SCRIPT_DIR}/analyze_waveforms" ]; then
@@ -326,7 +450,11 @@ if [ "$RUN_STAGE2" = true ]; then
             exit 1
         fi
 
-        "${SCRIPT_DIR}/analyze_waveforms" --config "$PIPELINE_CONFIG" --input "$RAW_ROOT" --output "$ANALYSIS_ROOT"
+        if [ "$FUSED" = true ]; then
+            "${SCRIPT_DIR}/analyze_waveforms" --config "$PIPELINE_CONFIG" --output "$ANALYSIS_ROOT" --from-raw
+        else
+            "${SCRIPT_DIR}/analyze_waveforms" --config "$PIPELINE_CONFIG" --input "$RAW_ROOT" --output "$ANALYSIS_ROOT"
+        fi
 
         if [ $? -ne 0 ]; then
             echo "ERROR: Stage 2 failed"
@@ -335,6 +463,12 @@ if [ "$RUN_STAGE2" = true ]; then
     fi
     echo ""
 
+    if [ "$USE_FEATURE_CACHE" = true ]; then
+        python3 "${SCRIPT_DIR}/feature_cache.py" store --config "$PIPELINE_CONFIG" \
+            --cache-dir "$FEATURE_CACHE_DIR" --output "$OUTPUT_DIR/root/$ANALYSIS_ROOT" ||
+            echo "WARNING: could not store features in cache (continuing anyway)"
+    fi
+
     # Stage 2.5: Generate quality check plots
     echo "Stage 2.5: Generating quality check plots..."
     echo "  Config: $PIPELINE_CONFIG"
@@ -392,47 +526,106 @@ except:
         SENSOR_IDS=""
     fi
 
+    # Streaming (chunked, compressed) HDF5 output from corry_export settings
+    EXPORT_STREAM_ARGS=()
+    if [ -f "$PIPELINE_CONFIG" ]; then
+        read -r -a EXPORT_STREAM_ARGS <<< "$(python3 -c "
+import json, sys
+try:
+    with open('$PIPELINE_CONFIG') as f:
+        config = json.load(f)
+        corry = config.get('waveform_analyzer', {}).get('corry_export', {})
+        if corry.get('streaming', False):
+            args = ['--stream']
+            if 'chunk_rows' in corry:
+                args += ['--chunk-rows', str(int(corry['chunk_rows']))]
+            if 'compression_level' in corry:
+                args += ['--compression', str(int(corry['compression_level']))]
+            if 'flush_events' in corry:
+                args += ['--flush-events', str(int(corry['flush_events']))]
+            print(' '.join(args))
+except:
+    print('')
+" 2>/dev/null)"
+        if [ ${#EXPORT_STREAM_ARGS[@]} -gt 0 ]; then
+            echo "  Streaming HDF5 output: ${EXPORT_STREAM_ARGS[*]}"
+        fi
+    fi
+
+    # Incremental mode: export only the new entries and append them to the HDF5 files.
+    # The first increment recreates the files, so output of an earlier full run is
+    # not extended; --append skips events already stored by a partly failed export.
+    EXPORT_INPUT="$ANALYSIS_ROOT"
+    if [ "$INCREMENTAL" = true ]; then
+        EXPORT_INPUT="$INCREMENT_ROOT"
+        if [ ${#EXPORT_STREAM_ARGS[@]} -eq 0 ]; then
+            EXPORT_STREAM_ARGS=(--stream)
+        fi
+        if [ "$DONE_ENTRIES" -gt 0 ]; then
+            EXPORT_STREAM_ARGS+=(--append)
+        fi
+        if [ "$INCREMENT_EVENTS" -eq 0 ]; then
+            echo "  No new events to export"
+            EXPORT_INPUT=""
+        fi
+    fi
+
     # Export to Corryvreckan HDF5 format if analysis exists
-    if [ -f "$OUTPUT_DIR/root/$ANALYSIS_ROOT" ] && [ "$RUN_STAGE2" = true ] || [ "$RUN_STAGE2" = false ]; then
+    if [ -n "$EXPORT_INPUT" ] && { [ -f "$OUTPUT_DIR/root/$EXPORT_INPUT" ] && [ "$RUN_STAGE2" != false ] || [ "$RUN_STAGE2" = false ]; }; then
         if [ -n "$SENSOR_IDS" ]; then
             # Export per sensor in Corryvreckan format
             for SENSOR_ID in $SENSOR_IDS; do
                 OUTPUT_FILE="waveforms_corry_sensor$(printf '%02d' $SENSOR_ID).h5"
                 echo "  Exporting Corryvreckan Hits for sensor $SENSOR_ID..."
-                echo "    Input:  $OUTPUT_DIR/root/$ANALYSIS_ROOT"
+                echo "    Input:  $OUTPUT_DIR/root/$EXPORT_INPUT"
                 echo "    Output: $OUTPUT_DIR/hdf5/$OUTPUT_FILE"
 		
 		echo "OUTPUT_DIR=" $OUTPUT_DIR
 		echo "ANALYSIS_ROOT=" $ANALYSIS_ROOT
 		echo "OUTPUT_FILE=" $OUTPUT_FILE
 		
-                "${SCRIPT_DIR}/export_to_hdf5" --mode corry --input "$ANALYSIS_ROOT" --tree Analysis \
+                if ! "${SCRIPT_DIR}/export_to_hdf5" --mode corry --input "$EXPORT_INPUT" --tree Analysis \
                     --output "$OUTPUT_FILE" --output-dir "$OUTPUT_DIR" \
                     --sensor-id "$SENSOR_ID" --sensor-mapping "$PIPELINE_CONFIG" \
-                    --column-id 1
-
-                if [ $? -ne 0 ]; then
-                    echo "WARNING: Corryvreckan export failed for sensor $SENSOR_ID (continuing anyway)"
+                    --column-id 1 "${EXPORT_STREAM_ARGS[@]}"; then
+                    echo "ERROR: Corryvreckan export failed for sensor $SENSOR_ID"
+                    exit 1
                 fi
             done
         else
             # Export all channels to single file in Corryvreckan format
             echo "  Exporting Corryvreckan Hits (all channels)..."
-            echo "    Input:  $OUTPUT_DIR/root/$ANALYSIS_ROOT"
+            echo "    Input:  $OUTPUT_DIR/root/$EXPORT_INPUT"
             echo "    Output: $OUTPUT_DIR/hdf5/$ANALYSIS_HDF5"
 
-            "${SCRIPT_DIR}/export_to_hdf5" --mode corry --input "$ANALYSIS_ROOT" --tree Analysis \
+            if ! "${SCRIPT_DIR}/export_to_hdf5" --mode corry --input "$EXPORT_INPUT" --tree Analysis \
                 --output "$ANALYSIS_HDF5" --output-dir "$OUTPUT_DIR" \
-                --sensor-mapping "$PIPELINE_CONFIG" --column-id 1
-
-            if [ $? -ne 0 ]; then
-                echo "WARNING: Corryvreckan export failed (continuing anyway)"
+                --sensor-mapping "$PIPELINE_CONFIG" --column-id 1 "${EXPORT_STREAM_ARGS[@]}"; then
+                echo "ERROR: Corryvreckan export failed"
+                exit 1
             fi
         fi
         echo ""
     fi
 fi
 
+# Incremental mode: the new entries only count as done once they are exported,
+# otherwise the next run analyzes and exports them again
+if [ "$INCREMENTAL" = true ]; then
+    if [ "$INCREMENT_EVENTS" -gt 0 ]; then
+        if [ "$DONE_ENTRIES" -eq 0 ]; then
+            cp "$OUTPUT_DIR/root/$INCREMENT_ROOT" "$OUTPUT_DIR/root/$ANALYSIS_ROOT"
+        elif ! hadd -a "$OUTPUT_DIR/root/$ANALYSIS_ROOT" "$OUTPUT_DIR/root/$INCREMENT_ROOT" > /dev/null; then
+            echo "ERROR: failed to append new entries to $ANALYSIS_ROOT"
+            exit 1
+        fi
+        echo "$TOTAL_ENTRIES" > "$PROGRESS_FILE"
+        echo "Appended $INCREMENT_EVENTS events to $ANALYSIS_ROOT"
+        echo ""
+    fi
+    rm -f "$OUTPUT_DIR/root/$INCREMENT_ROOT"
+fi
+
 echo "=========================================="
 echo "Pipeline completed successfully!"
 echo "=========================================="
@@ -1,7 +1,9 @@
 #include <algorithm>
 #include <cctype>
+#include <cerrno>
 #include <cmath>
 #include <cstdint>
+#include <cstdio>
 #include <limits>
 #include <iostream>
 #include <map>
@@ -9,8 +11,12 @@
 #include <string>
 #include <vector>
 
+#include <unistd.h>
+
 #include "utils/file_io.h"
 #include "TFile.h"
+#include "TFileMerger.h"
+#include "TMemFile.h"
 #include "TDirectory.h"
 #include "TTree.h"
 #include "TGraph.h"
@@ -24,20 +30,15 @@
 #include "TMath.h"
 
 #include "config/analysis_config.h"
+#include "config/wave_converter_config.h"
 #include "analysis/waveform_math.h"
 #include "analysis/waveform_plotting.h"
+#include "utils/raw_event_reader.h"
 
 using namespace std;
 
 namespace {
 
-std::string to6digits(int n) {
-    std::ostringstream oss;
-    oss << std::setw(6) << std::setfill('0') << n;
-    return oss.str();
-}
-
-  
 bool EnsureParentDirectory(const std::string &path) {
   size_t lastSlash = path.find_last_of('/');
   if (lastSlash != std::string::npos) {
@@ -49,20 +50,41 @@ bool EnsureParentDirectory(const std::string &path) {
   return true;
 }
 
-enum class NsamplesPolicy { kStrict, kPad };
+// --output-fd streams each output file as one record: uint32 kind, uint64 size,
+// then `size` bytes of a ROOT file image. --merge-stream reads them from stdin.
+enum StreamRecordKind : uint32_t { kStreamAnalysis = 0, kStreamQualityCheck = 1 };
 
-NsamplesPolicy ResolveNsamplesPolicy(const std::string &policyText) {
-  std::string lowered = policyText;
-  std::transform(lowered.begin(), lowered.end(), lowered.begin(),
-                 [](unsigned char c) { return static_cast<char>(std::tolower(c)); });
-  if (lowered == "pad") {
-    return NsamplesPolicy::kPad;
-  }
-  if (lowered != "strict") {
-    std::cerr << "WARNING: unknown nsamples_policy '" << policyText
-              << "', defaulting to 'strict'" << std::endl;
+bool WriteAll(int fd, const char *data, size_t size) {
+  while (size > 0) {
+    ssize_t n = write(fd, data, size);
+    if (n < 0 && errno == EINTR) {
+      continue;
+    }
+    if (n <= 0) {
+      return false;
+    }
+    data += n;
+    size -= static_cast<size_t>(n);
   }
-  return NsamplesPolicy::kStrict;
+  return true;
+}
+
+// Finish an in-memory output file and send its image to fd
+bool WriteStreamRecord(int fd, uint32_t kind, TMemFile *file) {
+  file->Write();
+  std::vector<char> buffer(static_cast<size_t>(file->GetSize()));
+  file->CopyTo(buffer.data(), static_cast<Long64_t>(buffer.size()));
+  uint64_t size = buffer.size();
+  return WriteAll(fd, reinterpret_cast<const char *>(&kind), sizeof(kind)) &&
+         WriteAll(fd, reinterpret_cast<const char *>(&size), sizeof(size)) &&
+         WriteAll(fd, buffer.data(), buffer.size());
+}
+
+std::string OutputBase(const AnalysisConfig &cfg) {
+  std::string base = cfg.output_dir() + '/';
+  base += to6digits(cfg.runnumber()) + '/';
+  base += cfg.daq_name() + "/output/";
+  return base;
 }
 
 // Helper to check if sensor should be displayed horizontally
@@ -353,7 +375,12 @@ FitFeatures ComputeFitFeatures(
     return res;
 }
 
-bool RunAnalysis(const AnalysisConfig &cfg, Long64_t eventStart = -1, Long64_t eventEnd = -1) {
+// With outputFd >= 0 the analysis and quality check files are built in memory
+// and streamed to that descriptor instead of being written to disk.
+// With rawCfg set the events are read straight from the wave_N.dat files
+// (same pedestal subtraction as convert_to_root) and no Waveforms tree is needed.
+bool RunAnalysis(const AnalysisConfig &cfg, Long64_t eventStart = -1, Long64_t eventEnd = -1,
+                 int outputFd = -1, const WaveConverterConfig *rawCfg = nullptr) {
   // Maximum file size for waveform plots: 4 GB
   const Long64_t MAX_PLOTS_FILE_SIZE = 4LL * 1024 * 1024 * 1024;  // 4 GB in bytes
   
@@ -361,9 +388,7 @@ bool RunAnalysis(const AnalysisConfig &cfg, Long64_t eventStart = -1, Long64_t e
   TFile *waveformPlotsFile = nullptr;
   int waveformPlotsFileCounter = 0;
 
-  string outname_base = cfg.output_dir()+'/';
-  outname_base += to6digits(cfg.runnumber())+'/';
-  outname_base += cfg.daq_name()+"/output/";
+  string outname_base = OutputBase(cfg);
   
   auto openWaveformPlotsFile = [&](TFile *&outFile, int fileNum) {
     if (!cfg.waveform_plots_enabled) {
@@ -448,7 +473,10 @@ bool RunAnalysis(const AnalysisConfig &cfg, Long64_t eventStart = -1, Long64_t e
     
     std::string qualityCheckFileName = BuildOutputPath(outname_base, "quality_check",
                                                        qualityCheckBaseName + ".root");
-    if (!EnsureParentDirectory(qualityCheckFileName)) {
+    if (outputFd >= 0) {
+      qualityCheckFile = new TMemFile(qualityCheckFileName.c_str(), "RECREATE");
+      std::cout << "Quality check output enabled. Streaming to the merge writer" << std::endl;
+    } else if (!EnsureParentDirectory(qualityCheckFileName)) {
       std::cerr << "WARNING: Failed to create quality_check output directory for "
                 << qualityCheckFileName << std::endl;
     } else {
@@ -464,53 +492,68 @@ bool RunAnalysis(const AnalysisConfig &cfg, Long64_t eventStart = -1, Long64_t e
     }
   }
 
-  // Build input path: output_dir/root/input_root
-  std::string inputPath = BuildOutputPath(outname_base, "root", cfg.input_root());
+  TFile *inputFile = nullptr;
+  TTree *inputTree = nullptr;
+  RawEventReader rawReader;
+  RawEvent rawEvent;
+  Long64_t startEntry = 0;
+  Long64_t endEntry = 0;
 
-  // Open input ROOT file
-  TFile *inputFile = TFile::Open(inputPath.c_str(), "READ");
-  if (!inputFile || inputFile->IsZombie()) {
-    std::cerr << "ERROR: cannot open input ROOT file " << inputPath << std::endl;
-    return false;
-  }
-  std::cout << "Reading input file: " << inputPath << std::endl;
+  if (rawCfg) {
+    if (!rawReader.Open(*rawCfg)) {
+      return false;
+    }
+    // Only an estimate for progress reporting, the loop runs until the data ends
+    endEntry = rawReader.EstimatedEvents();
+  } else {
+    // Build input path: output_dir/root/input_root
+    std::string inputPath = BuildOutputPath(outname_base, "root", cfg.input_root());
+
+    // Open input ROOT file
+    inputFile = TFile::Open(inputPath.c_str(), "READ");
+    if (!inputFile || inputFile->IsZombie()) {
+      std::cerr << "ERROR: cannot open input ROOT file " << inputPath << std::endl;
+      return false;
+    }
+    std::cout << "Reading input file: " << inputPath << std::endl;
 
-  TTree *inputTree = dynamic_cast<TTree *>(inputFile->Get(cfg.input_tree().c_str()));
-  if (!inputTree) {
-    std::cerr << "ERROR: cannot find tree " << cfg.input_tree() << std::endl;
-    inputFile->Close();
-    return false;
-  }
+    inputTree = dynamic_cast<TTree *>(inputFile->Get(cfg.input_tree().c_str()));
+    if (!inputTree) {
+      std::cerr << "ERROR: cannot find tree " << cfg.input_tree() << std::endl;
+      inputFile->Close();
+      return false;
+    }
 
-  // Pre-warm I/O: reduces the slow-start caused by cold disk reads
-  inputTree->SetCacheSize(256LL * 1024 * 1024);  // 256 MB read-ahead cache
-  inputTree->AddBranchToCache("*", true);
-  inputTree->StopCacheLearningPhase();
+    // Pre-warm I/O: reduces the slow-start caused by cold disk reads
+    inputTree->SetCacheSize(256LL * 1024 * 1024);  // 256 MB read-ahead cache
+    inputTree->AddBranchToCache("*", true);
+    inputTree->StopCacheLearningPhase();
 
-  // Get number of entries
-  Long64_t totalEntries = inputTree->GetEntries();
-  if (totalEntries == 0) {
-    std::cerr << "ERROR: input tree has no entries" << std::endl;
-    inputFile->Close();
-    return false;
-  }
+    // Get number of entries
+    Long64_t totalEntries = inputTree->GetEntries();
+    if (totalEntries == 0) {
+      std::cerr << "ERROR: input tree has no entries" << std::endl;
+      inputFile->Close();
+      return false;
+    }
 
-  // Determine event range to process
-  Long64_t startEntry = (eventStart >= 0) ? eventStart : 0;
-  Long64_t endEntry = (eventEnd >= 0) ? eventEnd : totalEntries;
+    // Determine event range to process
+    startEntry = (eventStart >= 0) ? eventStart : 0;
+    endEntry = (eventEnd >= 0) ? eventEnd : totalEntries;
 
-  // Validate range
-  if (startEntry < 0) startEntry = 0;
-  if (endEntry > totalEntries) endEntry = totalEntries;
-  if (startEntry >= endEntry) {
-    std::cerr << "ERROR: invalid event range [" << startEntry << ", " << endEntry << ")" << std::endl;
-    inputFile->Close();
-    return false;
+    // Validate range
+    if (startEntry < 0) startEntry = 0;
+    if (endEntry > totalEntries) endEntry = totalEntries;
+    if (startEntry >= endEntry) {
+      std::cerr << "ERROR: invalid event range [" << startEntry << ", " << endEntry << ")" << std::endl;
+      inputFile->Close();
+      return false;
+    }
+    std::cout << "Processing event range [" << startEntry << ", " << endEntry << ") - "
+              << (endEntry - startEntry) << " events" << std::endl;
   }
 
   Long64_t nEntries = endEntry - startEntry;
-  std::cout << "Processing event range [" << startEntry << ", " << endEntry << ") - "
-            << nEntries << " events" << std::endl;
 
   const NsamplesPolicy policy = ResolveNsamplesPolicy(cfg.common.nsamples_policy);
 
@@ -521,20 +564,45 @@ bool RunAnalysis(const AnalysisConfig &cfg, Long64_t eventStart = -1, Long64_t e
   std::vector<float> *timeAxis = nullptr;
   std::vector<std::vector<float> *> chPed(cfg.n_channels(), nullptr);
   std::vector<int> *nsamplesPerChannel = nullptr;
+  // Files written with store_ped = false only hold chNN_raw and pedestals
+  std::vector<std::vector<float> *> chRaw(cfg.n_channels(), nullptr);
+  std::vector<std::vector<float>> rebuiltPed(cfg.n_channels());
+  std::vector<float> *pedestalsIn = nullptr;
+  float pedTargetIn = 0.0f;
+  bool rebuildPed = false;
+
+  if (inputTree) {
+    inputTree->SetBranchAddress("event", &eventIdx);
+    inputTree->SetBranchAddress("n_channels", &nChannels);
+    inputTree->SetBranchAddress("nsamples", &nsamples);
+    inputTree->SetBranchAddress("time_ns", &timeAxis);
+    if (inputTree->GetBranch("nsamples_per_channel")) {
+      inputTree->SetBranchAddress("nsamples_per_channel", &nsamplesPerChannel);
+    }
 
-  inputTree->SetBranchAddress("event", &eventIdx);
-  inputTree->SetBranchAddress("n_channels", &nChannels);
-  inputTree->SetBranchAddress("nsamples", &nsamples);
-  inputTree->SetBranchAddress("time_ns", &timeAxis);
-  if (inputTree->GetBranch("nsamples_per_channel")) {
-    inputTree->SetBranchAddress("nsamples_per_channel", &nsamplesPerChannel);
-  }
-
-  for (int ch = 0; ch < cfg.n_channels(); ++ch) {
-    char bname[32];
-    std::snprintf(bname, sizeof(bname), "ch%02d_ped", ch);
-    if (inputTree->GetBranch(bname)) {
-      inputTree->SetBranchAddress(bname, &chPed[ch]);
+    for (int ch = 0; ch < cfg.n_channels(); ++ch) {
+      char bname[32];
+      std::snprintf(bname, sizeof(bname), "ch%02d_ped", ch);
+      if (inputTree->GetBranch(bname)) {
+        inputTree->SetBranchAddress(bname, &chPed[ch]);
+        continue;
+      }
+      std::snprintf(bname, sizeof(bname), "ch%02d_raw", ch);
+      if (inputTree->GetBranch(bname)) {
+        inputTree->SetBranchAddress(bname, &chRaw[ch]);
+        rebuildPed = true;
+      }
+    }
+    if (rebuildPed) {
+      if (!inputTree->GetBranch("pedestals") || !inputTree->GetBranch("ped_target")) {
+        std::cerr << "ERROR: input has chNN_raw without pedestals/ped_target, "
+                  << "cannot rebuild the pedestal-subtracted waveforms" << std::endl;
+        inputFile->Close();
+        return false;
+      }
+      inputTree->SetBranchAddress("pedestals", &pedestalsIn);
+      inputTree->SetBranchAddress("ped_target", &pedTargetIn);
+      std::cout << "INFO: no chNN_ped branches, subtracting pedestals from chNN_raw" << std::endl;
     }
   }
 
@@ -547,16 +615,17 @@ bool RunAnalysis(const AnalysisConfig &cfg, Long64_t eventStart = -1, Long64_t e
     std::string dirPath = outputPath.substr(0, lastSlash);
     if (!CreateDirectoryIfNeeded(dirPath)) {
       std::cerr << "ERROR: failed to create output directory: " << dirPath << std::endl;
-      inputFile->Close();
+      if (inputFile) inputFile->Close();
       return false;
     }
   }
 
   // Create output ROOT file
-  TFile *outputFile = TFile::Open(outputPath.c_str(), "RECREATE");
+  TFile *outputFile = (outputFd >= 0) ? new TMemFile(outputPath.c_str(), "RECREATE")
+                                      : TFile::Open(outputPath.c_str(), "RECREATE");
   if (!outputFile || outputFile->IsZombie()) {
     std::cerr << "ERROR: cannot create output ROOT file " << outputPath << std::endl;
-    inputFile->Close();
+    if (inputFile) inputFile->Close();
     return false;
   }
   std::cout << "Creating output file: " << outputPath << std::endl;
@@ -725,15 +794,47 @@ bool RunAnalysis(const AnalysisConfig &cfg, Long64_t eventStart = -1, Long64_t e
   std::vector<float> trimmedAmpBuf;
   std::vector<float> trimmedTimeBuf;
 
-  for (Long64_t i = 0; i < nEntries; ++i) {
+  for (Long64_t i = 0; rawCfg || i < nEntries; ++i) {
     Long64_t entry = startEntry + i;
 
     if (i % reportInterval == 0 || i == nEntries - 1) {
       std::cout << "Processing entry " << entry << " (" << i << " / " << nEntries
-                << " = " << (100 * i / nEntries) << "%)" << std::endl;
+                << " = " << (nEntries > 0 ? 100 * i / nEntries : 0) << "%)" << std::endl;
     }
 
-    inputTree->GetEntry(entry);
+    if (rawCfg) {
+      if (!rawReader.Next(rawEvent)) {
+        break;
+      }
+      if (rawEvent.skip) {
+        continue;
+      }
+      eventIdx = rawEvent.index;
+      nChannels = cfg.n_channels();
+      nsamples = rawEvent.nsamples;
+      timeAxis = &rawEvent.timeAxis;
+      nsamplesPerChannel = &rawEvent.nsamplesPerChannel;
+      for (int ch = 0; ch < cfg.n_channels() && ch < static_cast<int>(rawEvent.ped.size()); ++ch) {
+        chPed[ch] = &rawEvent.ped[ch];
+      }
+    } else {
+      inputTree->GetEntry(entry);
+      if (rebuildPed) {
+        // Same arithmetic as convert_to_root; raw is padded with the pedestal,
+        // so padded samples come out as ped_target
+        for (int ch = 0; ch < cfg.n_channels(); ++ch) {
+          if (!chRaw[ch] || !pedestalsIn || ch >= static_cast<int>(pedestalsIn->size())) {
+            continue;
+          }
+          const float pedestal = (*pedestalsIn)[ch];
+          rebuiltPed[ch].resize(chRaw[ch]->size());
+          for (size_t s = 0; s < chRaw[ch]->size(); ++s) {
+            rebuiltPed[ch][s] = (*chRaw[ch])[s] - pedestal + pedTargetIn;
+          }
+          chPed[ch] = &rebuiltPed[ch];
+        }
+      }
+    }
     event = eventIdx;
 
     if (!timeAxis || timeAxis->empty()) {
@@ -1078,6 +1179,11 @@ bool RunAnalysis(const AnalysisConfig &cfg, Long64_t eventStart = -1, Long64_t e
     outputTree->Fill();
   }
 
+  if (rawCfg && rawReader.Failed()) {
+    std::cerr << "ERROR: reading raw events stopped due to earlier errors." << std::endl;
+    nsamplesError = true;
+  }
+
   if (nsamplesError) {
     if (waveformPlotsFile) {
       waveformPlotsFile->cd();
@@ -1092,14 +1198,20 @@ bool RunAnalysis(const AnalysisConfig &cfg, Long64_t eventStart = -1, Long64_t e
       qualityCheckFile = nullptr;
     }
     outputFile->Close();
-    inputFile->Close();
+    if (inputFile) inputFile->Close();
     return false;
   }
 
   outputFile->cd();
-  outputTree->Write();
+  bool streamed = true;
+  if (outputFd < 0) {
+    outputTree->Write();
+  } else if (!WriteStreamRecord(outputFd, kStreamAnalysis, static_cast<TMemFile *>(outputFile))) {
+    std::cerr << "ERROR: failed to stream analysis output to fd " << outputFd << std::endl;
+    streamed = false;
+  }
   outputFile->Close();
-  inputFile->Close();
+  if (inputFile) inputFile->Close();
 
   // Close waveform plots file if it was created
   if (waveformPlotsFile) {
@@ -1118,16 +1230,99 @@ bool RunAnalysis(const AnalysisConfig &cfg, Long64_t eventStart = -1, Long64_t e
   if (qualityCheckFile) {
     std::string finalFileName = qualityCheckFile->GetName();
     qualityCheckFile->cd();
+    if (outputFd >= 0 && streamed &&
+        !WriteStreamRecord(outputFd, kStreamQualityCheck, static_cast<TMemFile *>(qualityCheckFile))) {
+      std::cerr << "WARNING: failed to stream quality check output" << std::endl;
+    }
     qualityCheckFile->Close();
     delete qualityCheckFile;
     std::cout << "Quality check output saved to " << finalFileName << std::endl;
   }
 
+  if (outputFd >= 0) {
+    std::cout << "Analysis complete. Output streamed to fd " << outputFd << std::endl;
+    return streamed;
+  }
   std::string outputFullPath = BuildOutputPath(outname_base, "root", cfg.output_root());
   std::cout << "Analysis complete. Output written to " << outputFullPath << std::endl;
   return true;
 }
 
+// Writer side of --output-fd: merge the file images read from stdin into the
+// output file (and quality_check.root) in the order they arrive
+bool MergeStream(const AnalysisConfig &cfg) {
+  std::string outname_base = OutputBase(cfg);
+  std::string outputPath = BuildOutputPath(outname_base, "root", cfg.output_root());
+  std::string qualityCheckPath = BuildOutputPath(outname_base, "quality_check", "quality_check.root");
+
+  TFileMerger analysisMerger(false, false);
+  TFileMerger qualityCheckMerger(false, false);
+  analysisMerger.SetPrintLevel(0);
+  qualityCheckMerger.SetPrintLevel(0);
+  if (!EnsureParentDirectory(outputPath) ||
+      !analysisMerger.OutputFile(outputPath.c_str(), "RECREATE")) {
+    std::cerr << "ERROR: cannot create output ROOT file " << outputPath << std::endl;
+    return false;
+  }
+  bool qualityCheckOpen = false;
+  bool qualityCheckFailed = false;
+
+  int records[2] = {0, 0};
+  uint32_t kind = 0;
+  uint64_t size = 0;
+  std::vector<char> buffer;
+  while (std::fread(&kind, sizeof(kind), 1, stdin) == 1) {
+    if (std::fread(&size, sizeof(size), 1, stdin) != 1) {
+      std::cerr << "ERROR: truncated stream record" << std::endl;
+      return false;
+    }
+    buffer.resize(size);
+    if (size > 0 && std::fread(buffer.data(), 1, size, stdin) != size) {
+      std::cerr << "ERROR: truncated stream record" << std::endl;
+      return false;
+    }
+
+    TFileMerger *merger = &analysisMerger;
+    if (kind == kStreamQualityCheck) {
+      if (!qualityCheckOpen && !qualityCheckFailed) {
+        qualityCheckOpen = EnsureParentDirectory(qualityCheckPath) &&
+                           qualityCheckMerger.OutputFile(qualityCheckPath.c_str(), "RECREATE");
+        if (!qualityCheckOpen) {
+          std::cerr << "WARNING: cannot create " << qualityCheckPath
+                    << ", dropping quality check output" << std::endl;
+          qualityCheckFailed = true;
+        }
+      }
+      if (qualityCheckFailed) {
+        continue;
+      }
+      merger = &qualityCheckMerger;
+    } else if (kind != kStreamAnalysis) {
+      std::cerr << "ERROR: unknown stream record kind " << kind << std::endl;
+      return false;
+    }
+
+    TMemFile *chunk = new TMemFile(Form("stream_%u_%d.root", kind, records[kind]),
+                                   buffer.data(), static_cast<Long64_t>(size), "READ");
+    merger->AddAdoptFile(chunk);
+    if (!merger->PartialMerge(TFileMerger::kAll | TFileMerger::kIncremental)) {
+      std::cerr << "ERROR: failed to merge stream record " << records[kind] << std::endl;
+      return false;
+    }
+    records[kind]++;
+  }
+
+  analysisMerger.CloseOutputFile();
+  if (qualityCheckOpen) {
+    qualityCheckMerger.CloseOutputFile();
+    std::cout << "Merged " << records[kStreamQualityCheck] << " quality check records into "
+              << qualityCheckPath << std::endl;
+  }
+  std::cout << "Merged " << records[kStreamAnalysis] << " analysis records into "
+            << outputPath << std::endl;
+  return records[kStreamAnalysis] > 0;
+}
+
 void PrintUsage(const char *prog) {
   std::cout << "Analyze waveforms: Extract timing and amplitude features from ROOT file\n"
             << "Usage: " << prog << " [options]\n"
@@ -1139,6 +1334,9 @@ void PrintUsage(const char *prog) {
             << "  --waveform-plots       Enable waveform plots output (saves detailed waveform plots)\n"
             << "  --waveform-plots-file NAME  Set waveform plots output ROOT file name (default: waveform_plots.root)\n"
             << "  --waveform-plots-all   Save all waveforms (default: only with signal)\n"
+            << "  --output-fd N          Stream the output files to descriptor N instead of disk\n"
+            << "  --merge-stream         Merge streamed outputs read from stdin into --output\n"
+            << "  --from-raw             Read the wave_N.dat files directly (no waveforms.root)\n"
             << "  -h, --help             Show this help message\n";
 }
 
@@ -1149,6 +1347,7 @@ int main(int argc, char **argv) {
 
   // Try to load default config
   std::string defaultPath = "converter_config.json";
+  std::string configPath = defaultPath;
   std::string err;
   if (LoadAnalysisConfigFromJson(defaultPath, cfg, &err)) {
     std::cout << "Loaded configuration from " << defaultPath << std::endl;
@@ -1157,6 +1356,9 @@ int main(int argc, char **argv) {
   // Event range parameters
   Long64_t eventStart = -1;
   Long64_t eventEnd = -1;
+  int outputFd = -1;
+  bool mergeStream = false;
+  bool fromRaw = false;
 
   // Parse command line
   for (int i = 1; i < argc; ++i) {
@@ -1173,6 +1375,7 @@ int main(int argc, char **argv) {
         std::cerr << "ERROR: " << err << std::endl;
         return 1;
       }
+      configPath = argv[i];
       std::cout << "Loaded configuration from " << argv[i] << std::endl;
     } else if (arg == "--input") {
       if (i + 1 >= argc) {
@@ -1222,6 +1425,21 @@ int main(int argc, char **argv) {
     } else if (arg == "--waveform-plots-all") {
       cfg.waveform_plots_only_signal = false;
       std::cout << "Will save all waveforms (not just signals)" << std::endl;
+    } else if (arg == "--output-fd") {
+      if (i + 1 >= argc) {
+        std::cerr << "ERROR: --output-fd requires a value" << std::endl;
+        return 1;
+      }
+      try {
+        outputFd = std::stoi(argv[++i]);
+      } catch (...) {
+        std::cerr << "ERROR: invalid --output-fd value" << std::endl;
+        return 1;
+      }
+    } else if (arg == "--merge-stream") {
+      mergeStream = true;
+    } else if (arg == "--from-raw") {
+      fromRaw = true;
     } else {
       std::cerr << "ERROR: unknown option " << arg << std::endl;
       PrintUsage(argv[0]);
@@ -1229,8 +1447,24 @@ int main(int argc, char **argv) {
     }
   }
 
+  // The raw files are only read sequentially, so a fused run covers the whole run
+  WaveConverterConfig rawCfg;
+  if (fromRaw) {
+    if (eventStart >= 0 || eventEnd >= 0) {
+      std::cerr << "ERROR: --from-raw cannot be combined with --event-range" << std::endl;
+      return 1;
+    }
+    if (!LoadConfigFromJson(configPath, rawCfg, &err)) {
+      std::cerr << "ERROR: " << err << std::endl;
+      return 1;
+    }
+  }
+
   try {
-    if (!RunAnalysis(cfg, eventStart, eventEnd)) {
+    if (mergeStream) {
+      return MergeStream(cfg) ? 0 : 2;
+    }
+    if (!RunAnalysis(cfg, eventStart, eventEnd, outputFd, fromRaw ? &rawCfg : nullptr)) {
       return 2;
     }
   } catch (const std::exception &ex) {
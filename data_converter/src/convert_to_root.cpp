@@ -16,20 +16,13 @@
 
 #include "config/wave_converter_config.h"
 #include "utils/file_io.h"
+#include "utils/filesystem_utils.h"
+#include "utils/raw_event_reader.h"
 
 using namespace std;
 
 namespace {
 
-enum class NsamplesPolicy { kStrict, kPad };
-enum class EventPolicy { kError, kWarn, kSkip };
-
-std::string to6digits(int n) {
-    std::ostringstream oss;
-    oss << std::setw(6) << std::setfill('0') << n;
-    return oss.str();
-}
-  
 bool kSetEventLimit = false;
 
 void CheckEventLimit(const WaveConverterConfig &cfg){
@@ -40,90 +33,84 @@ void CheckEventLimit(const WaveConverterConfig &cfg){
   }
 }
   
-NsamplesPolicy ResolveNsamplesPolicy(const std::string &policyText) {
-  std::string lowered = policyText;
-  std::transform(lowered.begin(), lowered.end(), lowered.begin(),
-                 [](unsigned char c) { return static_cast<char>(std::tolower(c)); });
-  if (lowered == "pad") {
-    return NsamplesPolicy::kPad;
-  }
-  if (lowered != "strict") {
-    std::cerr << "WARNING: unknown nsamples_policy '" << policyText
-              << "', defaulting to 'strict'" << std::endl;
+bool EnsureParentDirectory(const std::string &path) {
+  size_t lastSlash = path.find_last_of('/');
+  if (lastSlash != std::string::npos) {
+    std::string dirPath = path.substr(0, lastSlash);
+    if (!CreateDirectoryIfNeeded(dirPath)) {
+      std::cerr << "ERROR: failed to create output directory: " << dirPath << std::endl;
+      return false;
+    }
   }
-  return NsamplesPolicy::kStrict;
+  return true;
 }
 
-EventPolicy ResolveEventPolicy(const std::string &policyText) {
-  std::string lowered = policyText;
-  std::transform(lowered.begin(), lowered.end(), lowered.begin(),
-                 [](unsigned char c) { return static_cast<char>(std::tolower(c)); });
-  if (lowered == "warn") {
-    return EventPolicy::kWarn;
-  }
-  if (lowered == "skip") {
-    return EventPolicy::kSkip;
-  }
-  if (lowered != "error") {
-    std::cerr << "WARNING: unknown event_policy '" << policyText
-              << "', defaulting to 'error'" << std::endl;
-  }
-  return EventPolicy::kError;
+// Progress of an incremental conversion, stored next to the ROOT file:
+// tree entries written, next event index and the byte offset of the first
+// unread event in every channel file.
+struct IncrementalState {
+  Long64_t entries = 0;
+  int nextEvent = 0;
+  std::vector<std::streamoff> offsets;
+};
+
+std::string IncrementalStatePath(const std::string &rootPath) {
+  return rootPath + ".state";
 }
 
-std::string BuildFileName(const WaveConverterConfig &cfg, int ch) {
-  const bool canOverride =
-      cfg.enable_special_override && !cfg.special_channel_file.empty() &&
-      cfg.special_channel_index >= 0 && cfg.special_channel_index < cfg.n_channels();  
-  if (canOverride && ch == cfg.special_channel_index) {
-    if (!cfg.special_channel_file.empty() && cfg.special_channel_file[0] == '/') {
-      return cfg.special_channel_file;
-    }
-    if (!cfg.input_dir.empty()) {
-      std::string dir = cfg.input_dir;
-      if (dir.back() != '/') {
-        dir += '/';
-	dir += to6digits(cfg.runnumber())+'/';
-	dir += cfg.daq_name()+'/';
+bool LoadIncrementalState(const std::string &path, int nChannels, IncrementalState &state) {
+  std::ifstream fin(path);
+  if (!fin.is_open()) {
+    return false;
+  }
+  std::string key;
+  state.offsets.assign(nChannels, -1);
+  while (fin >> key) {
+    if (key == "entries") {
+      fin >> state.entries;
+    } else if (key == "next_event") {
+      fin >> state.nextEvent;
+    } else if (key == "offset") {
+      int ch = -1;
+      std::streamoff pos = -1;
+      fin >> ch >> pos;
+      if (ch >= 0 && ch < nChannels) {
+        state.offsets[ch] = pos;
       }
-      return dir + cfg.special_channel_file;
     }
-    return cfg.special_channel_file;
   }
-  
-  char fname[512];
-  std::snprintf(fname, sizeof(fname), cfg.input_pattern.c_str(), ch);  
-  std::string filename(fname);
-  if (!cfg.input_dir.empty() && (filename.empty() || filename[0] != '/')) {
-    std::string dir = cfg.input_dir;
-    if (dir.back() != '/') {
-      dir += '/';
+  for (std::streamoff pos : state.offsets) {
+    if (pos < 0) {
+      std::cerr << "WARNING: incomplete incremental state " << path
+                << ", converting from the start" << std::endl;
+      return false;
     }
-    dir += to6digits(cfg.runnumber())+'/';
-    dir += cfg.daq_name()+'/';
-    return dir + filename;
   }
-  return filename;
-}
-
-bool IsSpecialOverrideChannel(const WaveConverterConfig &cfg, int ch) {
-  return cfg.enable_special_override && cfg.special_channel_index == ch &&
-         cfg.special_channel_index >= 0 && cfg.special_channel_index < cfg.n_channels();
+  return true;
 }
 
-bool EnsureParentDirectory(const std::string &path) {
-  size_t lastSlash = path.find_last_of('/');
-  if (lastSlash != std::string::npos) {
-    std::string dirPath = path.substr(0, lastSlash);
-    if (!CreateDirectoryIfNeeded(dirPath)) {
-      std::cerr << "ERROR: failed to create output directory: " << dirPath << std::endl;
+bool SaveIncrementalState(const std::string &path, const IncrementalState &state) {
+  const std::string tmpPath = path + ".tmp";
+  {
+    std::ofstream fout(tmpPath);
+    if (!fout.is_open()) {
+      std::cerr << "ERROR: cannot write incremental state " << tmpPath << std::endl;
       return false;
     }
+    fout << "entries " << state.entries << "\n";
+    fout << "next_event " << state.nextEvent << "\n";
+    for (size_t ch = 0; ch < state.offsets.size(); ++ch) {
+      fout << "offset " << ch << " " << state.offsets[ch] << "\n";
+    }
+  }
+  if (std::rename(tmpPath.c_str(), path.c_str()) != 0) {
+    std::cerr << "ERROR: cannot replace incremental state " << path << std::endl;
+    return false;
   }
   return true;
 }
 
-bool ConvertBinaryToRoot(const WaveConverterConfig &cfg) {
+bool ConvertBinaryToRoot(const WaveConverterConfig &cfg, bool incremental = false) {
   string outname_base = cfg.output_dir()+'/';
   outname_base += to6digits(cfg.runnumber())+'/';
   outname_base += cfg.daq_name()+"/output/";
@@ -133,49 +120,96 @@ bool ConvertBinaryToRoot(const WaveConverterConfig &cfg) {
     return false;
   }
 
-  TFile *file = TFile::Open(outputPath.c_str(), "RECREATE");
+  // Incremental mode resumes after the last event converted by a previous call
+  const std::string statePath = IncrementalStatePath(outputPath);
+  IncrementalState state;
+  const bool resume = incremental && FileExists(outputPath) &&
+                      LoadIncrementalState(statePath, cfg.n_channels(), state);
+
+  TFile *file = TFile::Open(outputPath.c_str(), resume ? "UPDATE" : "RECREATE");
   if (!file || file->IsZombie()) {
     std::cerr << "ERROR: cannot create ROOT file " << outputPath << std::endl;
     return false;
   }
 
-  std::cout << "Creating ROOT file: " << outputPath << std::endl;
-
-  TTree *tree = new TTree(cfg.tree_name().c_str(), "Raw waveforms");
+  TTree *tree = nullptr;
+  if (resume) {
+    tree = dynamic_cast<TTree *>(file->Get(cfg.tree_name().c_str()));
+    if (!tree || tree->GetEntries() != state.entries) {
+      std::cerr << "ERROR: " << outputPath << " does not match " << statePath
+                << ", rerun without --incremental" << std::endl;
+      file->Close();
+      delete file;
+      return false;
+    }
+    std::cout << "Appending to ROOT file: " << outputPath << " (" << state.entries
+              << " entries, resuming at event " << state.nextEvent << ")" << std::endl;
+  } else {
+    std::cout << "Creating ROOT file: " << outputPath << std::endl;
+    tree = new TTree(cfg.tree_name().c_str(), "Raw waveforms");
+  }
 
-  int eventIdx = 0;
   int nChannelsBranch = cfg.n_channels();
-  int nsamplesBranch = 0;
   float samplingNs = static_cast<float>(cfg.tsample_ns);
   float pedTarget = static_cast<float>(cfg.ped_target);
   int pedestalWindow = cfg.pedestal_window;
-  const NsamplesPolicy policy = ResolveNsamplesPolicy(cfg.common.nsamples_policy);
-  const EventPolicy eventPolicy = ResolveEventPolicy(cfg.event_policy);
 
-  std::vector<float> timeAxis;
-  std::vector<float> pedestals(cfg.n_channels(), 0.0f);
-  std::vector<uint32_t> boardIds(cfg.n_channels(), 0);
-  std::vector<uint32_t> channelIds(cfg.n_channels(), 0);
-  std::vector<uint32_t> eventCounters(cfg.n_channels(), 0);
-  std::vector<int> nsamplesPerChannel(cfg.n_channels(), 0);
-  std::vector<std::vector<float>> readBuffers(cfg.n_channels());
-  std::vector<std::vector<float>> raw(cfg.n_channels());
-  std::vector<std::vector<float>> ped(cfg.n_channels());
-  bool loggedSpecialChannelIdInfo = false;
+  // The branches point straight at the event the reader refills
+  RawEvent event;
+  event.raw.resize(cfg.n_channels());
+  event.ped.resize(cfg.n_channels());
+
+  // Object pointers handed to SetBranchAddress when appending to an existing tree
+  std::vector<float> *timeAxisPtr = &event.timeAxis;
+  std::vector<float> *pedestalsPtr = &event.pedestals;
+  std::vector<uint32_t> *boardIdsPtr = &event.boardIds;
+  std::vector<uint32_t> *channelIdsPtr = &event.channelIds;
+  std::vector<uint32_t> *eventCountersPtr = &event.eventCounters;
+  std::vector<int> *nsamplesPerChannelPtr = &event.nsamplesPerChannel;
+  std::vector<std::vector<float> *> rawPtrs(cfg.n_channels());
+  std::vector<std::vector<float> *> pedPtrs(cfg.n_channels());
+
+  auto attachBranches = [&]() {
+    tree->SetBranchAddress("event", &event.index);
+    tree->SetBranchAddress("n_channels", &nChannelsBranch);
+    tree->SetBranchAddress("nsamples", &event.nsamples);
+    tree->SetBranchAddress("sampling_ns", &samplingNs);
+    tree->SetBranchAddress("ped_target", &pedTarget);
+    tree->SetBranchAddress("pedestal_window", &pedestalWindow);
+    tree->SetBranchAddress("time_ns", &timeAxisPtr);
+    tree->SetBranchAddress("pedestals", &pedestalsPtr);
+    tree->SetBranchAddress("board_ids", &boardIdsPtr);
+    tree->SetBranchAddress("channel_ids", &channelIdsPtr);
+    tree->SetBranchAddress("event_counters", &eventCountersPtr);
+    tree->SetBranchAddress("nsamples_per_channel", &nsamplesPerChannelPtr);
+    for (int ch = 0; ch < cfg.n_channels(); ++ch) {
+      char bnameRaw[32];
+      char bnamePed[32];
+      std::snprintf(bnameRaw, sizeof(bnameRaw), "ch%02d_raw", ch);
+      std::snprintf(bnamePed, sizeof(bnamePed), "ch%02d_ped", ch);
+      rawPtrs[ch] = &event.raw[ch];
+      pedPtrs[ch] = &event.ped[ch];
+      tree->SetBranchAddress(bnameRaw, &rawPtrs[ch]);
+      // Keep the layout of the existing file, whatever store_ped says now
+      if (tree->GetBranch(bnamePed)) {
+        tree->SetBranchAddress(bnamePed, &pedPtrs[ch]);
+      }
+    }
+  };
 
   auto defineCommonBranches = [&]() {
-    tree->Branch("event", &eventIdx, "event/I");
+    tree->Branch("event", &event.index, "event/I");
     tree->Branch("n_channels", &nChannelsBranch, "n_channels/I");
-    tree->Branch("nsamples", &nsamplesBranch, "nsamples/I");
+    tree->Branch("nsamples", &event.nsamples, "nsamples/I");
     tree->Branch("sampling_ns", &samplingNs, "sampling_ns/F");
     tree->Branch("ped_target", &pedTarget, "ped_target/F");
     tree->Branch("pedestal_window", &pedestalWindow, "pedestal_window/I");
-    tree->Branch("time_ns", &timeAxis);
-    tree->Branch("pedestals", &pedestals);
-    tree->Branch("board_ids", &boardIds);
-    tree->Branch("channel_ids", &channelIds);
-    tree->Branch("event_counters", &eventCounters);
-    tree->Branch("nsamples_per_channel", &nsamplesPerChannel);
+    tree->Branch("time_ns", &event.timeAxis);
+    tree->Branch("pedestals", &event.pedestals);
+    tree->Branch("board_ids", &event.boardIds);
+    tree->Branch("channel_ids", &event.channelIds);
+    tree->Branch("event_counters", &event.eventCounters);
+    tree->Branch("nsamples_per_channel", &event.nsamplesPerChannel);
   };
 
   auto defineChannelBranches = [&]() {
@@ -184,261 +218,39 @@ bool ConvertBinaryToRoot(const WaveConverterConfig &cfg) {
       char bnamePed[32];
       std::snprintf(bnameRaw, sizeof(bnameRaw), "ch%02d_raw", ch);
       std::snprintf(bnamePed, sizeof(bnamePed), "ch%02d_ped", ch);
-      tree->Branch(bnameRaw, &raw[ch]);
-      tree->Branch(bnamePed, &ped[ch]);
+      tree->Branch(bnameRaw, &event.raw[ch]);
+      if (cfg.store_ped) {
+        tree->Branch(bnamePed, &event.ped[ch]);
+      }
     }
   };
 
-  defineCommonBranches();
-  defineChannelBranches();
-
-  std::vector<std::ifstream> fins(cfg.n_channels());
-  for (int ch = 0; ch < cfg.n_channels(); ++ch) {
-    const std::string fname = BuildFileName(cfg, ch);
-    fins[ch].open(fname, std::ios::binary);
-    if (!fins[ch].is_open()) {
-      std::cerr << "ERROR: cannot open " << fname << std::endl;
-      file->Close();
-      delete file;
-      return false;
-    }
-    std::cout << "Opened " << fname << std::endl;
+  if (resume) {
+    attachBranches();
+  } else {
+    defineCommonBranches();
+    defineChannelBranches();
   }
 
-  bool running = true;
-  bool encounteredError = false;
-  bool loggedNsamplesPadding = false;
-  int consistencyWarningCount = 0;
-  const int kConsistencyWarnLimit = 20;
-  int eventCount = 0;
-  std::vector<bool> channelEof(cfg.n_channels(), false);
-
-  while (running) {
-    // Try to read headers from all channels
-    std::vector<ChannelHeader> headers(cfg.n_channels());
-    std::vector<int> samplesThisEvent(cfg.n_channels(), 0);
-    bool anyEof = false;
-
-    for (int ch = 0; ch < cfg.n_channels(); ++ch) {
-      if (!ReadHeader(fins[ch], headers[ch])) {
-        channelEof[ch] = true;
-        anyEof = true;
-      }
-    }
-
-    // If any channel reached EOF, report detailed status and stop
-    if (anyEof) {
-      std::cout << "INFO: Event count mismatch detected - one or more channels reached EOF" << std::endl;
-      std::cout << "      Per-channel status at event " << eventCount << ":" << std::endl;
-      for (int ch = 0; ch < cfg.n_channels(); ++ch) {
-        std::cout << "        ch" << ch << ": "
-                  << (channelEof[ch] ? "reached EOF" : "has more data") << std::endl;
-      }
-      std::cout << "      Processing stopped. Total events processed: " << eventCount << std::endl;
-      break;
-    }
-
-    // Validate ch0 header
-    if (headers[0].eventSize <= HEADER_BYTES) {
-      std::cerr << "ERROR: invalid event size " << headers[0].eventSize
-                << " at event " << eventCount << " ch0" << std::endl;
-      encounteredError = true;
-      break;
-    }
-
-    const uint32_t payloadBytes0 = headers[0].eventSize - HEADER_BYTES;
-    if (payloadBytes0 % sizeof(float) != 0) {
-      std::cerr << "ERROR: payload not multiple of 4 bytes at event " << eventCount
-                << " ch0" << std::endl;
-      encounteredError = true;
-      break;
-    }
-
-    samplesThisEvent[0] = static_cast<int>(payloadBytes0 / sizeof(float));
-    boardIds[0] = headers[0].boardId;
-    channelIds[0] = headers[0].channelId;
-    eventCounters[0] = headers[0].eventCounter;
-
-    // Validate and process other channels
-    for (int ch = 1; ch < cfg.n_channels(); ++ch) {
-      const uint32_t payloadBytes = headers[ch].eventSize - HEADER_BYTES;
-      if (headers[ch].eventSize != headers[0].eventSize) {
-        std::cerr << "WARNING: event size mismatch event " << eventCount << " ch"
-                  << ch << " (" << headers[ch].eventSize
-                  << " vs " << headers[0].eventSize << ")" << std::endl;
-      }
-      if (payloadBytes % sizeof(float) != 0) {
-        std::cerr << "ERROR: payload not multiple of 4 bytes at event " << eventCount
-                  << " ch" << ch << std::endl;
-        running = false;
-        encounteredError = true;
-        break;
-      }
-      samplesThisEvent[ch] = static_cast<int>(payloadBytes / sizeof(float));
-      boardIds[ch] = headers[ch].boardId;
-      channelIds[ch] = headers[ch].channelId;
-      eventCounters[ch] = headers[ch].eventCounter;
-    }
-
-    if (!running) {
-      break;
-    }
-
-    // Consistency checks across channels
-    std::vector<std::string> consistencyIssues;
-    for (int ch = 1; ch < cfg.n_channels(); ++ch) {
-      if (headers[ch].eventCounter != headers[0].eventCounter) {
-        std::ostringstream oss;
-        oss << "eventCounter mismatch at event " << eventCount << " ch" << ch
-            << " (" << headers[ch].eventCounter << " vs " << headers[0].eventCounter << ")";
-        consistencyIssues.push_back(oss.str());
-      }
-      if (headers[ch].boardId != headers[0].boardId) {
-        std::ostringstream oss;
-        oss << "boardId mismatch at event " << eventCount << " ch" << ch
-            << " (" << headers[ch].boardId << " vs " << headers[0].boardId << ")";
-        consistencyIssues.push_back(oss.str());
-      }
-      if (headers[ch].channelId != static_cast<uint32_t>(ch)) {
-        if (IsSpecialOverrideChannel(cfg, ch)) {
-          if (!loggedSpecialChannelIdInfo) {
-            std::cout << "INFO: special_channel_index " << ch
-                      << " allows channelId mismatch (header "
-                      << headers[ch].channelId << ")" << std::endl;
-            loggedSpecialChannelIdInfo = true;
-          }
-        } else {
-          std::ostringstream oss;
-          oss << "channelId mismatch at event " << eventCount << " ch" << ch
-              << " (" << headers[ch].channelId << " vs expected " << ch << ")";
-          consistencyIssues.push_back(oss.str());
-        }
-      }
-    }
-
-    bool skipEvent = false;
-    if (!consistencyIssues.empty()) {
-      for (const auto &msg : consistencyIssues) {
-        if (eventPolicy == EventPolicy::kWarn &&
-            consistencyWarningCount >= kConsistencyWarnLimit) {
-          continue;
-        }
-        std::cerr << ((eventPolicy == EventPolicy::kWarn) ? "WARNING: " : "ERROR: ")
-                  << msg << std::endl;
-        if (eventPolicy == EventPolicy::kWarn) {
-          ++consistencyWarningCount;
-          if (consistencyWarningCount == kConsistencyWarnLimit) {
-            std::cerr << "WARNING: further consistency warnings suppressed"
-                      << std::endl;
-          }
-        }
-      }
-      if (eventPolicy == EventPolicy::kError) {
-        encounteredError = true;
-        break;
-      } else if (eventPolicy == EventPolicy::kSkip) {
-        skipEvent = true;
-      }
-    }
-
-    const int maxSamples =
-        *std::max_element(samplesThisEvent.begin(), samplesThisEvent.end());
-    const bool hasMismatch =
-        std::any_of(samplesThisEvent.begin(), samplesThisEvent.end(),
-                    [maxSamples](int v) { return v != maxSamples; });
-
-    if (hasMismatch && policy == NsamplesPolicy::kStrict) {
-      std::cerr << "ERROR: nsamples mismatch at event " << eventCount
-                << ", expected uniform sample counts across channels" << std::endl;
-      encounteredError = true;
-      break;
-    }
-
-    if (hasMismatch && !loggedNsamplesPadding && policy == NsamplesPolicy::kPad) {
-      std::cout << "INFO: nsamples mismatch detected at event " << eventCount
-                << ", padding shorter channels up to " << maxSamples
-                << " samples" << std::endl;
-      loggedNsamplesPadding = true;
-    }
-
-    if (timeAxis.size() != static_cast<size_t>(maxSamples)) {
-      timeAxis.resize(maxSamples);
-      for (int i = 0; i < maxSamples; ++i) {
-        timeAxis[i] = static_cast<float>(i * cfg.tsample_ns);
-      }
-    }
-
-    nsamplesBranch = maxSamples;
-    nsamplesPerChannel = samplesThisEvent;
-
-    // Read payloads from all channels
-    std::vector<bool> readFailed(cfg.n_channels(), false);
-    bool anyReadFailed = false;
-
-    for (int ch = 0; ch < cfg.n_channels(); ++ch) {
-      const int nsampCh = samplesThisEvent[ch];
-
-      auto &buffer = readBuffers[ch];
-      buffer.resize(nsampCh);
-      fins[ch].read(reinterpret_cast<char *>(buffer.data()),
-                    nsampCh * sizeof(float));
-      if (!fins[ch].good()) {
-        readFailed[ch] = true;
-        anyReadFailed = true;
-      } else {
-        raw[ch] = std::move(buffer);
-        buffer.clear();
-      }
-    }
-
-    // If any channel failed to read payload, report and stop
-    if (anyReadFailed) {
-      std::cout << "INFO: Payload read failure - one or more channels encountered early EOF" << std::endl;
-      std::cout << "      Per-channel status at event " << eventCount << ":" << std::endl;
-      for (int ch = 0; ch < cfg.n_channels(); ++ch) {
-        std::cout << "        ch" << ch << ": "
-                  << (readFailed[ch] ? "read failed (EOF)" : "read successful") << std::endl;
-      }
-      std::cout << "      Processing stopped. Total events processed: " << eventCount << std::endl;
-      break;
-    }
-
-    // Calculate pedestals and pedestal-subtracted waveforms
-    for (int ch = 0; ch < cfg.n_channels(); ++ch) {
-      const int nsampCh = samplesThisEvent[ch];
-      const int pedWindow = std::max(1, cfg.pedestal_window);
-      const int nPed = std::min(nsampCh, pedWindow);
-      double pedVal = 0.0;
-      for (int i = 0; i < nPed; ++i) {
-        pedVal += raw[ch][i];
-      }
-      pedVal /= static_cast<double>(nPed);
-      pedestals[ch] = static_cast<float>(pedVal);
-
-      raw[ch].resize(maxSamples, pedestals[ch]);
-      ped[ch].resize(maxSamples);
-      for (int i = 0; i < nsampCh; ++i) {
-        ped[ch][i] = raw[ch][i] - pedestals[ch] + pedTarget;
-      }
-      for (int i = nsampCh; i < maxSamples; ++i) {
-        ped[ch][i] = pedTarget;
-      }
-    }
-
-    eventIdx = eventCount;
-    if (!skipEvent) {
-      tree->Fill();
-    }
-    ++eventCount;
+  RawEventReader reader;
+  if (!reader.Open(cfg, resume ? state.offsets : std::vector<std::streamoff>(),
+                   resume ? state.nextEvent : 0)) {
+    file->Close();
+    delete file;
+    return false;
   }
 
-  for (auto &fin : fins) {
-    if (fin.is_open()) {
-      fin.close();
+  const int firstEvent = reader.NextEvent();
+  while (reader.Next(event)) {
+    if (!event.skip) {
+      tree->Fill();
     }
   }
+  const bool encounteredError = reader.Failed();
+  const int eventCount = reader.NextEvent();
+  state.offsets = reader.Offsets();
 
-  if (eventCount == 0) {
+  if (eventCount == 0 && !incremental) {
     std::cerr << "ERROR: no events converted from binary input." << std::endl;
     file->Close();
     delete file;
@@ -453,10 +265,21 @@ bool ConvertBinaryToRoot(const WaveConverterConfig &cfg) {
   }
 
   file->cd();
-  tree->Write();
+  tree->Write("", TObject::kOverwrite);
+  state.entries = tree->GetEntries();
   file->Close();
   delete file;
 
+  if (incremental) {
+    state.nextEvent = eventCount;
+    if (!SaveIncrementalState(statePath, state)) {
+      return false;
+    }
+    std::cout << "Stage 1: appended " << (eventCount - firstEvent) << " new events ("
+              << state.entries << " entries total)." << std::endl;
+    return true;
+  }
+
   std::cout << "Stage 1: ROOT file written with " << eventCount << " events." << std::endl;
   return true;
 }
@@ -530,7 +353,9 @@ bool ConvertBinaryToRootParallel(const WaveConverterConfig &cfg) {
       std::snprintf(bnameRaw, sizeof(bnameRaw), "ch%02d_raw", ch);
       std::snprintf(bnamePed, sizeof(bnamePed), "ch%02d_ped", ch);
       tree->Branch(bnameRaw, &raw[ch]);
-      tree->Branch(bnamePed, &ped[ch]);
+      if (cfg.store_ped) {
+        tree->Branch(bnamePed, &ped[ch]);
+      }
     }
   };
 
@@ -877,7 +702,9 @@ bool ConvertAsciiToRoot(const WaveConverterConfig &cfg) {
     std::snprintf(bnameRaw, sizeof(bnameRaw), "ch%02d_raw", ch);
     std::snprintf(bnamePed, sizeof(bnamePed), "ch%02d_ped", ch);
     tree->Branch(bnameRaw, &raw[ch]);
-    tree->Branch(bnamePed, &ped[ch]);
+    if (cfg.store_ped) {
+      tree->Branch(bnamePed, &ped[ch]);
+    }
   }
 
   std::vector<std::vector<AsciiEventBlock>> channelEvents(cfg.n_channels());
@@ -1086,12 +913,16 @@ void PrintUsage(const char *prog) {
             << "  --parallel          Enable parallel loading (binary mode only)\n"
             << "  --chunk-size N      Set chunk size for parallel loading (default: 1000)\n"
             << "  --max-threads N     Set maximum threads for parallel loading\n"
+            << "  --incremental       Append only events added to the input files since the last\n"
+            << "                      --incremental run (binary, sequential; state in <root>.state)\n"
+            << "  --raw-only          Store only chNN_raw and pedestals, not the chNN_ped copy\n"
             << "  -h, --help          Show this help message\n";
 }
 
 enum class CliOutcome { kOk, kShowUsage, kError };
 
-CliOutcome ApplyCommandLineArgs(int argc, char **argv, WaveConverterConfig &cfg) {
+CliOutcome ApplyCommandLineArgs(int argc, char **argv, WaveConverterConfig &cfg,
+                                bool &incremental) {
   for (int i = 1; i < argc; ++i) {
     std::string arg = argv[i];
     auto requireValue = [&](const char *name) -> const char * {
@@ -1150,6 +981,10 @@ CliOutcome ApplyCommandLineArgs(int argc, char **argv, WaveConverterConfig &cfg)
         return CliOutcome::kError;
       }
       cfg.event_policy = val;
+    } else if (arg == "--incremental") {
+      incremental = true;
+    } else if (arg == "--raw-only") {
+      cfg.store_ped = false;
     } else if (arg == "--ascii") {
       cfg.input_is_ascii = true;
     } else if (arg == "--binary") {
@@ -1211,7 +1046,8 @@ int main(int argc, char **argv) {
   WaveConverterConfig cfg;
   LoadDefaultConfig(cfg);
 
-  CliOutcome cli = ApplyCommandLineArgs(argc, argv, cfg);
+  bool incremental = false;
+  CliOutcome cli = ApplyCommandLineArgs(argc, argv, cfg, incremental);
   if (cli == CliOutcome::kShowUsage) {
     PrintUsage(argv[0]);
     return 0;
@@ -1223,7 +1059,16 @@ int main(int argc, char **argv) {
 
   try {
     bool ok = false;
-    if (cfg.input_is_ascii) {
+    if (incremental) {
+      if (cfg.input_is_ascii) {
+        std::cerr << "ERROR: --incremental supports binary input only" << std::endl;
+        return 1;
+      }
+      if (cfg.max_cores() > 1) {
+        std::cout << "INFO: --incremental converts sequentially" << std::endl;
+      }
+      ok = ConvertBinaryToRoot(cfg, true);
+    } else if (cfg.input_is_ascii) {
       ok = ConvertAsciiToRoot(cfg);
     } else if (cfg.max_cores() > 1) {
       ok = ConvertBinaryToRootParallel(cfg);
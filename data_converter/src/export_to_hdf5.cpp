@@ -6,8 +6,10 @@
 #include <vector>
 #include <set>
 #include <map>
+#include <memory>
 #include <fstream>
 #include <regex>
+#include <stdexcept>
 
 #include "TFile.h"
 #include "TTree.h"
@@ -169,8 +171,413 @@ struct AnalysisFeatureMeta {
   float timeCFD_50pc;
   float timeCFD_Fit_50pc;
 };
+
+struct CorryHitRow {
+  uint16_t column;
+  uint16_t row;
+  uint8_t raw;
+  double charge;
+  double timestamp;
+  uint32_t trigger_number;
+};
+
+struct EventIndexRow {
+  uint32_t event;
+  uint64_t first_row;
+  uint32_t count;
+};
 #pragma pack(pop)
 
+// One value per event number, stored as an array sorted by event so lookups
+// are a binary search instead of a std::map node walk. Events are matched by
+// number, so dropped or extra triggers only affect the events concerned.
+class EventValueIndex {
+ public:
+  void Add(uint32_t event, float value) { entries_.emplace_back(event, value); }
+
+  // Sort by event; for a repeated event number the last value added wins.
+  void Finalize() {
+    std::stable_sort(entries_.begin(), entries_.end(),
+                     [](const Entry &a, const Entry &b) { return a.first < b.first; });
+    std::vector<Entry> unique;
+    unique.reserve(entries_.size());
+    for (const auto &entry : entries_) {
+      if (!unique.empty() && unique.back().first == entry.first) {
+        unique.back() = entry;
+      } else {
+        unique.push_back(entry);
+      }
+    }
+    entries_.swap(unique);
+  }
+
+  const float *Find(uint32_t event) const {
+    auto it = std::lower_bound(entries_.begin(), entries_.end(), event,
+                               [](const Entry &a, uint32_t ev) { return a.first < ev; });
+    if (it == entries_.end() || it->first != event) {
+      return nullptr;
+    }
+    return &it->second;
+  }
+
+  size_t size() const { return entries_.size(); }
+
+ private:
+  using Entry = std::pair<uint32_t, float>;
+  std::vector<Entry> entries_;
+};
+
+hid_t CreateAnalysisFeatureType() {
+  hid_t type = H5Tcreate(H5T_COMPOUND, sizeof(AnalysisFeatureMeta));
+  H5Tinsert(type, "event", HOFFSET(AnalysisFeatureMeta, event), H5T_NATIVE_UINT32);
+  H5Tinsert(type, "channel", HOFFSET(AnalysisFeatureMeta, channel), H5T_NATIVE_UINT16);
+  H5Tinsert(type, "sensor_id", HOFFSET(AnalysisFeatureMeta, sensor_id), H5T_NATIVE_UINT16);
+  H5Tinsert(type, "column_id", HOFFSET(AnalysisFeatureMeta, column_id), H5T_NATIVE_UINT16);
+  H5Tinsert(type, "strip_id", HOFFSET(AnalysisFeatureMeta, strip_id), H5T_NATIVE_UINT16);
+  H5Tinsert(type, "baseline",         HOFFSET(AnalysisFeatureMeta, baseline),         H5T_NATIVE_FLOAT);
+  H5Tinsert(type, "rmsNoise",         HOFFSET(AnalysisFeatureMeta, rmsNoise),         H5T_NATIVE_FLOAT);
+  H5Tinsert(type, "rmsNoise_mV",      HOFFSET(AnalysisFeatureMeta, rmsNoise_mV),      H5T_NATIVE_FLOAT);
+  H5Tinsert(type, "noise1Point",      HOFFSET(AnalysisFeatureMeta, noise1Point),      H5T_NATIVE_FLOAT);
+  H5Tinsert(type, "ampMinBefore",     HOFFSET(AnalysisFeatureMeta, ampMinBefore),     H5T_NATIVE_FLOAT);
+  H5Tinsert(type, "ampMaxBefore",     HOFFSET(AnalysisFeatureMeta, ampMaxBefore),     H5T_NATIVE_FLOAT);
+  H5Tinsert(type, "ampMax_mV",        HOFFSET(AnalysisFeatureMeta, ampMax),           H5T_NATIVE_FLOAT);
+  H5Tinsert(type, "ampMax_Fit_mV",    HOFFSET(AnalysisFeatureMeta, ampMax_Fit_mV),    H5T_NATIVE_FLOAT);
+  H5Tinsert(type, "charge",           HOFFSET(AnalysisFeatureMeta, charge),           H5T_NATIVE_FLOAT);
+  H5Tinsert(type, "signalOverNoise",  HOFFSET(AnalysisFeatureMeta, signalOverNoise),  H5T_NATIVE_FLOAT);
+  H5Tinsert(type, "peakTime",         HOFFSET(AnalysisFeatureMeta, peakTime),         H5T_NATIVE_FLOAT);
+  H5Tinsert(type, "riseTime",         HOFFSET(AnalysisFeatureMeta, riseTime),         H5T_NATIVE_FLOAT);
+  H5Tinsert(type, "riseTime_Fit",     HOFFSET(AnalysisFeatureMeta, riseTime_Fit),     H5T_NATIVE_FLOAT);
+  H5Tinsert(type, "slewRate",         HOFFSET(AnalysisFeatureMeta, slewRate),         H5T_NATIVE_FLOAT);
+  H5Tinsert(type, "slewRate_Fit_mV",  HOFFSET(AnalysisFeatureMeta, slewRate_Fit_mV),  H5T_NATIVE_FLOAT);
+  H5Tinsert(type, "timeCFD_50pc",     HOFFSET(AnalysisFeatureMeta, timeCFD_50pc),     H5T_NATIVE_FLOAT);
+  H5Tinsert(type, "timeCFD_Fit_50pc", HOFFSET(AnalysisFeatureMeta, timeCFD_Fit_50pc), H5T_NATIVE_FLOAT);
+  return type;
+}
+
+hid_t CreateCorryHitType() {
+  hid_t type = H5Tcreate(H5T_COMPOUND, sizeof(CorryHitRow));
+  H5Tinsert(type, "column", HOFFSET(CorryHitRow, column), H5T_NATIVE_UINT16);
+  H5Tinsert(type, "row", HOFFSET(CorryHitRow, row), H5T_NATIVE_UINT16);
+  H5Tinsert(type, "raw", HOFFSET(CorryHitRow, raw), H5T_NATIVE_UINT8);
+  H5Tinsert(type, "charge", HOFFSET(CorryHitRow, charge), H5T_NATIVE_DOUBLE);
+  H5Tinsert(type, "timestamp", HOFFSET(CorryHitRow, timestamp), H5T_NATIVE_DOUBLE);
+  H5Tinsert(type, "trigger_number", HOFFSET(CorryHitRow, trigger_number), H5T_NATIVE_UINT32);
+  return type;
+}
+
+// Layout of the row datasets (Hits, AnalysisFeatures).
+// Disabled: one contiguous dataset written after all entries are read.
+// Enabled:  chunked, extendable dataset with shuffle + deflate, appended to
+//           every flush_events entries so memory use stays constant.
+struct StreamingOptions {
+  bool enabled = false;
+  hsize_t chunk_rows = 65536;
+  int compression_level = 4;  // gzip level, 0 disables deflate
+  bool shuffle = true;
+  Long64_t flush_events = 1000;
+};
+
+// Writes rows of a compound type into a 1-D dataset.  In streaming mode an
+// existing extendable dataset of the same name is appended to.
+class RowDatasetWriter {
+ public:
+  RowDatasetWriter(hid_t loc, const std::string &name, hid_t type,
+                   const StreamingOptions &options)
+      : loc_(loc), name_(name), type_(type), options_(options) {}
+  ~RowDatasetWriter() { Close(); }
+
+  bool Write(const void *rows, hsize_t nRows) {
+    if (nRows == 0) {
+      return true;
+    }
+    if (dset_ < 0 && !Open(nRows)) {
+      return false;
+    }
+
+    if (!options_.enabled) {
+      if (rows_ > 0) {
+        std::cerr << "ERROR: dataset " << name_ << " is not extendable" << std::endl;
+        return false;
+      }
+      if (H5Dwrite(dset_, type_, H5S_ALL, H5S_ALL, H5P_DEFAULT, rows) < 0) {
+        std::cerr << "ERROR: failed to write dataset " << name_ << std::endl;
+        return false;
+      }
+      rows_ = nRows;
+      return true;
+    }
+
+    hsize_t newSize = rows_ + nRows;
+    if (H5Dset_extent(dset_, &newSize) < 0) {
+      std::cerr << "ERROR: failed to extend dataset " << name_ << std::endl;
+      return false;
+    }
+    hid_t fileSpace = H5Dget_space(dset_);
+    H5Sselect_hyperslab(fileSpace, H5S_SELECT_SET, &rows_, nullptr, &nRows, nullptr);
+    hid_t memSpace = H5Screate_simple(1, &nRows, nullptr);
+    herr_t status = H5Dwrite(dset_, type_, memSpace, fileSpace, H5P_DEFAULT, rows);
+    H5Sclose(memSpace);
+    H5Sclose(fileSpace);
+    if (status < 0) {
+      std::cerr << "ERROR: failed to append to dataset " << name_ << std::endl;
+      return false;
+    }
+    rows_ = newSize;
+    return true;
+  }
+
+  hsize_t rows() const { return rows_; }
+
+  void Close() {
+    if (dset_ >= 0) {
+      H5Dclose(dset_);
+      dset_ = -1;
+    }
+  }
+
+ private:
+  bool Open(hsize_t firstRows) {
+    if (options_.enabled && H5Lexists(loc_, name_.c_str(), H5P_DEFAULT) > 0) {
+      dset_ = H5Dopen2(loc_, name_.c_str(), H5P_DEFAULT);
+      if (dset_ < 0) {
+        std::cerr << "ERROR: cannot open dataset " << name_ << std::endl;
+        return false;
+      }
+      hid_t space = H5Dget_space(dset_);
+      hsize_t current = 0, maximum = 0;
+      H5Sget_simple_extent_dims(space, &current, &maximum);
+      H5Sclose(space);
+      if (maximum != H5S_UNLIMITED) {
+        std::cerr << "ERROR: existing dataset " << name_ << " is not extendable" << std::endl;
+        Close();
+        return false;
+      }
+      rows_ = current;
+      return true;
+    }
+
+    hid_t space = -1;
+    hid_t dcpl = H5P_DEFAULT;
+    if (options_.enabled) {
+      hsize_t initial = 0;
+      hsize_t maximum = H5S_UNLIMITED;
+      hsize_t chunk = std::max<hsize_t>(1, options_.chunk_rows);
+      space = H5Screate_simple(1, &initial, &maximum);
+      dcpl = H5Pcreate(H5P_DATASET_CREATE);
+      H5Pset_chunk(dcpl, 1, &chunk);
+      if (options_.shuffle) {
+        H5Pset_shuffle(dcpl);
+      }
+      if (options_.compression_level > 0) {
+        if (H5Zfilter_avail(H5Z_FILTER_DEFLATE) > 0) {
+          H5Pset_deflate(dcpl, static_cast<unsigned>(std::min(9, options_.compression_level)));
+        } else {
+          std::cerr << "WARNING: deflate filter not available, writing " << name_
+                    << " uncompressed" << std::endl;
+        }
+      }
+    } else {
+      space = H5Screate_simple(1, &firstRows, nullptr);
+    }
+
+    dset_ = H5Dcreate(loc_, name_.c_str(), type_, space, H5P_DEFAULT, dcpl, H5P_DEFAULT);
+    if (dcpl != H5P_DEFAULT) {
+      H5Pclose(dcpl);
+    }
+    H5Sclose(space);
+    if (dset_ < 0) {
+      std::cerr << "ERROR: cannot create " << name_ << " dataset" << std::endl;
+      return false;
+    }
+    return true;
+  }
+
+  hid_t loc_;
+  std::string name_;
+  hid_t type_;
+  StreamingOptions options_;
+  hid_t dset_ = -1;
+  hsize_t rows_ = 0;
+};
+
+// Opens the output file for appending, or creates it (truncating an existing
+// file).  Exports call this only once their first rows are ready, so a run that
+// yields nothing leaves an earlier file untouched.
+hid_t OpenOutputFile(const std::string &hdf5File, bool append) {
+  if (append) {
+    hid_t file = H5Fopen(hdf5File.c_str(), H5F_ACC_RDWR, H5P_DEFAULT);
+    if (file < 0) {
+      std::cerr << "ERROR: cannot open HDF5 file for appending " << hdf5File << std::endl;
+    }
+    return file;
+  }
+  hid_t file = H5Fcreate(hdf5File.c_str(), H5F_ACC_TRUNC, H5P_DEFAULT, H5P_DEFAULT);
+  if (file < 0) {
+    std::cerr << "ERROR: cannot create HDF5 file " << hdf5File << std::endl;
+  }
+  return file;
+}
+
+hid_t CreateEventIndexType() {
+  hid_t type = H5Tcreate(H5T_COMPOUND, sizeof(EventIndexRow));
+  H5Tinsert(type, "event", HOFFSET(EventIndexRow, event), H5T_NATIVE_UINT32);
+  H5Tinsert(type, "first_row", HOFFSET(EventIndexRow, first_row), H5T_NATIVE_UINT64);
+  H5Tinsert(type, "count", HOFFSET(EventIndexRow, count), H5T_NATIVE_UINT32);
+  return type;
+}
+
+// Records the contiguous block of rows written for each event so readers can
+// slice one event directly instead of scanning the whole dataset.
+class EventIndexBuilder {
+ public:
+  void Add(uint32_t event) {
+    if (!entries_.empty() && entries_.back().event == event) {
+      ++entries_.back().count;
+    } else {
+      if (!seen_.insert(event).second) {
+        contiguous_ = false;
+      }
+      entries_.push_back(EventIndexRow{event, nextRow_, 1});
+    }
+    ++nextRow_;
+  }
+
+  // totalRows is the size of the indexed dataset after this export.  Rows that
+  // were already in it (streaming append) must be described by an existing
+  // index, which is then extended; otherwise the index is not written and an
+  // existing one is removed, so readers fall back to the event column.
+  bool Write(hid_t loc, const std::string &name, hsize_t totalRows,
+             const StreamingOptions &options = StreamingOptions()) {
+    if (entries_.empty()) {
+      return true;
+    }
+    if (!contiguous_) {
+      std::cerr << "WARNING: rows of an event are not contiguous, " << name
+                << " not written" << std::endl;
+      return Remove(loc, name);
+    }
+
+    const uint64_t firstRow = totalRows - nextRow_;
+    if (firstRow > 0) {
+      EventIndexRow last{};
+      if (!options.enabled || !ReadLastEntry(loc, name, last) ||
+          last.first_row + last.count != firstRow) {
+        std::cerr << "WARNING: dataset already held rows before this export, " << name
+                  << " not written" << std::endl;
+        return Remove(loc, name);
+      }
+      if (last.event == entries_.front().event) {
+        std::cerr << "WARNING: event " << last.event << " continues across appends, "
+                  << name << " removed" << std::endl;
+        return Remove(loc, name);
+      }
+      for (auto &entry : entries_) {
+        entry.first_row += firstRow;
+      }
+    }
+
+    hid_t type = CreateEventIndexType();
+    RowDatasetWriter writer(loc, name, type, options);
+    bool ok = writer.Write(entries_.data(), entries_.size());
+    writer.Close();
+    H5Tclose(type);
+    return ok;
+  }
+
+ private:
+  // A stale index would hide the appended rows from EventIndex readers
+  static bool Remove(hid_t loc, const std::string &name) {
+    if (H5Lexists(loc, name.c_str(), H5P_DEFAULT) <= 0) {
+      return true;
+    }
+    if (H5Ldelete(loc, name.c_str(), H5P_DEFAULT) < 0) {
+      std::cerr << "ERROR: cannot remove stale " << name << std::endl;
+      return false;
+    }
+    return true;
+  }
+
+  static bool ReadLastEntry(hid_t loc, const std::string &name, EventIndexRow &last) {
+    if (H5Lexists(loc, name.c_str(), H5P_DEFAULT) <= 0) {
+      return false;
+    }
+    hid_t dset = H5Dopen2(loc, name.c_str(), H5P_DEFAULT);
+    if (dset < 0) {
+      return false;
+    }
+    hid_t fileSpace = H5Dget_space(dset);
+    hsize_t n = 0;
+    H5Sget_simple_extent_dims(fileSpace, &n, nullptr);
+    bool ok = false;
+    if (n > 0) {
+      hsize_t start = n - 1;
+      hsize_t count = 1;
+      H5Sselect_hyperslab(fileSpace, H5S_SELECT_SET, &start, nullptr, &count, nullptr);
+      hid_t memSpace = H5Screate_simple(1, &count, nullptr);
+      hid_t type = CreateEventIndexType();
+      ok = H5Dread(dset, type, memSpace, fileSpace, H5P_DEFAULT, &last) >= 0;
+      H5Tclose(type);
+      H5Sclose(memSpace);
+    }
+    H5Sclose(fileSpace);
+    H5Dclose(dset);
+    return ok;
+  }
+
+  std::vector<EventIndexRow> entries_;
+  std::set<uint32_t> seen_;
+  uint64_t nextRow_ = 0;
+  bool contiguous_ = true;
+};
+
+// Reads one uint32 field of a compound dataset into events
+bool ReadEventColumn(hid_t loc, const std::string &name, const char *field,
+                     std::set<uint32_t> &events) {
+  if (H5Lexists(loc, name.c_str(), H5P_DEFAULT) <= 0) {
+    return false;
+  }
+  hid_t dset = H5Dopen2(loc, name.c_str(), H5P_DEFAULT);
+  if (dset < 0) {
+    return false;
+  }
+  hid_t space = H5Dget_space(dset);
+  hsize_t n = 0;
+  H5Sget_simple_extent_dims(space, &n, nullptr);
+  H5Sclose(space);
+  std::vector<uint32_t> values(n);
+  hid_t type = H5Tcreate(H5T_COMPOUND, sizeof(uint32_t));
+  H5Tinsert(type, field, 0, H5T_NATIVE_UINT32);
+  bool ok = n == 0 || H5Dread(dset, type, H5S_ALL, H5S_ALL, H5P_DEFAULT, values.data()) >= 0;
+  H5Tclose(type);
+  H5Dclose(dset);
+  if (ok) {
+    events.insert(values.begin(), values.end());
+  }
+  return ok;
+}
+
+// Events already stored in the dataset of an output that is appended to, so a
+// rerun after a partly failed export does not write them a second time.  The
+// event index is read if present, otherwise the event column itself.
+bool ReadStoredEvents(const std::string &hdf5File, const std::string &datasetName,
+                      const std::string &indexName, const char *eventField,
+                      std::set<uint32_t> &events) {
+  hid_t file = H5Fopen(hdf5File.c_str(), H5F_ACC_RDONLY, H5P_DEFAULT);
+  if (file < 0) {
+    std::cerr << "ERROR: cannot open HDF5 file for appending " << hdf5File << std::endl;
+    return false;
+  }
+  bool ok = H5Lexists(file, datasetName.c_str(), H5P_DEFAULT) <= 0 ||
+            ReadEventColumn(file, indexName, "event", events) ||
+            ReadEventColumn(file, datasetName, eventField, events);
+  H5Fclose(file);
+  if (!ok) {
+    std::cerr << "ERROR: cannot read the events stored in " << datasetName << " of "
+              << hdf5File << std::endl;
+  }
+  return ok;
+}
+
 bool ExportRawWaveforms(const std::string &rootFile,
                        const std::string &treeName,
                        const std::string &hdf5File,
@@ -217,12 +624,20 @@ bool ExportRawWaveforms(const std::string &rootFile,
 
   const int maxChannels = nChannels;
   std::vector<std::vector<float> *> chPedPtrs(maxChannels, nullptr);
+  // Without chNN_ped (store_ped = false) the samples are rebuilt from chNN_raw
+  std::vector<std::vector<float> *> chRawPtrs(maxChannels, nullptr);
+  std::vector<float> rebuiltPed;
 
   for (int ch = 0; ch < maxChannels; ++ch) {
     char bname[32];
     std::snprintf(bname, sizeof(bname), "ch%02d_ped", ch);
     if (tree->GetBranch(bname)) {
       tree->SetBranchAddress(bname, &chPedPtrs[ch]);
+      continue;
+    }
+    std::snprintf(bname, sizeof(bname), "ch%02d_raw", ch);
+    if (tree->GetBranch(bname)) {
+      tree->SetBranchAddress(bname, &chRawPtrs[ch]);
     }
   }
 
@@ -269,6 +684,15 @@ bool ExportRawWaveforms(const std::string &rootFile,
       }
 
       auto *vecPtr = chPedPtrs[ch];
+      if (!vecPtr && chRawPtrs[ch] && ch < static_cast<int>(pedestals->size())) {
+        // Same arithmetic as convert_to_root, padded samples give ped_target
+        const float pedestal = (*pedestals)[ch];
+        rebuiltPed.resize(chRawPtrs[ch]->size());
+        for (size_t i = 0; i < chRawPtrs[ch]->size(); ++i) {
+          rebuiltPed[i] = (*chRawPtrs[ch])[i] - pedestal + pedTarget;
+        }
+        vecPtr = &rebuiltPed;
+      }
       if (!vecPtr) {
         continue;
       }
@@ -476,7 +900,8 @@ bool ExportAnalysisFeatures(const std::string &rootFile,
                             const std::vector<int> *sensorIds = nullptr,
                             const std::vector<int> *columnIds = nullptr,
                             const std::vector<int> *stripIds = nullptr,
-                            bool append = false) {
+                            bool append = false,
+                            const StreamingOptions &streaming = StreamingOptions()) {
   TFile *fin = TFile::Open(rootFile.c_str(), "READ");
   if (!fin || fin->IsZombie()) {
     std::cerr << "ERROR: cannot open ROOT file " << rootFile << std::endl;
@@ -542,15 +967,71 @@ bool ExportAnalysisFeatures(const std::string &rootFile,
     return false;
   }
 
+  // append: extend the streaming datasets of an earlier export of this run
+  std::set<uint32_t> storedEvents;
+  if (append && FileExists(hdf5File) &&
+      !ReadStoredEvents(hdf5File, "AnalysisFeatures", "AnalysisFeatures_EventIndex", "event",
+                        storedEvents)) {
+    fin->Close();
+    return false;
+  }
+  Long64_t skippedEvents = 0;
+
+  hid_t file = -1;
+  hid_t type = CreateAnalysisFeatureType();
+  std::unique_ptr<RowDatasetWriter> writer;
+  EventIndexBuilder eventIndex;
+
+  const Long64_t flushEvents = std::max<Long64_t>(1, streaming.flush_events);
   std::vector<AnalysisFeatureMeta> features;
-  features.reserve(static_cast<size_t>(nEntries) * nChannels);
+  features.reserve(static_cast<size_t>(streaming.enabled ? std::min(nEntries, flushEvents)
+                                                         : nEntries) * nChannels);
+
+  auto writeRows = [&]() {
+    if (features.empty()) {
+      return true;
+    }
+    if (!writer) {
+      file = OpenOutputFile(hdf5File, append && FileExists(hdf5File));
+      if (file < 0) {
+        return false;
+      }
+      writer.reset(new RowDatasetWriter(file, "AnalysisFeatures", type, streaming));
+    }
+    bool ok = writer->Write(features.data(), features.size());
+    features.clear();
+    return ok;
+  };
+
+  auto closeAll = [&]() {
+    writer.reset();
+    H5Tclose(type);
+    if (file >= 0) {
+      H5Fclose(file);
+    }
+  };
 
   for (Long64_t entry = 0; entry < nEntries; ++entry) {
+    if (streaming.enabled && entry > 0 && entry % flushEvents == 0) {
+      if (!writeRows()) {
+        fin->Close();
+        closeAll();
+        return false;
+      }
+      if (file >= 0) {
+        H5Fflush(file, H5F_SCOPE_LOCAL);
+      }
+    }
+
     tree->GetEntry(entry);
 
     if (!baseline || !ampMax) {
       continue;
     }
+    if (storedEvents.count(static_cast<uint32_t>(event)) > 0) {
+      ++skippedEvents;
+      continue;
+    }
 
     for (int ch = 0; ch < nChannels; ++ch) {
       // Filter by sensor if requested
@@ -602,74 +1083,37 @@ bool ExportAnalysisFeatures(const std::string &rootFile,
       meta.timeCFD_Fit_50pc = (ch < nChannels) ? chTimeCFD_Fit[ch] : 0.0f;
 
       features.push_back(meta);
+      eventIndex.Add(meta.event);
     }
   }
 
   fin->Close();
 
-  if (features.empty()) {
-    std::cerr << "WARNING: no features extracted" << std::endl;
+  if (!writeRows()) {
+    closeAll();
     return false;
   }
 
-  hid_t file = -1;
-  if (append) {
-    file = H5Fopen(hdf5File.c_str(), H5F_ACC_RDWR, H5P_DEFAULT);
-    if (file < 0) {
-      std::cerr << "ERROR: cannot open HDF5 file for appending " << hdf5File << std::endl;
-      return false;
-    }
-  } else {
-    file = H5Fcreate(hdf5File.c_str(), H5F_ACC_TRUNC, H5P_DEFAULT, H5P_DEFAULT);
+  if (skippedEvents > 0) {
+    std::cout << "INFO: " << skippedEvents << " events already in " << hdf5File
+              << " AnalysisFeatures, not appended again" << std::endl;
   }
-  if (file < 0) {
-    std::cerr << "ERROR: cannot create HDF5 file " << hdf5File << std::endl;
+  if (!writer && skippedEvents > 0) {
+    closeAll();
+    return true;
+  }
+  if (!writer || writer->rows() == 0) {
+    std::cerr << "WARNING: no features extracted" << std::endl;
+    closeAll();
     return false;
   }
 
-  hsize_t dim = features.size();
-  hid_t space = H5Screate_simple(1, &dim, nullptr);
-  hid_t type = H5Tcreate(H5T_COMPOUND, sizeof(AnalysisFeatureMeta));
-
-  H5Tinsert(type, "event", HOFFSET(AnalysisFeatureMeta, event), H5T_NATIVE_UINT32);
-  H5Tinsert(type, "channel", HOFFSET(AnalysisFeatureMeta, channel), H5T_NATIVE_UINT16);
-  H5Tinsert(type, "sensor_id", HOFFSET(AnalysisFeatureMeta, sensor_id), H5T_NATIVE_UINT16);
-  H5Tinsert(type, "column_id", HOFFSET(AnalysisFeatureMeta, column_id), H5T_NATIVE_UINT16);
-  H5Tinsert(type, "strip_id", HOFFSET(AnalysisFeatureMeta, strip_id), H5T_NATIVE_UINT16);
-  H5Tinsert(type, "baseline",         HOFFSET(AnalysisFeatureMeta, baseline),         H5T_NATIVE_FLOAT);
-  H5Tinsert(type, "rmsNoise",         HOFFSET(AnalysisFeatureMeta, rmsNoise),         H5T_NATIVE_FLOAT);
-  H5Tinsert(type, "rmsNoise_mV",      HOFFSET(AnalysisFeatureMeta, rmsNoise_mV),      H5T_NATIVE_FLOAT);
-  H5Tinsert(type, "noise1Point",      HOFFSET(AnalysisFeatureMeta, noise1Point),      H5T_NATIVE_FLOAT);
-  H5Tinsert(type, "ampMinBefore",     HOFFSET(AnalysisFeatureMeta, ampMinBefore),     H5T_NATIVE_FLOAT);
-  H5Tinsert(type, "ampMaxBefore",     HOFFSET(AnalysisFeatureMeta, ampMaxBefore),     H5T_NATIVE_FLOAT);
-  H5Tinsert(type, "ampMax_mV",        HOFFSET(AnalysisFeatureMeta, ampMax),           H5T_NATIVE_FLOAT);
-  H5Tinsert(type, "ampMax_Fit_mV",    HOFFSET(AnalysisFeatureMeta, ampMax_Fit_mV),    H5T_NATIVE_FLOAT);
-  H5Tinsert(type, "charge",           HOFFSET(AnalysisFeatureMeta, charge),           H5T_NATIVE_FLOAT);
-  H5Tinsert(type, "signalOverNoise",  HOFFSET(AnalysisFeatureMeta, signalOverNoise),  H5T_NATIVE_FLOAT);
-  H5Tinsert(type, "peakTime",         HOFFSET(AnalysisFeatureMeta, peakTime),         H5T_NATIVE_FLOAT);
-  H5Tinsert(type, "riseTime",         HOFFSET(AnalysisFeatureMeta, riseTime),         H5T_NATIVE_FLOAT);
-  H5Tinsert(type, "riseTime_Fit",     HOFFSET(AnalysisFeatureMeta, riseTime_Fit),     H5T_NATIVE_FLOAT);
-  H5Tinsert(type, "slewRate",         HOFFSET(AnalysisFeatureMeta, slewRate),         H5T_NATIVE_FLOAT);
-  H5Tinsert(type, "slewRate_Fit_mV",  HOFFSET(AnalysisFeatureMeta, slewRate_Fit_mV),  H5T_NATIVE_FLOAT);
-  H5Tinsert(type, "timeCFD_50pc",     HOFFSET(AnalysisFeatureMeta, timeCFD_50pc),     H5T_NATIVE_FLOAT);
-  H5Tinsert(type, "timeCFD_Fit_50pc", HOFFSET(AnalysisFeatureMeta, timeCFD_Fit_50pc), H5T_NATIVE_FLOAT);
-
-  hid_t dset = H5Dcreate(file, "AnalysisFeatures", type, space,
-                        H5P_DEFAULT, H5P_DEFAULT, H5P_DEFAULT);
-  if (dset < 0) {
-    std::cerr << "ERROR: cannot create dataset" << std::endl;
-    H5Tclose(type);
-    H5Sclose(space);
-    H5Fclose(file);
+  if (!eventIndex.Write(file, "AnalysisFeatures_EventIndex", writer->rows(), streaming)) {
+    closeAll();
     return false;
   }
 
-  H5Dwrite(dset, type, H5S_ALL, H5S_ALL, H5P_DEFAULT, features.data());
-
-  H5Dclose(dset);
-  H5Tclose(type);
-  H5Sclose(space);
-  H5Fclose(file);
+  closeAll();
 
   std::cout << "HDF5 analysis features written to " << hdf5File << std::endl;
   return true;
@@ -684,7 +1128,9 @@ bool ExportCorryHits(const std::string &rootFile,
                      const std::vector<int> *columnIds = nullptr,
                      const std::vector<int> *stripIds = nullptr,
                      int defaultColumn = 1,
-                     bool onlyCorryFields = true) {
+                     bool onlyCorryFields = true,
+                     bool append = false,
+                     const StreamingOptions &streaming = StreamingOptions()) {
   TFile *fin = TFile::Open(rootFile.c_str(), "READ");
   if (!fin || fin->IsZombie()) {
     std::cerr << "ERROR: cannot open ROOT file " << rootFile << std::endl;
@@ -740,22 +1186,66 @@ bool ExportCorryHits(const std::string &rootFile,
     return false;
   }
 
-  #pragma pack(push, 1)
-  struct HitRow {
-    uint16_t column;
-    uint16_t row;
-    uint8_t raw;
-    double charge;
-    double timestamp;
-    uint32_t trigger_number;
+  // append: extend the streaming datasets of an earlier export of this run
+  std::set<uint32_t> storedEvents;
+  if (append && FileExists(hdf5File) &&
+      !ReadStoredEvents(hdf5File, "Hits", "EventIndex", "trigger_number", storedEvents)) {
+    fin->Close();
+    return false;
+  }
+  Long64_t skippedEvents = 0;
+
+  hid_t file = -1;
+  hid_t type = CreateCorryHitType();
+  std::unique_ptr<RowDatasetWriter> writer;
+  EventIndexBuilder eventIndex;
+
+  const Long64_t flushEvents = std::max<Long64_t>(1, streaming.flush_events);
+  std::vector<CorryHitRow> hits;
+  hits.reserve(static_cast<size_t>(streaming.enabled ? std::min(nEntries, flushEvents)
+                                                     : nEntries) * nChannels);
+
+  auto writeRows = [&]() {
+    if (hits.empty()) {
+      return true;
+    }
+    if (!writer) {
+      file = OpenOutputFile(hdf5File, append && FileExists(hdf5File));
+      if (file < 0) {
+        return false;
+      }
+      writer.reset(new RowDatasetWriter(file, "Hits", type, streaming));
+    }
+    bool ok = writer->Write(hits.data(), hits.size());
+    hits.clear();
+    return ok;
   };
-  #pragma pack(pop)
 
-  std::vector<HitRow> hits;
-  hits.reserve(static_cast<size_t>(nEntries) * nChannels);
+  auto closeAll = [&]() {
+    writer.reset();
+    H5Tclose(type);
+    if (file >= 0) {
+      H5Fclose(file);
+    }
+  };
 
   for (Long64_t entry = 0; entry < nEntries; ++entry) {
+    if (streaming.enabled && entry > 0 && entry % flushEvents == 0) {
+      if (!writeRows()) {
+        fin->Close();
+        closeAll();
+        return false;
+      }
+      if (file >= 0) {
+        H5Fflush(file, H5F_SCOPE_LOCAL);
+      }
+    }
+
     tree->GetEntry(entry);
+    if (storedEvents.count(static_cast<uint32_t>(event)) > 0) {
+      ++skippedEvents;
+      continue;
+    }
 
     // Determine sensor3 reference time for this event
     // timeCFD_Fit_50pc of sensor3 in the same DAQ is used as the reference time
@@ -780,7 +1270,7 @@ bool ExportCorryHits(const std::string &rootFile,
         continue;
       }
 
-      HitRow hit{};
+      CorryHitRow hit{};
       // Column: default or per-channel mapping if provided
       if (columnIds && ch < static_cast<int>(columnIds->size())) {
         hit.column = static_cast<uint16_t>((*columnIds)[ch]);
@@ -813,48 +1303,38 @@ bool ExportCorryHits(const std::string &rootFile,
       hit.trigger_number = static_cast<uint32_t>(event);
 
       hits.push_back(hit);
+      eventIndex.Add(hit.trigger_number);
     }
   }
 
   fin->Close();
 
-  if (hits.empty()) {
-    std::cerr << "WARNING: no hits extracted for Corryvreckan format" << std::endl;
+  if (!writeRows()) {
+    closeAll();
     return false;
   }
 
-  hid_t file =
-      H5Fcreate(hdf5File.c_str(), H5F_ACC_TRUNC, H5P_DEFAULT, H5P_DEFAULT);
-  if (file < 0) {
-    std::cerr << "ERROR: cannot create HDF5 file " << hdf5File << std::endl;
+  if (skippedEvents > 0) {
+    std::cout << "INFO: " << skippedEvents << " events already in " << hdf5File
+              << " Hits, not appended again" << std::endl;
+  }
+  if (!writer && skippedEvents > 0) {
+    closeAll();
+    return true;
+  }
+  if (!writer || writer->rows() == 0) {
+    std::cerr << "WARNING: no hits extracted for Corryvreckan format" << std::endl;
+    closeAll();
     return false;
   }
 
-  hsize_t dim = hits.size();
-  hid_t space = H5Screate_simple(1, &dim, nullptr);
-
-  hid_t type = H5Tcreate(H5T_COMPOUND, sizeof(HitRow));
-  H5Tinsert(type, "column", HOFFSET(HitRow, column), H5T_NATIVE_UINT16);
-  H5Tinsert(type, "row", HOFFSET(HitRow, row), H5T_NATIVE_UINT16);
-  H5Tinsert(type, "raw", HOFFSET(HitRow, raw), H5T_NATIVE_UINT8);
-  H5Tinsert(type, "charge", HOFFSET(HitRow, charge), H5T_NATIVE_DOUBLE);
-  H5Tinsert(type, "timestamp", HOFFSET(HitRow, timestamp), H5T_NATIVE_DOUBLE);
-  H5Tinsert(type, "trigger_number", HOFFSET(HitRow, trigger_number), H5T_NATIVE_UINT32);
-
-  hid_t dset = H5Dcreate(file, "Hits", type, space,
-                        H5P_DEFAULT, H5P_DEFAULT, H5P_DEFAULT);
-  if (dset < 0) {
-    std::cerr << "ERROR: cannot create Hits dataset" << std::endl;
-    H5Tclose(type);
-    H5Sclose(space);
-    H5Fclose(file);
+  if (!eventIndex.Write(file, "EventIndex", writer->rows(), streaming)) {
+    closeAll();
     return false;
   }
 
-  H5Dwrite(dset, type, H5S_ALL, H5S_ALL, H5P_DEFAULT, hits.data());
-
   // Mark whether only Corryvreckan fields are stored
-  hid_t attrSpace = H5Screate(H5S_SCALAR);
+  hid_t attrSpace = H5Aexists(file, "corry_only_fields") > 0 ? -1 : H5Screate(H5S_SCALAR);
   if (attrSpace >= 0) {
     unsigned char flag = onlyCorryFields ? 1 : 0;
     hid_t attr = H5Acreate2(file, "corry_only_fields", H5T_NATIVE_UCHAR, attrSpace, H5P_DEFAULT, H5P_DEFAULT);
@@ -865,10 +1345,7 @@ bool ExportCorryHits(const std::string &rootFile,
     H5Sclose(attrSpace);
   }
 
-  H5Dclose(dset);
-  H5Tclose(type);
-  H5Sclose(space);
-  H5Fclose(file);
+  closeAll();
 
   std::cout << "HDF5 Corryvreckan Hits written to " << hdf5File << std::endl;
   return true;
@@ -879,7 +1356,8 @@ bool ExportAnalysisFeaturesMultiDAQ(const std::vector<DaqConfig> &daqConfigs,
                                      const std::string &treeName,
                                      const std::string &outputDir,
                                      const std::string &baseOutputName,
-                                     bool splitBySensor = true) {
+                                     bool splitBySensor = true,
+                                     const StreamingOptions &streaming = StreamingOptions()) {
   if (daqConfigs.empty()) {
     std::cerr << "ERROR: no DAQ configs provided" << std::endl;
     return false;
@@ -898,7 +1376,7 @@ bool ExportAnalysisFeaturesMultiDAQ(const std::vector<DaqConfig> &daqConfigs,
 
   // Pre-pass: collect peak time of sensor3 per DAQ per event, used as reference time.
   // reference_time[daqName][eventNumber] = peakTime of sensor3 channel
-  std::map<std::string, std::map<uint32_t, float>> sensor3RefTimes;
+  std::map<std::string, EventValueIndex> sensor3RefTimes;
   for (const auto &daqCfg : daqConfigs) {
     // Find the channel(s) mapped to sensor3 in this DAQ
     int sensor3Channel = -1;
@@ -953,8 +1431,9 @@ bool ExportAnalysisFeaturesMultiDAQ(const std::vector<DaqConfig> &daqConfigs,
     const Long64_t nRefEntries = tref->GetEntries();
     for (Long64_t entry = 0; entry < nRefEntries; ++entry) {
       tref->GetEntry(entry);
-      refMap[static_cast<uint32_t>(refEvent)] = refCFD;
+      refMap.Add(static_cast<uint32_t>(refEvent), refCFD);
     }
+    refMap.Finalize();
     fref->Close();
     std::cout << "  Pre-pass " << daqCfg.daqName << ": collected " << refMap.size()
               << " sensor3 timeCFD_Fit_50pc reference times" << std::endl;
@@ -964,18 +1443,7 @@ bool ExportAnalysisFeaturesMultiDAQ(const std::vector<DaqConfig> &daqConfigs,
   for (int sensorId : uniqueSensorIds) {
     std::cout << "\nProcessing sensor " << sensorId << "..." << std::endl;
 
-    #pragma pack(push, 1)
-    struct HitRow {
-      uint16_t column;
-      uint16_t row;
-      uint8_t raw;
-      double charge;
-      double timestamp;
-      uint32_t trigger_number;
-    };
-    #pragma pack(pop)
-
-    std::vector<HitRow> allHits;
+    std::vector<CorryHitRow> allHits;
 
     // Collect data from all DAQs for this sensor
     for (const auto &daqCfg : daqConfigs) {
@@ -1015,6 +1483,9 @@ bool ExportAnalysisFeaturesMultiDAQ(const std::vector<DaqConfig> &daqConfigs,
         }
       }
 
+      auto refIt = sensor3RefTimes.find(daqCfg.daqName);
+      const EventValueIndex *refTimes = refIt != sensor3RefTimes.end() ? &refIt->second : nullptr;
+
       const Long64_t nEntries = tree->GetEntries();
       size_t channelsAdded = 0;
 
@@ -1030,7 +1501,7 @@ bool ExportAnalysisFeaturesMultiDAQ(const std::vector<DaqConfig> &daqConfigs,
             continue;  // This channel belongs to a different sensor
           }
 
-          HitRow hit{};
+          CorryHitRow hit{};
 
           // Column: from columnIds mapping
           if (ch < static_cast<int>(daqCfg.columnIds.size())) {
@@ -1057,17 +1528,14 @@ bool ExportAnalysisFeaturesMultiDAQ(const std::vector<DaqConfig> &daqConfigs,
           //            DUT3   = hit_timeCFD_Fit_50pc (no subtraction)
           float rawCFD = chHasCFD[ch] ? chCFD[ch] : 0.0f;
           float finalTimestamp = rawCFD;
-          if (daqCfg.sensorIds[ch] != 3) {
-            auto daqIt = sensor3RefTimes.find(daqCfg.daqName);
-            if (daqIt != sensor3RefTimes.end()) {
-              auto evIt = daqIt->second.find(static_cast<uint32_t>(event));
-              if (evIt != daqIt->second.end()) {
-                finalTimestamp = evIt->second - rawCFD;
-              }
-              // else: sensor3 ref missing for this event — keep rawCFD
+          if (daqCfg.sensorIds[ch] != 3 && refTimes) {
+            const float *refTime = refTimes->Find(static_cast<uint32_t>(event));
+            if (refTime) {
+              finalTimestamp = *refTime - rawCFD;
             }
-            // else: no sensor3 in this DAQ — keep rawCFD
+            // else: sensor3 ref missing for this event — keep rawCFD
           }
+          // else: no sensor3 in this DAQ — keep rawCFD
           hit.timestamp = static_cast<double>(finalTimestamp);
           hit.trigger_number = static_cast<uint32_t>(event);
 
@@ -1083,7 +1551,7 @@ bool ExportAnalysisFeaturesMultiDAQ(const std::vector<DaqConfig> &daqConfigs,
     // Sort hits by trigger_number (event), then by column, then by row
     // This ensures Corryvreckan reads data event-by-event with all columns interleaved
     std::cout << "  Sorting " << allHits.size() << " hits by event, column, row..." << std::endl;
-    std::sort(allHits.begin(), allHits.end(), [](const HitRow &a, const HitRow &b) {
+    std::sort(allHits.begin(), allHits.end(), [](const CorryHitRow &a, const CorryHitRow &b) {
       if (a.trigger_number != b.trigger_number) return a.trigger_number < b.trigger_number;
       if (a.column != b.column) return a.column < b.column;
       return a.row < b.row;
@@ -1118,33 +1586,22 @@ bool ExportAnalysisFeaturesMultiDAQ(const std::vector<DaqConfig> &daqConfigs,
       return false;
     }
 
-    hsize_t dim = allHits.size();
-    hid_t space = H5Screate_simple(1, &dim, nullptr);
-    hid_t type = H5Tcreate(H5T_COMPOUND, sizeof(HitRow));
-
-    H5Tinsert(type, "column", HOFFSET(HitRow, column), H5T_NATIVE_UINT16);
-    H5Tinsert(type, "row", HOFFSET(HitRow, row), H5T_NATIVE_UINT16);
-    H5Tinsert(type, "raw", HOFFSET(HitRow, raw), H5T_NATIVE_UINT8);
-    H5Tinsert(type, "charge", HOFFSET(HitRow, charge), H5T_NATIVE_DOUBLE);
-    H5Tinsert(type, "timestamp", HOFFSET(HitRow, timestamp), H5T_NATIVE_DOUBLE);
-    H5Tinsert(type, "trigger_number", HOFFSET(HitRow, trigger_number), H5T_NATIVE_UINT32);
+    hid_t type = CreateCorryHitType();
+    RowDatasetWriter writer(file, "Hits", type, streaming);
+    bool written = writer.Write(allHits.data(), allHits.size());
 
-    hid_t dset = H5Dcreate(file, "Hits", type, space,
-                          H5P_DEFAULT, H5P_DEFAULT, H5P_DEFAULT);
-    if (dset < 0) {
-      std::cerr << "ERROR: cannot create Hits dataset" << std::endl;
-      H5Tclose(type);
-      H5Sclose(space);
-      H5Fclose(file);
-      return false;
+    EventIndexBuilder eventIndex;
+    for (const auto &hit : allHits) {
+      eventIndex.Add(hit.trigger_number);
     }
+    written = written && eventIndex.Write(file, "EventIndex", writer.rows(), streaming);
 
-    H5Dwrite(dset, type, H5S_ALL, H5S_ALL, H5P_DEFAULT, allHits.data());
-
-    H5Dclose(dset);
+    writer.Close();
     H5Tclose(type);
-    H5Sclose(space);
     H5Fclose(file);
+    if (!written) {
+      return false;
+    }
 
     std::cout << "  Wrote " << allHits.size() << " hits to " << hdf5File << std::endl;
   }
@@ -1179,6 +1636,15 @@ void PrintUsage(const char *prog) {
             << "  --column-id ID      Default column value for corry mode (default: 1)\n"
             << "\n"
             << "=== Common Options ===\n"
+            << "  --stream            Write Hits/AnalysisFeatures as chunked, compressed datasets\n"
+            << "                      while reading (constant memory)\n"
+            << "  --chunk-rows N      HDF5 chunk size in rows for --stream (default: 65536)\n"
+            << "  --compression L     gzip level 0-9 for --stream, 0 = off (default: 4)\n"
+            << "  --no-shuffle        Disable the shuffle filter for --stream\n"
+            << "  --flush-events N    Append to the file every N events for --stream (default: 1000)\n"
+            << "  --append            Append to the Hits/AnalysisFeatures datasets and event index of an\n"
+            << "                      existing output (single-DAQ analysis/corry, requires --stream);\n"
+            << "                      events already stored there are not written again\n"
             << "  -h, --help          Show this help message\n"
             << "\n"
             << "=== Examples ===\n"
@@ -1215,6 +1681,9 @@ int main(int argc, char **argv) {
   std::vector<int> columnIds;
   std::vector<int> stripIds;
 
+  StreamingOptions streaming;
+  bool appendOutput = false;
+
   for (int i = 1; i < argc; ++i) {
     std::string arg = argv[i];
     if (arg == "--help" || arg == "-h") {
@@ -1333,6 +1802,51 @@ int main(int argc, char **argv) {
         std::cerr << "ERROR: invalid value for --corry-only-fields (use true/false)" << std::endl;
         return 1;
       }
+    } else if (arg == "--stream") {
+      streaming.enabled = true;
+    } else if (arg == "--append") {
+      appendOutput = true;
+    } else if (arg == "--no-shuffle") {
+      streaming.shuffle = false;
+    } else if (arg == "--chunk-rows") {
+      if (i + 1 >= argc) {
+        std::cerr << "ERROR: --chunk-rows requires a value" << std::endl;
+        return 1;
+      }
+      try {
+        long long rows = std::stoll(argv[++i]);
+        if (rows <= 0) throw std::invalid_argument("chunk-rows");
+        streaming.chunk_rows = static_cast<hsize_t>(rows);
+      } catch (...) {
+        std::cerr << "ERROR: invalid number for --chunk-rows" << std::endl;
+        return 1;
+      }
+    } else if (arg == "--compression") {
+      if (i + 1 >= argc) {
+        std::cerr << "ERROR: --compression requires a value" << std::endl;
+        return 1;
+      }
+      try {
+        streaming.compression_level = std::stoi(argv[++i]);
+        if (streaming.compression_level < 0 || streaming.compression_level > 9) {
+          throw std::invalid_argument("compression");
+        }
+      } catch (...) {
+        std::cerr << "ERROR: --compression must be between 0 and 9" << std::endl;
+        return 1;
+      }
+    } else if (arg == "--flush-events") {
+      if (i + 1 >= argc) {
+        std::cerr << "ERROR: --flush-events requires a value" << std::endl;
+        return 1;
+      }
+      try {
+        streaming.flush_events = std::stoll(argv[++i]);
+        if (streaming.flush_events <= 0) throw std::invalid_argument("flush-events");
+      } catch (...) {
+        std::cerr << "ERROR: invalid number for --flush-events" << std::endl;
+        return 1;
+      }
     } else {
       std::cerr << "ERROR: unknown option " << arg << std::endl;
       PrintUsage(argv[0]);
@@ -1375,13 +1889,19 @@ int main(int argc, char **argv) {
     }
 
     // Run multi-DAQ export
-    bool ok = ExportAnalysisFeaturesMultiDAQ(daqConfigs, treeName, outputDir, outputName, splitBySensor);
+    bool ok = ExportAnalysisFeaturesMultiDAQ(daqConfigs, treeName, outputDir, outputName, splitBySensor,
+                                             streaming);
     return ok ? 0 : 2;
   }
 
   // Single-DAQ mode (legacy)
   std::cout << "=== Single-DAQ Mode (Legacy) ===" << std::endl;
 
+  if (appendOutput && !streaming.enabled) {
+    std::cerr << "ERROR: --append requires --stream (extendable datasets)" << std::endl;
+    return 1;
+  }
+
   if (mode.empty() || inputRoot.empty() || treeName.empty() || outputHdf5.empty()) {
     std::cerr << "ERROR: missing required arguments for single-DAQ mode" << std::endl;
     PrintUsage(argv[0]);
@@ -1443,7 +1963,8 @@ int main(int argc, char **argv) {
     if (mode == "raw") {
       ok = ExportRawWaveforms(inputPath, treeName, outputPath, nChannels, sensorFilter, sensorIdsPtr);
     } else if (mode == "analysis") {
-      ok = ExportAnalysisFeatures(inputPath, treeName, outputPath, nChannels, sensorFilter, sensorIdsPtr, columnIdsPtr, stripIdsPtr);
+      ok = ExportAnalysisFeatures(inputPath, treeName, outputPath, nChannels, sensorFilter, sensorIdsPtr, columnIdsPtr, stripIdsPtr,
+                                  appendOutput, streaming);
     } else if (mode == "corry") {
       ok = ExportCorryHits(inputPath,
                            treeName,
@@ -1454,11 +1975,14 @@ int main(int argc, char **argv) {
                            columnIdsPtr,
                            stripIdsPtr,
                            defaultColumnId,
-                           corryOnlyFields);
+                           corryOnlyFields,
+                           appendOutput,
+                           streaming);
       if (ok && !corryOnlyFields) {
         // Append analysis features for richer files if requested
         bool appended = ExportAnalysisFeatures(
-            inputPath, treeName, outputPath, nChannels, sensorFilter, sensorIdsPtr, columnIdsPtr, stripIdsPtr, true /*append*/);
+            inputPath, treeName, outputPath, nChannels, sensorFilter, sensorIdsPtr, columnIdsPtr, stripIdsPtr, true /*append*/,
+            streaming);
         if (!appended) {
           std::cerr << "ERROR: failed to append AnalysisFeatures dataset" << std::endl;
           return 1;
@@ -2,12 +2,16 @@
 
 import argparse
 import os
+import sys
 import glob
 import h5py
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.colors import LogNorm
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from event_index import EventIndex, slice_rows
+
 def check_hdf5_qa(input_dir, output_dir, num_events=5):
     """
     Reads HDF5 files from input_dir and generates QA plots in output_dir.
@@ -43,7 +47,6 @@ def check_hdf5_qa(input_dir, output_dir, num_events=5):
 
                 # Extract fields
                 # The structured array fields: event, channel, sensor_id, column_id, strip_id, ampMax, ...
-                events = data['event']
                 amp_max = data['ampMax']
                 col_ids = data['column_id']
                 strip_ids = data['strip_id']
@@ -67,13 +70,12 @@ def check_hdf5_qa(input_dir, output_dir, num_events=5):
                 print(f"  Saved summary plot: {summary_plot_name}")
 
                 # 2. Event-by-Event Amplitude Maps
-                unique_events = np.unique(events)
-                print(f"  Total events: {len(unique_events)}. Plotting first {num_events}...")
+                index = EventIndex(f, 'Hits')
+                print(f"  Total events: {len(index)}. Plotting first {num_events}...")
 
-                for i, ev_id in enumerate(unique_events[:num_events]):
-                    # Mask for current event
-                    mask = (events == ev_id)
-                    ev_data = data[mask]
+                for i, ev_id in enumerate(index.events[:num_events]):
+                    # Rows of the current event
+                    ev_data = slice_rows(data, index, ev_id)
                     
                     if len(ev_data) == 0:
                         continue
@@ -0,0 +1,343 @@
+#include "utils/raw_event_reader.h"
+
+#include <algorithm>
+#include <cctype>
+#include <cstdio>
+#include <iomanip>
+#include <iostream>
+#include <sstream>
+
+#include "utils/file_io.h"
+
+namespace {
+
+const int kConsistencyWarnLimit = 20;
+
+} // namespace
+
+std::string to6digits(int n) {
+    std::ostringstream oss;
+    oss << std::setw(6) << std::setfill('0') << n;
+    return oss.str();
+}
+
+NsamplesPolicy ResolveNsamplesPolicy(const std::string &policyText) {
+  std::string lowered = policyText;
+  std::transform(lowered.begin(), lowered.end(), lowered.begin(),
+                 [](unsigned char c) { return static_cast<char>(std::tolower(c)); });
+  if (lowered == "pad") {
+    return NsamplesPolicy::kPad;
+  }
+  if (lowered != "strict") {
+    std::cerr << "WARNING: unknown nsamples_policy '" << policyText
+              << "', defaulting to 'strict'" << std::endl;
+  }
+  return NsamplesPolicy::kStrict;
+}
+
+EventPolicy ResolveEventPolicy(const std::string &policyText) {
+  std::string lowered = policyText;
+  std::transform(lowered.begin(), lowered.end(), lowered.begin(),
+                 [](unsigned char c) { return static_cast<char>(std::tolower(c)); });
+  if (lowered == "warn") {
+    return EventPolicy::kWarn;
+  }
+  if (lowered == "skip") {
+    return EventPolicy::kSkip;
+  }
+  if (lowered != "error") {
+    std::cerr << "WARNING: unknown event_policy '" << policyText
+              << "', defaulting to 'error'" << std::endl;
+  }
+  return EventPolicy::kError;
+}
+
+std::string BuildFileName(const WaveConverterConfig &cfg, int ch) {
+  const bool canOverride =
+      cfg.enable_special_override && !cfg.special_channel_file.empty() &&
+      cfg.special_channel_index >= 0 && cfg.special_channel_index < cfg.n_channels();
+  if (canOverride && ch == cfg.special_channel_index) {
+    if (!cfg.special_channel_file.empty() && cfg.special_channel_file[0] == '/') {
+      return cfg.special_channel_file;
+    }
+    if (!cfg.input_dir.empty()) {
+      std::string dir = cfg.input_dir;
+      if (dir.back() != '/') {
+        dir += '/';
+	dir += to6digits(cfg.runnumber())+'/';
+	dir += cfg.daq_name()+'/';
+      }
+      return dir + cfg.special_channel_file;
+    }
+    return cfg.special_channel_file;
+  }
+
+  char fname[512];
+  std::snprintf(fname, sizeof(fname), cfg.input_pattern.c_str(), ch);
+  std::string filename(fname);
+  if (!cfg.input_dir.empty() && (filename.empty() || filename[0] != '/')) {
+    std::string dir = cfg.input_dir;
+    if (dir.back() != '/') {
+      dir += '/';
+    }
+    dir += to6digits(cfg.runnumber())+'/';
+    dir += cfg.daq_name()+'/';
+    return dir + filename;
+  }
+  return filename;
+}
+
+bool IsSpecialOverrideChannel(const WaveConverterConfig &cfg, int ch) {
+  return cfg.enable_special_override && cfg.special_channel_index == ch &&
+         cfg.special_channel_index >= 0 && cfg.special_channel_index < cfg.n_channels();
+}
+
+bool RawEventReader::Open(const WaveConverterConfig &cfg,
+                          const std::vector<std::streamoff> &offsets, int firstEvent) {
+  cfg_ = cfg;
+  if (cfg_.input_is_ascii) {
+    std::cerr << "ERROR: reading raw events needs binary input (input_is_ascii is set)"
+              << std::endl;
+    return false;
+  }
+  nsamplesPolicy_ = ResolveNsamplesPolicy(cfg_.common.nsamples_policy);
+  eventPolicy_ = ResolveEventPolicy(cfg_.event_policy);
+
+  const bool resume = !offsets.empty();
+  fins_.clear();
+  fins_.resize(cfg_.n_channels());
+  offsets_.assign(cfg_.n_channels(), 0);
+  for (int ch = 0; ch < cfg_.n_channels(); ++ch) {
+    const std::string fname = BuildFileName(cfg_, ch);
+    fins_[ch].open(fname, std::ios::binary);
+    if (!fins_[ch].is_open()) {
+      std::cerr << "ERROR: cannot open " << fname << std::endl;
+      return false;
+    }
+    if (resume) {
+      fins_[ch].seekg(0, std::ios::end);
+      if (ch >= static_cast<int>(offsets.size()) || fins_[ch].tellg() < offsets[ch]) {
+        std::cerr << "ERROR: " << fname << " is shorter than the converted part, "
+                  << "rerun without --incremental" << std::endl;
+        return false;
+      }
+      offsets_[ch] = offsets[ch];
+      fins_[ch].seekg(offsets_[ch]);
+    }
+    std::cout << "Opened " << fname << std::endl;
+  }
+
+  // Event count estimate for progress reporting: file size / first event size
+  ChannelHeader first;
+  fins_[0].seekg(0, std::ios::end);
+  const long long fileSize = static_cast<long long>(fins_[0].tellg()) - offsets_[0];
+  fins_[0].seekg(offsets_[0]);
+  if (ReadHeader(fins_[0], first) && first.eventSize > HEADER_BYTES) {
+    estimatedEvents_ = fileSize / first.eventSize;
+  }
+  fins_[0].clear();
+  fins_[0].seekg(offsets_[0]);
+  if (cfg_.max_events() >= 0) {
+    estimatedEvents_ = std::min<long long>(estimatedEvents_,
+                                           std::max(0, cfg_.max_events() - firstEvent));
+  }
+
+  eventCount_ = firstEvent;
+  consistencyWarnings_ = 0;
+  failed_ = false;
+  return true;
+}
+
+bool RawEventReader::Next(RawEvent &event) {
+  const int nChannels = cfg_.n_channels();
+  if (failed_ || (cfg_.max_events() >= 0 && eventCount_ >= cfg_.max_events())) {
+    return false;
+  }
+
+  // Try to read headers from all channels
+  std::vector<ChannelHeader> headers(nChannels);
+  std::vector<bool> channelEof(nChannels, false);
+  bool anyEof = false;
+  for (int ch = 0; ch < nChannels; ++ch) {
+    if (!ReadHeader(fins_[ch], headers[ch])) {
+      channelEof[ch] = true;
+      anyEof = true;
+    }
+  }
+
+  // If any channel reached EOF, report detailed status and stop
+  if (anyEof) {
+    std::cout << "INFO: Event count mismatch detected - one or more channels reached EOF" << std::endl;
+    std::cout << "      Per-channel status at event " << eventCount_ << ":" << std::endl;
+    for (int ch = 0; ch < nChannels; ++ch) {
+      std::cout << "        ch" << ch << ": "
+                << (channelEof[ch] ? "reached EOF" : "has more data") << std::endl;
+    }
+    std::cout << "      Processing stopped. Total events processed: " << eventCount_ << std::endl;
+    return false;
+  }
+
+  event.nsamplesPerChannel.assign(nChannels, 0);
+  event.boardIds.assign(nChannels, 0);
+  event.channelIds.assign(nChannels, 0);
+  event.eventCounters.assign(nChannels, 0);
+  for (int ch = 0; ch < nChannels; ++ch) {
+    if (headers[ch].eventSize <= HEADER_BYTES) {
+      std::cerr << "ERROR: invalid event size " << headers[ch].eventSize
+                << " at event " << eventCount_ << " ch" << ch << std::endl;
+      failed_ = true;
+      return false;
+    }
+    if (ch > 0 && headers[ch].eventSize != headers[0].eventSize) {
+      std::cerr << "WARNING: event size mismatch event " << eventCount_ << " ch"
+                << ch << " (" << headers[ch].eventSize
+                << " vs " << headers[0].eventSize << ")" << std::endl;
+    }
+    const uint32_t payloadBytes = headers[ch].eventSize - HEADER_BYTES;
+    if (payloadBytes % sizeof(float) != 0) {
+      std::cerr << "ERROR: payload not multiple of 4 bytes at event " << eventCount_
+                << " ch" << ch << std::endl;
+      failed_ = true;
+      return false;
+    }
+    event.nsamplesPerChannel[ch] = static_cast<int>(payloadBytes / sizeof(float));
+    event.boardIds[ch] = headers[ch].boardId;
+    event.channelIds[ch] = headers[ch].channelId;
+    event.eventCounters[ch] = headers[ch].eventCounter;
+  }
+
+  // Consistency checks across channels
+  std::vector<std::string> issues;
+  for (int ch = 1; ch < nChannels; ++ch) {
+    if (headers[ch].eventCounter != headers[0].eventCounter) {
+      std::ostringstream oss;
+      oss << "eventCounter mismatch at event " << eventCount_ << " ch" << ch
+          << " (" << headers[ch].eventCounter << " vs " << headers[0].eventCounter << ")";
+      issues.push_back(oss.str());
+    }
+    if (headers[ch].boardId != headers[0].boardId) {
+      std::ostringstream oss;
+      oss << "boardId mismatch at event " << eventCount_ << " ch" << ch
+          << " (" << headers[ch].boardId << " vs " << headers[0].boardId << ")";
+      issues.push_back(oss.str());
+    }
+    if (headers[ch].channelId != static_cast<uint32_t>(ch)) {
+      if (IsSpecialOverrideChannel(cfg_, ch)) {
+        if (!loggedSpecialChannelId_) {
+          std::cout << "INFO: special_channel_index " << ch
+                    << " allows channelId mismatch (header "
+                    << headers[ch].channelId << ")" << std::endl;
+          loggedSpecialChannelId_ = true;
+        }
+      } else {
+        std::ostringstream oss;
+        oss << "channelId mismatch at event " << eventCount_ << " ch" << ch
+            << " (" << headers[ch].channelId << " vs expected " << ch << ")";
+        issues.push_back(oss.str());
+      }
+    }
+  }
+
+  event.skip = false;
+  if (!issues.empty()) {
+    for (const auto &msg : issues) {
+      if (eventPolicy_ == EventPolicy::kWarn && consistencyWarnings_ >= kConsistencyWarnLimit) {
+        continue;
+      }
+      std::cerr << ((eventPolicy_ == EventPolicy::kWarn) ? "WARNING: " : "ERROR: ")
+                << msg << std::endl;
+      if (eventPolicy_ == EventPolicy::kWarn &&
+          ++consistencyWarnings_ == kConsistencyWarnLimit) {
+        std::cerr << "WARNING: further consistency warnings suppressed" << std::endl;
+      }
+    }
+    if (eventPolicy_ == EventPolicy::kError) {
+      failed_ = true;
+      return false;
+    } else if (eventPolicy_ == EventPolicy::kSkip) {
+      event.skip = true;
+    }
+  }
+
+  const int maxSamples =
+      *std::max_element(event.nsamplesPerChannel.begin(), event.nsamplesPerChannel.end());
+  const bool hasMismatch =
+      std::any_of(event.nsamplesPerChannel.begin(), event.nsamplesPerChannel.end(),
+                  [maxSamples](int v) { return v != maxSamples; });
+  if (hasMismatch && nsamplesPolicy_ == NsamplesPolicy::kStrict) {
+    std::cerr << "ERROR: nsamples mismatch at event " << eventCount_
+              << ", expected uniform sample counts across channels" << std::endl;
+    failed_ = true;
+    return false;
+  }
+  if (hasMismatch && !loggedPadding_) {
+    std::cout << "INFO: nsamples mismatch detected at event " << eventCount_
+              << ", padding shorter channels up to " << maxSamples << " samples" << std::endl;
+    loggedPadding_ = true;
+  }
+
+  if (event.timeAxis.size() != static_cast<size_t>(maxSamples)) {
+    event.timeAxis.resize(maxSamples);
+    for (int i = 0; i < maxSamples; ++i) {
+      event.timeAxis[i] = static_cast<float>(i * cfg_.tsample_ns);
+    }
+  }
+  event.nsamples = maxSamples;
+
+  // Read payloads from all channels
+  event.raw.resize(nChannels);
+  event.ped.resize(nChannels);
+  event.pedestals.assign(nChannels, 0.0f);
+  std::vector<bool> readFailed(nChannels, false);
+  bool anyReadFailed = false;
+  for (int ch = 0; ch < nChannels; ++ch) {
+    std::vector<float> &raw = event.raw[ch];
+    raw.resize(event.nsamplesPerChannel[ch]);
+    if (!fins_[ch].read(reinterpret_cast<char *>(raw.data()), raw.size() * sizeof(float))) {
+      readFailed[ch] = true;
+      anyReadFailed = true;
+    }
+  }
+
+  // If any channel failed to read payload, report and stop
+  if (anyReadFailed) {
+    std::cout << "INFO: Payload read failure - one or more channels encountered early EOF" << std::endl;
+    std::cout << "      Per-channel status at event " << eventCount_ << ":" << std::endl;
+    for (int ch = 0; ch < nChannels; ++ch) {
+      std::cout << "        ch" << ch << ": "
+                << (readFailed[ch] ? "read failed (EOF)" : "read successful") << std::endl;
+    }
+    std::cout << "      Processing stopped. Total events processed: " << eventCount_ << std::endl;
+    return false;
+  }
+
+  // Calculate pedestals and pedestal-subtracted waveforms
+  const float pedTarget = static_cast<float>(cfg_.ped_target);
+  for (int ch = 0; ch < nChannels; ++ch) {
+    const int nsampCh = event.nsamplesPerChannel[ch];
+    std::vector<float> &raw = event.raw[ch];
+    const int nPed = std::min(nsampCh, std::max(1, cfg_.pedestal_window));
+    double pedVal = 0.0;
+    for (int i = 0; i < nPed; ++i) {
+      pedVal += raw[i];
+    }
+    event.pedestals[ch] = static_cast<float>(pedVal / static_cast<double>(nPed));
+
+    raw.resize(maxSamples, event.pedestals[ch]);
+    std::vector<float> &ped = event.ped[ch];
+    ped.resize(maxSamples);
+    for (int i = 0; i < nsampCh; ++i) {
+      ped[i] = raw[i] - event.pedestals[ch] + pedTarget;
+    }
+    for (int i = nsampCh; i < maxSamples; ++i) {
+      ped[i] = pedTarget;
+    }
+  }
+
+  // Every channel is now positioned at the start of the next event
+  for (int ch = 0; ch < nChannels; ++ch) {
+    offsets_[ch] = fins_[ch].tellg();
+  }
+  event.index = eventCount_++;
+  return true;
+}
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Vectorized NumPy port of AnalyzeWaveform() (src/analysis/waveform_math.cpp).
+
+analyze_batch() works on a whole (n_events, n_channels, nsamples) block at
+once; only the (few) CFD / LE / charge thresholds are looped over in Python.
+Feature names and default values follow WaveformFeatures.
+"""
+
+import argparse
+import json
+import numpy as np
+import sys
+
+# Defaults of AnalysisConfig (include/config/analysis_config.h)
+PER_CHANNEL_DEFAULTS = {
+    "analysis_region_min": -100.0,
+    "analysis_region_max": 300.0,
+    "baseline_region_min": -50.0,
+    "baseline_region_max": -10.0,
+    "signal_region_min": 0.0,
+    "signal_region_max": 200.0,
+    "charge_region_min": 0.0,
+    "charge_region_max": 200.0,
+    "cut_amp_max": 1.0,
+    "signal_polarity": 1,
+}
+
+SCALAR_DEFAULTS = {
+    "snr_threshold": 3.0,
+    "cfd_thresholds": [10, 20, 30, 50],
+    "le_thresholds": [10.0, 20.0, 50.0],
+    "charge_thresholds": [10, 20, 50],
+    "rise_time_low": 0.1,
+    "rise_time_high": 0.9,
+    "impedance": 50.0,
+}
+
+
+def load_analysis_config(config_path):
+    """Read the waveform_analyzer section like LoadAnalysisConfigFromJson()."""
+    with open(config_path, "r") as f:
+        config = json.load(f)
+    n_channels = config.get("common", {}).get("n_channels", 16)
+    return make_analysis_config(config.get("waveform_analyzer", {}), n_channels)
+
+
+def make_analysis_config(section, n_channels=16):
+    """Fill defaults and pad per-channel lists to n_channels."""
+    cfg = dict(SCALAR_DEFAULTS)
+    cfg.update({k: v for k, v in section.items() if k in SCALAR_DEFAULTS})
+    for key, default in PER_CHANNEL_DEFAULTS.items():
+        values = list(section.get(key, []))
+        values += [default] * (n_channels - len(values))
+        cfg[key] = values
+    cfg["n_channels"] = n_channels
+    return cfg
+
+
+def pedestal_correct(raw, pedestal_window=100, ped_target=3500.0):
+    """raw - mean(first pedestal_window samples) + ped_target, as convert_to_root does."""
+    n_ped = min(raw.shape[-1], max(1, pedestal_window))
+    pedestals = raw[..., :n_ped].mean(axis=-1, dtype=np.float64).astype(np.float32)
+    return raw - pedestals[..., np.newaxis] + np.float32(ped_target), pedestals
+
+
+def _first_index(time, threshold):
+    """FindTimeIndex(): first sample with time >= threshold, else the last sample."""
+    above = time[np.newaxis, :] >= np.asarray(threshold, dtype=np.float32)[:, np.newaxis]
+    return np.where(above.any(axis=1), above.argmax(axis=1), len(time) - 1)
+
+
+def _window(time, region_min, region_max, analysis_start, analysis_end):
+    """BuildWindowIndices() for every channel."""
+    n = len(time)
+    start = np.clip(np.maximum(_first_index(time, region_min), analysis_start), 0, n - 1)
+    end = np.maximum(start, np.minimum(np.minimum(_first_index(time, region_max), analysis_end), n - 1))
+    return start, end
+
+
+def _interpolate(x1, y1, x2, y2, y_target):
+    dy = y2 - y1
+    flat = np.abs(dy) < 1e-9
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x = x1 + (x2 - x1) / np.where(flat, 1.0, dy) * (y_target - y1)
+    return np.where(flat, x1, x)
+
+
+def _take(values, index):
+    return np.take_along_axis(values, index[..., np.newaxis], axis=-1)[..., 0]
+
+
+def _crossing_backward(amp_corr, time, peak_idx, stop_idx, threshold, rms):
+    """FindThresholdCrossingBackward(): last sample in (stop, peak] below threshold."""
+    n = amp_corr.shape[-1]
+    idx = np.arange(n)
+    start = np.minimum(peak_idx, n - 1)[..., np.newaxis]
+    stop = np.maximum(0, stop_idx)[np.newaxis, :, np.newaxis]
+
+    below = (amp_corr < threshold[..., np.newaxis]) & (idx <= start) & (idx > stop)
+    hit = below.any(axis=-1)
+    i = n - 1 - below[..., ::-1].argmax(axis=-1)
+    found = hit & (i + 1 < n)
+    i1 = np.minimum(i + 1, n - 1)
+
+    t0, t1 = time[i], time[i1]
+    a0, a1 = _take(amp_corr, i), _take(amp_corr, i1)
+    crossing = _interpolate(t0, a0, t1, a1, threshold)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slew = np.abs((a1 - a0) / (t1 - t0))
+        jitter = np.where(slew > 1e-9, rms / slew, 0.0)
+    return found, crossing, jitter
+
+
+def _crossing_forward(amp_corr, time, peak_idx, stop_idx, threshold):
+    """FindTrailingEdgeForward(): first sample in [max(1, peak), stop) below threshold."""
+    n = amp_corr.shape[-1]
+    idx = np.arange(n)
+    start = np.maximum(1, peak_idx)[..., np.newaxis]
+    stop = np.minimum(stop_idx, n - 1)[np.newaxis, :, np.newaxis]
+
+    below = (amp_corr < threshold[..., np.newaxis]) & (idx >= start) & (idx < stop)
+    found = below.any(axis=-1)
+    i = np.maximum(1, below.argmax(axis=-1))
+
+    crossing = _interpolate(time[i - 1], _take(amp_corr, i - 1), time[i], _take(amp_corr, i), threshold)
+    return found, crossing
+
+
+def analyze_batch(waveforms, time, cfg):
+    """Compute AnalyzeWaveform() features for every event and channel.
+
+    waveforms : (n_events, n_channels, nsamples) pedestal-corrected amplitudes (chNN_ped)
+    time      : (nsamples,) time axis in ns (time_ns)
+    cfg       : dict from load_analysis_config() / make_analysis_config()
+
+    Returns a dict of arrays shaped (n_events, n_channels) or
+    (n_events, n_channels, n_thresholds) for the multi-threshold features.
+    """
+    amp = np.asarray(waveforms, dtype=np.float32)
+    if amp.ndim == 2:
+        amp = amp[:, np.newaxis, :]
+    time = np.asarray(time, dtype=np.float32)
+    n_events, n_channels, n = amp.shape
+    if len(time) != n:
+        raise ValueError(f"time has {len(time)} samples, waveforms have {n}")
+
+    def per_channel(key, dtype=np.float32):
+        return np.asarray(cfg[key][:n_channels], dtype=dtype)
+
+    idx = np.arange(n)
+    dt = np.float32(time[1] - time[0]) if n > 1 else np.float32(0.2)
+    impedance = np.float32(cfg["impedance"])
+
+    # Analysis window: first time >= min, last time <= max
+    amin = per_channel("analysis_region_min")
+    amax = per_channel("analysis_region_max")
+    ge = time[np.newaxis, :] >= amin[:, np.newaxis]
+    le = time[np.newaxis, :] <= amax[:, np.newaxis]
+    analysis_start = np.where(ge.any(axis=1), ge.argmax(axis=1), 0)
+    analysis_end = np.where(le.any(axis=1), n - 1 - le[:, ::-1].argmax(axis=1), n - 1)
+
+    # Baseline and noise (ComputeBaselineAndNoise)
+    bs, be = _window(time, per_channel("baseline_region_min"), per_channel("baseline_region_max"),
+                     analysis_start, analysis_end)
+    in_baseline = (idx >= bs[:, np.newaxis]) & (idx <= be[:, np.newaxis])
+    n_baseline = in_baseline.sum(axis=1)
+
+    baseline = np.where(in_baseline, amp, 0.0).sum(axis=-1, dtype=np.float64) / n_baseline
+    baseline = baseline.astype(np.float32)
+    amp_min_before = np.where(in_baseline, amp, np.inf).min(axis=-1)
+    amp_max_before = np.where(in_baseline, amp, -np.inf).max(axis=-1)
+
+    diff = amp - baseline[..., np.newaxis]
+    rms_noise = np.sqrt(np.where(in_baseline, diff * diff, 0.0).sum(axis=-1, dtype=np.float64) / n_baseline)
+    rms_noise = rms_noise.astype(np.float32)
+
+    padded = np.pad(amp, ((0, 0), (0, 0), (1, 1)))
+    counts = np.full(n, 3.0, dtype=np.float32)
+    counts[0] -= 1
+    counts[-1] -= 1
+    avg3 = (padded[..., :-2] + padded[..., 1:-1] + padded[..., 2:]) / counts
+    noise1_point = (np.where(in_baseline, avg3, 0.0).sum(axis=-1, dtype=np.float64) / n_baseline
+                    - baseline).astype(np.float32)
+
+    # Baseline subtraction and polarity
+    amp_corr = diff * per_channel("signal_polarity")[np.newaxis, :, np.newaxis]
+
+    # Peak (FindPeakInWindow): strict '>' from 0, index defaults to window start
+    ss, se = _window(time, per_channel("signal_region_min"), per_channel("signal_region_max"),
+                     analysis_start, analysis_end)
+    in_signal = (idx >= ss[:, np.newaxis]) & (idx <= se[:, np.newaxis])
+    masked = np.where(in_signal, amp_corr, -np.inf)
+    peak_idx = masked.argmax(axis=-1)
+    amp_max = _take(masked, peak_idx)
+    no_peak = amp_max <= 0.0
+    peak_idx = np.where(no_peak, ss[np.newaxis, :], peak_idx)
+    amp_max = np.where(no_peak, 0.0, amp_max).astype(np.float32)
+    peak_time = time[peak_idx]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        signal_over_noise = np.where(rms_noise > 0.0, amp_max / rms_noise, 0.0).astype(np.float32)
+    has_signal = ((rms_noise > 0.0) & (signal_over_noise >= cfg["snr_threshold"])
+                  & (amp_max >= per_channel("cut_amp_max")))
+
+    # Charge (IntegrateChargeWindow, end exclusive)
+    charge_min = per_channel("charge_region_min")
+    charge_max = per_channel("charge_region_max")
+    cs, ce = _window(time, charge_min, charge_max, analysis_start, analysis_end)
+    in_charge = (idx >= cs[:, np.newaxis]) & (idx < ce[:, np.newaxis])
+    step = np.where(in_charge, amp_corr * dt / impedance, 0.0).astype(np.float32)
+    cumulative = np.cumsum(step, axis=-1)
+    charge = cumulative[..., -1]
+
+    # Charge fraction times (ComputeChargeFractionTimes): thresholds are taken in
+    # order, each one searched from the sample after the previous crossing
+    n_charge_th = len(cfg["charge_thresholds"])
+    time_charge = np.full((n_events, n_channels, n_charge_th), 10.0, dtype=np.float32)
+    search_from = np.zeros((n_events, n_channels), dtype=np.int64)
+    for k, percent in enumerate(cfg["charge_thresholds"]):
+        threshold = charge * np.float32(percent / 100.0)
+        above = (in_charge & (idx >= search_from[..., np.newaxis])
+                 & (cumulative > threshold[..., np.newaxis]))
+        found = above.any(axis=-1)
+        i = above.argmax(axis=-1)
+        prev = np.maximum(i - 1, 0)
+        t = _interpolate(time[prev], _take(cumulative, i) - _take(step, i),
+                         time[i], _take(cumulative, i), threshold)
+        accept = found & (i > 0) & (t >= charge_min) & (t <= charge_max)
+        time_charge[..., k] = np.where(accept, t, 10.0)
+        search_from = np.where(found, i + 1, n)
+
+    # CFD
+    n_cfd = len(cfg["cfd_thresholds"])
+    time_cfd = np.zeros((n_events, n_channels, n_cfd), dtype=np.float32)
+    jitter_cfd = np.zeros((n_events, n_channels, n_cfd), dtype=np.float32)
+    for b, percent in enumerate(cfg["cfd_thresholds"]):
+        threshold = amp_max * np.float32(percent / 100.0)
+        found, t, jitter = _crossing_backward(amp_corr, time, peak_idx, ss, threshold, rms_noise)
+        time_cfd[..., b] = np.where(found, t, 0.0)
+        jitter_cfd[..., b] = np.where(found, jitter, 0.0)
+
+    # Leading edge and time over threshold
+    n_le = len(cfg["le_thresholds"])
+    time_le = np.full((n_events, n_channels, n_le), 20.0, dtype=np.float32)
+    jitter_le = np.full((n_events, n_channels, n_le), -5.0, dtype=np.float32)
+    tot_le = np.full((n_events, n_channels, n_le), -5.0, dtype=np.float32)
+    for b, millivolt in enumerate(cfg["le_thresholds"]):
+        threshold = np.full_like(amp_max, np.float32(millivolt / 1000.0))
+        active = amp_max > threshold
+        leading, t_lead, jitter = _crossing_backward(amp_corr, time, peak_idx, ss, threshold, rms_noise)
+        leading &= active
+        trailing, t_trail = _crossing_forward(amp_corr, time, peak_idx, ce, threshold)
+        trailing &= leading
+        time_le[..., b] = np.where(leading, t_lead, 20.0)
+        jitter_le[..., b] = np.where(leading, jitter, -5.0)
+        tot_le[..., b] = np.where(trailing, t_trail - t_lead, -5.0)
+
+    # Rise time, slew rate, jitter
+    amp_high = amp_max * np.float32(cfg["rise_time_high"])
+    amp_low = amp_max * np.float32(cfg["rise_time_low"])
+    found_high, t_high, _ = _crossing_backward(amp_corr, time, peak_idx, ss, amp_high, rms_noise)
+    found_low, t_low, _ = _crossing_backward(amp_corr, time, peak_idx, ss, amp_low, rms_noise)
+    rise_time = (np.where(found_high, t_high, 0.0) - np.where(found_low, t_low, 0.0)).astype(np.float32)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slew_rate = np.where(rise_time > 0.0, (amp_high - amp_low) / rise_time, 0.0).astype(np.float32)
+        jitter_rms = (rms_noise / slew_rate).astype(np.float32)
+
+    return {
+        "baseline": baseline,
+        "rmsNoise": rms_noise,
+        "noise1Point": noise1_point,
+        "ampMinBefore": amp_min_before,
+        "ampMaxBefore": amp_max_before,
+        "hasSignal": has_signal,
+        "ampMax": amp_max,
+        "charge": charge,
+        "signalOverNoise": signal_over_noise,
+        "peakTime": peak_time,
+        "riseTime": rise_time,
+        "slewRate": slew_rate,
+        "jitterRMS": jitter_rms,
+        "timeCFD": time_cfd,
+        "jitterCFD": jitter_cfd,
+        "timeLE": time_le,
+        "jitterLE": jitter_le,
+        "totLE": tot_le,
+        "timeCharge": time_charge,
+    }
+
+
+def analyze_run(run, cfg, tsample_ns=0.2, pedestal_window=100, ped_target=3500.0,
+                chunk_size=1000, max_events=None):
+    """Run analyze_batch() over a read_raw_run.RawRun in chunks of events."""
+    n_events = run.n_events if max_events is None else min(run.n_events, max_events)
+    time = (np.arange(run.nsamples) * tsample_ns).astype(np.float32)
+
+    results = []
+    for start in range(0, n_events, chunk_size):
+        raw = run.waveforms(slice(start, min(start + chunk_size, n_events)))
+        ped, _ = pedestal_correct(raw, pedestal_window, ped_target)
+        results.append(analyze_batch(ped, time, cfg))
+
+    if not results:
+        return {}
+    return {key: np.concatenate([r[key] for r in results]) for key in results[0]}
+
+
+if __name__ == "__main__":
+    from read_raw_run import RawRun, build_file_names, load_converter_config, special_channel_index
+    import os
+
+    parser = argparse.ArgumentParser(description="Vectorized waveform analysis straight from raw files.")
+    parser.add_argument("--config", required=True, help="Converter configuration JSON")
+    parser.add_argument("--dir", help="Directory holding the channel files (overrides input_dir/run/daq)")
+    parser.add_argument("--max-events", type=int, default=None, help="Limit the number of events")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Events per batch")
+    args = parser.parse_args()
+
+    conv = load_converter_config(args.config)
+    if args.dir:
+        conv["input_dir"] = ""
+        run = RawRun([os.path.join(args.dir, name) for name in build_file_names(conv)],
+                     special_index=special_channel_index(conv))
+    else:
+        run = RawRun.from_config(conv)
+
+    cfg = load_analysis_config(args.config)
+    features = analyze_run(run, cfg,
+                           tsample_ns=conv.get("tsample_ns", 0.2),
+                           pedestal_window=conv.get("pedestal_window", 100),
+                           ped_target=conv.get("ped_target", 3500.0),
+                           chunk_size=args.chunk_size,
+                           max_events=args.max_events)
+    if not features:
+        print("No events")
+        sys.exit(1)
+
+    print(f"Events analyzed: {features['ampMax'].shape[0]}")
+    print(f"{'ch':>4} {'signal':>8} {'rms':>8} {'ampMax':>10} {'charge':>10}")
+    for ch in range(features["ampMax"].shape[1]):
+        sig = features["hasSignal"][:, ch]
+        print(f"{ch:>4} {sig.mean() * 100:7.1f}% {np.mean(features['rmsNoise'][:, ch]):8.2f} "
+              f"{np.mean(features['ampMax'][:, ch]):10.2f} {np.mean(features['charge'][:, ch]):10.4f}")
@@ -5,13 +5,37 @@ Starts DAQ acquisition with tmux session management
 """
 
 import os
+import re
+import signal
 import sys
 import subprocess
 import json
 import argparse
 import shutil
+import struct
 import time
 
+# JSON status of the monitor of DAQ NN is served on STATUS_PORT_BASE + NN
+STATUS_PORT_BASE = 8700
+
+# WaveDump prints its key menu once the board is configured and calibrated
+WAVEDUMP_PROMPT = "[s] start/stop the acquisition"
+# Enable continuous writing, then start the acquisition
+WAVEDUMP_START_KEYS = ['W', 's']
+
+# Stop the acquisition, then quit WaveDump (closes the output files)
+WAVEDUMP_STOP_KEYS = ['s', 'q']
+
+# First event header in wave_0.dat (8 uint32 words, eventSize first)
+EVENT_HEADER_BYTES = 32
+READY_POLL_INTERVAL = 0.05
+DEFAULT_READY_TIMEOUT = 60.0
+
+# Sequencer defaults
+DEFAULT_PIPELINE = "/opt/dt5742/data_converter/run_full_pipeline_both.sh"
+DEFAULT_MAX_PIPELINES = 2
+SEQUENCE_POLL_INTERVAL = 0.5
+
 
 def check_tmux_session(session_name):
     """Check if tmux session exists"""
@@ -28,35 +52,120 @@ def kill_tmux_session(session_name):
     subprocess.run(['tmux', 'kill-session', '-t', session_name])
 
 
-def create_folder_structure(run_identifier):
-    """Create folder structure for DAQ data
+def pane_shows(pane, text):
+    """Check if a tmux pane currently shows text (wrapped lines joined; panes are narrow)"""
+    result = subprocess.run(['tmux', 'capture-pane', '-p', '-J', '-t', pane],
+                            capture_output=True, text=True)
+    return text in result.stdout
+
+
+def first_event_written(path):
+    """Check if a wave file holds a complete, plausible first event header"""
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(EVENT_HEADER_BYTES)
+    except OSError:
+        return False
+    if len(header) < EVENT_HEADER_BYTES:
+        return False
+    event_size = struct.unpack_from('<I', header)[0]
+    return event_size > EVENT_HEADER_BYTES and (event_size - EVENT_HEADER_BYTES) % 4 == 0
+
+
+def wait_until(checks, timeout):
+    """Poll several conditions together until all are true or timeout expires
 
     Args:
-        run_identifier: Either a number (will be formatted as 6-digit) or a string
+        checks: Dict of name -> callable returning True when ready
+        timeout: Seconds to wait in total
 
     Returns:
-        Path to created folder
+        Dict of name -> seconds until ready, or None if it timed out
     """
-    # Determine folder name
+    start = time.monotonic()
+    ready = {}
+    while len(ready) < len(checks):
+        for name, check in checks.items():
+            if name not in ready and check():
+                ready[name] = time.monotonic() - start
+        if len(ready) == len(checks) or time.monotonic() - start >= timeout:
+            break
+        time.sleep(READY_POLL_INTERVAL)
+    return {name: ready.get(name) for name in checks}
+
+
+def start_acquisition(daq_panes, daq_paths, timeout=DEFAULT_READY_TIMEOUT):
+    """Start both WaveDumps as soon as each is ready and wait for their first events
+
+    Args:
+        daq_panes: Dict of DAQ name -> tmux pane running WaveDump
+        daq_paths: Dict of DAQ name -> data folder
+        timeout: Seconds to wait for each step
+
+    Returns:
+        True if every DAQ wrote its first event in time
+    """
+    print("Waiting for WaveDump to initialize...")
+    prompts = wait_until({name: (lambda pane=pane: pane_shows(pane, WAVEDUMP_PROMPT))
+                          for name, pane in daq_panes.items()}, timeout)
+    for name, seconds in prompts.items():
+        if seconds is None:
+            print(f"  {name}: WaveDump not ready after {timeout:.0f} s")
+            continue
+        for key in WAVEDUMP_START_KEYS:
+            subprocess.run(['tmux', 'send-keys', '-t', daq_panes[name], key])
+        print(f"  {name}: started acquisition ({seconds:.1f} s)")
+
+    started = [name for name, seconds in prompts.items() if seconds is not None]
+    if not started:
+        return False
+
+    print("Waiting for first events...")
+    events = wait_until({name: (lambda path=os.path.join(daq_paths[name], 'wave_0.dat'):
+                                first_event_written(path))
+                         for name in started}, timeout)
+    for name, seconds in events.items():
+        if seconds is None:
+            print(f"  {name}: no event in wave_0.dat after {timeout:.0f} s")
+        else:
+            print(f"  {name}: first event written ({seconds:.1f} s)")
+
+    return len(started) == len(daq_panes) and all(s is not None for s in events.values())
+
+
+def run_folder_name(run_identifier):
+    """Folder name of a run: 6-digit number or the string as given"""
     try:
-        run_number = int(run_identifier)
-        folder_name = f"{run_number:06d}"
+        return f"{int(run_identifier):06d}"
     except ValueError:
-        folder_name = run_identifier
+        return run_identifier
 
+
+def create_folder_structure(run_identifier, existing='ask'):
+    """Create folder structure for DAQ data
+
+    Args:
+        run_identifier: Either a number (will be formatted as 6-digit) or a string
+        existing: What to do if the folder exists: 'ask', 'overwrite' or 'skip'
+
+    Returns:
+        Path to created folder, or None if it exists and existing is 'skip'
+    """
     # Create base folder
-    base_path = f"/data/{folder_name}"
+    base_path = f"/data/{run_folder_name(run_identifier)}"
 
     # Check if folder already exists
     if os.path.exists(base_path):
         print(f"Folder '{base_path}' already exists.")
-        response = input("Delete existing folder and continue? (y/n): ").strip().lower()
-        if response == 'y':
-            print(f"Deleting '{base_path}'...")
-            shutil.rmtree(base_path)
-        else:
-            print("Aborting.")
-            sys.exit(1)
+        if existing == 'skip':
+            return None
+        if existing == 'ask':
+            response = input("Delete existing folder and continue? (y/n): ").strip().lower()
+            if response != 'y':
+                print("Aborting.")
+                sys.exit(1)
+        print(f"Deleting '{base_path}'...")
+        shutil.rmtree(base_path)
 
     daq00_path = os.path.join(base_path, "daq00")
     daq01_path = os.path.join(base_path, "daq01")
@@ -72,6 +181,45 @@ def create_folder_structure(run_identifier):
     return base_path
 
 
+def count_events(path):
+    """Number of complete events in a wave file (0 if it has none yet)"""
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(EVENT_HEADER_BYTES)
+            size = os.fstat(f.fileno()).st_size
+    except OSError:
+        return 0
+    if len(header) < EVENT_HEADER_BYTES:
+        return 0
+    event_size = struct.unpack_from('<I', header)[0]
+    if event_size <= EVENT_HEADER_BYTES:
+        return 0
+    return size // event_size
+
+
+def stop_acquisition(daq_panes, timeout=DEFAULT_READY_TIMEOUT):
+    """Stop both WaveDumps and wait until they have exited
+
+    Returns:
+        True if every WaveDump exited in time
+    """
+    for pane in daq_panes.values():
+        for key in WAVEDUMP_STOP_KEYS:
+            subprocess.run(['tmux', 'send-keys', '-t', pane, key])
+
+    def exited(pane):
+        result = subprocess.run(['tmux', 'display-message', '-p', '-t', pane, '#{pane_current_command}'],
+                                capture_output=True, text=True)
+        return result.returncode != 0 or 'wavedump' not in result.stdout.lower()
+
+    done = wait_until({name: (lambda pane=pane: exited(pane)) for name, pane in daq_panes.items()},
+                      timeout)
+    for name, seconds in done.items():
+        if seconds is None:
+            print(f"  {name}: WaveDump still running after {timeout:.0f} s")
+    return all(seconds is not None for seconds in done.values())
+
+
 def update_monitor_config(config_path, daq_path, daq_number):
     """Update monitor config file with correct input path
 
@@ -88,7 +236,14 @@ def update_monitor_config(config_path, daq_path, daq_number):
         config['monitor'] = {}
 
     config['monitor']['input_file'] = f"{daq_path}/wave_0.dat"
+    # Check every channel file of the digitizer, not only wave_0.dat
+    config['monitor']['input_dir'] = daq_path
+    config['monitor']['all_channels'] = True
     config['monitor']['log_file'] = f"{daq_path}/monitor.log"
+    config['monitor']['rate_history_file'] = f"{daq_path}/monitor_rate.csv"
+    # Read with daq_monitor/status_aggregator.py instead of attaching to tmux
+    config['monitor']['status_port'] = STATUS_PORT_BASE + int(daq_number)
+    config['monitor']['status_name'] = f"daq{daq_number}"
 
     with open(config_path, 'w') as f:
         json.dump(config, f, indent=2)
@@ -110,8 +265,14 @@ def setup_tmux_session(base_path, args):
     │Mon2 │       │             │
     └─────┴───────┴─────────────┘
 
+    Both WaveDumps and both monitors are launched at once; use
+    start_acquisition() to wait until they are actually taking data.
+
     Args:
         base_path: Base path to data folder
+
+    Returns:
+        (session name, dict of DAQ name -> WaveDump pane)
     """
     session_name = "caen_daq"
     daq00_path = os.path.join(base_path, "daq00")
@@ -178,22 +339,14 @@ def setup_tmux_session(base_path, args):
     # Resize right top (DAQ01) to 60% of right column
     subprocess.run(['tmux', 'resize-pane', '-t', pane_right_top, '-y', '60%'])
 
-    # Configure DAQ00 pane (top-left)
+    # Configure DAQ00 pane (top-left) and DAQ01 pane (top-right); both boards
+    # initialize in parallel, readiness is checked in start_acquisition()
+    print("Starting DAQ00 and DAQ01...")
     subprocess.run(['tmux', 'send-keys', '-t', pane_left_top,
                    f'cd {daq00_path} && wavedump WaveDumpConfig_USB0.txt', 'C-m'])
-
-    # Wait for DAQ00 to initialize
-    print("Starting DAQ00...")
-    time.sleep(1)
-
-    # Configure DAQ01 pane (top-right)
     subprocess.run(['tmux', 'send-keys', '-t', pane_right_top,
                    f'cd {daq01_path} && wavedump WaveDumpConfig_USB1.txt', 'C-m'])
 
-    # Wait for DAQ01 to initialize
-    print("Starting DAQ01...")
-    time.sleep(1)
-
     # Configure Monitor1 pane (left-bottom-top)
     subprocess.run(['tmux', 'send-keys', '-t', pane_monitor1,
                    f'cd {daq00_path} && /opt/dt5742/daq_monitor/monitor_realtime --config monitor_config.json', 'C-m'])
@@ -205,8 +358,209 @@ def setup_tmux_session(base_path, args):
     # Configure glances pane (right-bottom)
     subprocess.run(['tmux', 'send-keys', '-t', pane_glances, 'glances', 'C-m'])
 
-    # Return session name
-    return session_name
+    return session_name, {'daq00': pane_left_top, 'daq01': pane_right_top}
+
+
+def parse_duration(text):
+    """Seconds from '90', '90s', '5m' or '1h'; None for '-' or empty"""
+    if text in (None, '', '-'):
+        return None
+    match = re.fullmatch(r'(\d+(?:\.\d+)?)([smh]?)', text.strip().lower())
+    if not match:
+        raise ValueError(f"Invalid duration: {text}")
+    return float(match.group(1)) * {'': 1, 's': 1, 'm': 60, 'h': 3600}[match.group(2)]
+
+
+def parse_run_list(text):
+    """Run identifiers from '101-105,110,test01'"""
+    runs = []
+    for item in text.split(','):
+        item = item.strip()
+        match = re.fullmatch(r'(\d+)-(\d+)', item)
+        if match:
+            runs.extend(str(n) for n in range(int(match.group(1)), int(match.group(2)) + 1))
+        elif item:
+            runs.append(item)
+    return runs
+
+
+def load_sequence(path, default_duration=None, default_events=None):
+    """Read a run sequence file
+
+    One run per line: RUN [DURATION] [EVENTS], '-' for "not set", '#' starts a
+    comment. A run stops at whichever limit is reached first.
+
+        # run   duration  events
+        101     2m        -
+        102     -         5000
+
+    Returns:
+        List of (run, duration seconds or None, max events or None)
+    """
+    sequence = []
+    with open(path, 'r') as f:
+        for line_number, line in enumerate(f, 1):
+            fields = line.split('#', 1)[0].split()
+            if not fields:
+                continue
+            if len(fields) > 3:
+                raise ValueError(f"{path}:{line_number}: expected RUN [DURATION] [EVENTS]")
+            duration = parse_duration(fields[1]) if len(fields) > 1 else default_duration
+            events = default_events
+            if len(fields) > 2:
+                events = None if fields[2] == '-' else int(fields[2])
+            sequence.append((fields[0], duration, events))
+    return sequence
+
+
+class PipelineQueue:
+    """Runs the analysis pipeline of finished runs in the background
+
+    At most max_running pipelines run at once; the others wait in the queue so
+    acquisition of the next run never waits for analysis.
+    """
+
+    def __init__(self, script, max_running=DEFAULT_MAX_PIPELINES):
+        self.script = script
+        self.max_running = max(1, max_running)
+        self.waiting = []
+        self.running = {}
+        self.results = {}
+
+    def submit(self, run_identifier, base_path):
+        self.waiting.append((run_identifier, base_path))
+        self.poll()
+
+    def poll(self):
+        for run, (process, log) in list(self.running.items()):
+            if process.poll() is not None:
+                log.close()
+                self.results[run] = process.returncode
+                status = "done" if process.returncode == 0 else f"FAILED (exit {process.returncode})"
+                print(f"[{time.strftime('%H:%M:%S')}] Pipeline {run}: {status}")
+                del self.running[run]
+
+        while self.waiting and len(self.running) < self.max_running:
+            run, base_path = self.waiting.pop(0)
+            log = open(os.path.join(base_path, 'pipeline.log'), 'w')
+            # Own session: Ctrl+C of the sequencer does not kill analysis in progress
+            process = subprocess.Popen([self.script, run_folder_name(run)], stdout=log,
+                                       stderr=subprocess.STDOUT, start_new_session=True)
+            self.running[run] = (process, log)
+            print(f"[{time.strftime('%H:%M:%S')}] Pipeline {run}: started "
+                  f"(log: {os.path.join(base_path, 'pipeline.log')})")
+
+    def pending(self):
+        return len(self.waiting) + len(self.running)
+
+
+def take_run(run_identifier, duration, max_events, args, pipelines, stop_requested):
+    """Acquire one run of the sequence without any prompt
+
+    Returns:
+        Dict with the run summary
+    """
+    summary = {'run': run_identifier, 'status': 'ok', 'events': [0, 0], 'seconds': 0.0}
+    base_path = create_folder_structure(run_identifier, existing=args.existing)
+    if base_path is None:
+        summary['status'] = 'skipped (folder exists)'
+        return summary
+
+    session_name = "caen_daq"
+    if check_tmux_session(session_name):
+        kill_tmux_session(session_name)
+    session_name, daq_panes = setup_tmux_session(base_path, args)
+    daq_paths = {name: os.path.join(base_path, name) for name in daq_panes}
+    wave_files = [os.path.join(path, 'wave_0.dat') for path in daq_paths.values()]
+
+    try:
+        if not start_acquisition(daq_panes, daq_paths, args.ready_timeout):
+            summary['status'] = 'failed to start'
+            stop_acquisition(daq_panes, args.ready_timeout)
+            return summary
+
+        # Acquire until the duration or the event count is reached
+        start = time.monotonic()
+        limits = []
+        if duration is not None:
+            limits.append(f"{duration:.0f} s")
+        if max_events is not None:
+            limits.append(f"{max_events} events")
+        print(f"[{time.strftime('%H:%M:%S')}] Run {run_identifier}: taking data "
+              f"({' or '.join(limits) if limits else 'until Ctrl+C'})")
+        while not stop_requested():
+            events = [count_events(path) for path in wave_files]
+            elapsed = time.monotonic() - start
+            if duration is not None and elapsed >= duration:
+                break
+            if max_events is not None and min(events) >= max_events:
+                break
+            pipelines.poll()
+            sys.stdout.write(f"\r  {elapsed:7.0f} s | daq00 {events[0]:8d} | daq01 {events[1]:8d} events")
+            sys.stdout.flush()
+            time.sleep(SEQUENCE_POLL_INTERVAL)
+        summary['seconds'] = time.monotonic() - start
+        if stop_requested():
+            summary['status'] = 'interrupted'
+
+        print(f"\n[{time.strftime('%H:%M:%S')}] Run {run_identifier}: stopping")
+        if not stop_acquisition(daq_panes, args.ready_timeout):
+            summary['status'] = 'WaveDump did not exit'
+    finally:
+        kill_tmux_session(session_name)
+
+    summary['events'] = [count_events(path) for path in wave_files]
+    if args.pipeline and summary['status'] in ('ok', 'interrupted') and min(summary['events']) > 0:
+        pipelines.submit(run_identifier, base_path)
+    return summary
+
+
+def run_sequence(sequence, args):
+    """Take every run of the sequence back to back, analyzing finished runs in the background"""
+    stop = {'requested': False}
+
+    def request_stop(signum, frame):
+        # First Ctrl+C ends the current run cleanly and the sequence; a second one aborts
+        if stop['requested']:
+            raise KeyboardInterrupt
+        print("\nStopping after the current run (Ctrl+C again to abort)...")
+        stop['requested'] = True
+
+    signal.signal(signal.SIGINT, request_stop)
+    pipelines = PipelineQueue(args.pipeline, args.max_pipelines) if args.pipeline else None
+
+    print(f"Run sequence: {len(sequence)} runs")
+    summaries = []
+    for run_identifier, duration, max_events in sequence:
+        if stop['requested']:
+            break
+        if duration is None and max_events is None:
+            print(f"Run {run_identifier}: no duration or event count, skipped")
+            summaries.append({'run': run_identifier, 'status': 'no limit', 'events': [0, 0], 'seconds': 0.0})
+            continue
+        summary = take_run(run_identifier, duration, max_events, args, pipelines,
+                           lambda: stop['requested'])
+        summaries.append(summary)
+        print(f"[{time.strftime('%H:%M:%S')}] Run {run_identifier}: {summary['status']}, "
+              f"{summary['events'][0]}/{summary['events'][1]} events in {summary['seconds']:.0f} s")
+
+    if pipelines is not None:
+        if pipelines.pending():
+            print(f"Waiting for {pipelines.pending()} pipeline(s)...")
+        while pipelines.pending():
+            pipelines.poll()
+            time.sleep(SEQUENCE_POLL_INTERVAL)
+
+    print("\n" + "=" * 63)
+    print(f"  {'run':<10} {'status':<24} {'daq00':>8} {'daq01':>8} {'time':>6}  pipeline")
+    for s in summaries:
+        result = '-'
+        if pipelines is not None and s['run'] in pipelines.results:
+            result = 'ok' if pipelines.results[s['run']] == 0 else f"exit {pipelines.results[s['run']]}"
+        print(f"  {s['run']:<10} {s['status']:<24} {s['events'][0]:8d} {s['events'][1]:8d} "
+              f"{s['seconds']:5.0f}s  {result}")
+    print("=" * 63)
+    return all(s['status'] == 'ok' for s in summaries)
 
 
 def main():
@@ -215,6 +569,7 @@ def main():
     )
     parser.add_argument(
         'run_identifier',
+        nargs='?',
         help='Run number (will be formatted as 6-digit) or folder name (string)'
     )
 
@@ -241,9 +596,69 @@ def main():
         default="/opt/dt5742/daq_monitor/monitor_config.json",
         help="Path to monitor_config.json template."
     )
+    parser.add_argument(
+        "--auto-start",
+        action="store_true",
+        help=("Start acquisition in both WaveDumps as soon as they are initialized "
+              "and wait until each has written its first event.")
+    )
+    parser.add_argument(
+        "--ready-timeout",
+        type=float,
+        default=DEFAULT_READY_TIMEOUT,
+        help=f"Seconds to wait for WaveDump and for the first events (default: {DEFAULT_READY_TIMEOUT:.0f})."
+    )
+
+    # Unattended run sequence
+    sequencer = parser.add_argument_group(
+        'run sequence',
+        'Take several runs back to back without any prompt; each run stops after its '
+        'duration or event count and is analyzed in the background.')
+    sequencer.add_argument(
+        "--sequence",
+        default=None,
+        help="File with one run per line: RUN [DURATION] [EVENTS] (e.g. '101 2m -')."
+    )
+    sequencer.add_argument(
+        "--runs",
+        default=None,
+        help="Runs to take, e.g. '101-150' or '101,103,test01' (uses --duration/--events)."
+    )
+    sequencer.add_argument(
+        "--duration",
+        default=None,
+        help="Default run duration, e.g. 90, 90s, 5m, 1h."
+    )
+    sequencer.add_argument(
+        "--events",
+        type=int,
+        default=None,
+        help="Default number of events per run (counted in wave_0.dat of both DAQs)."
+    )
+    sequencer.add_argument(
+        "--existing",
+        choices=['skip', 'overwrite'],
+        default='skip',
+        help="Run folder already exists: skip the run or delete the folder (default: skip)."
+    )
+    sequencer.add_argument(
+        "--pipeline",
+        default=DEFAULT_PIPELINE,
+        help=f"Analysis started for each finished run with the run as argument "
+             f"(default: {DEFAULT_PIPELINE}); '' disables it."
+    )
+    sequencer.add_argument(
+        "--max-pipelines",
+        type=int,
+        default=DEFAULT_MAX_PIPELINES,
+        help=f"Pipelines running at the same time (default: {DEFAULT_MAX_PIPELINES})."
+    )
 
     args = parser.parse_args()
 
+    if args.sequence is None and args.runs is None and args.run_identifier is None:
+        parser.error("give a run identifier, --runs or --sequence")
+
     # Resolve WaveDump config paths
     if args.wavedump_config:
         usb0_default = os.path.join(args.wavedump_config, "WaveDump_Config_usb00.txt")
@@ -260,6 +675,16 @@ def main():
         if not os.path.isfile(p):
             raise FileNotFoundError(f"Config file not found: {p}")
 
+    if args.sequence is not None or args.runs is not None:
+        try:
+            duration = parse_duration(args.duration)
+            if args.sequence is not None:
+                sequence = load_sequence(args.sequence, duration, args.events)
+            else:
+                sequence = [(run, duration, args.events) for run in parse_run_list(args.runs)]
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+        sys.exit(0 if run_sequence(sequence, args) else 1)
 
     session_name = "caen_daq"
 
@@ -287,15 +712,20 @@ def main():
     base_path = create_folder_structure(args.run_identifier)
 
     # Setup tmux session
-    session_name = setup_tmux_session(base_path, args)
+    session_name, daq_panes = setup_tmux_session(base_path, args)
 
-    # Wait for processes to start
-    time.sleep(1)
-
-    # Display session info
     daq00_path = os.path.join(base_path, "daq00")
     daq01_path = os.path.join(base_path, "daq01")
 
+    # Start acquisition and check that both boards are really writing data
+    if args.auto_start:
+        if start_acquisition(daq_panes, {'daq00': daq00_path, 'daq01': daq01_path},
+                             args.ready_timeout):
+            print("Both DAQs are taking data.")
+        else:
+            print("WARNING: acquisition did not start on every DAQ, check the WaveDump panes.")
+
+    # Display session info
     print("\n" + "="*63)
     print(f"║         Tmux Session: {session_name} (5 panes)            ║")
     print(f"║         Working Directory: {base_path:<28}║")
@@ -310,6 +740,10 @@ def main():
     print("║  DAQ01 Monitor              ║                             ║")
     print("║  Real-time Analysis         ║                             ║")
     print("="*63)
+    print(f"\nMonitor status (JSON): http://127.0.0.1:{STATUS_PORT_BASE}/status, "
+          f"http://127.0.0.1:{STATUS_PORT_BASE + 1}/status")
+    print("  summary of both: /opt/dt5742/daq_monitor/status_aggregator.py")
+    print(f"  daq00/daq01 sync:  /opt/dt5742/daq_monitor/sync_monitor.py {base_path}")
     print("\nPress ENTER to attach to tmux session...")
     input()
 